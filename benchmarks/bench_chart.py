@@ -0,0 +1,101 @@
+"""Compare the native and matplotlib chart renderers: render latency and worker RSS.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_chart [--repeat N] [--berries N]
+
+Each renderer's RSS (Linux /proc) is measured in a fresh interpreter after its
+first render, so module import cost (the main difference between the two) is
+attributed correctly.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from src.chart import render_chart
+
+RENDERERS = [
+    ("native", "png"),
+    ("native", "svg"),
+    ("matplotlib", "png"),
+    ("matplotlib", "svg"),
+]
+
+_RSS_PROBE = """
+import json, sys, time
+from collections import Counter
+
+def rss_kib():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+baseline = rss_kib()
+start = time.perf_counter()
+from src.chart import render_chart
+render_chart(Counter({k: v for k, v in json.loads(sys.argv[3])}), sys.argv[2], sys.argv[1])
+first_render = time.perf_counter() - start
+print(json.dumps({"baseline_rss_kib": baseline, "rss_kib": rss_kib(), "first_render_s": first_render}))
+"""
+
+
+def synthetic_frequency(berries: int, seed: int = 0) -> Counter[int]:
+    """Growth time frequencies shaped like PokeAPI's: small integers, few distinct values."""
+    rng = random.Random(seed)
+    return Counter(rng.choice([2, 3, 4, 5, 6, 8, 12, 15, 18, 24]) for _ in range(berries))
+
+
+def measure_latency(freq: Counter[int], backend: str, fmt: str, repeat: int) -> dict[str, float]:
+    render_chart(freq, fmt, backend)  # warm-up: imports and caches
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render_chart(freq, fmt, backend)
+        samples.append(time.perf_counter() - start)
+    return {
+        "mean_s": statistics.mean(samples),
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+    }
+
+
+def measure_rss(freq: Counter[int], backend: str, fmt: str) -> dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", _RSS_PROBE, backend, fmt, json.dumps(sorted(freq.items()))],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--berries", type=int, default=64)
+    args = parser.parse_args()
+
+    freq = synthetic_frequency(args.berries)
+    results = []
+    for backend, fmt in RENDERERS:
+        try:
+            latency = measure_latency(freq, backend, fmt, args.repeat)
+            rss = measure_rss(freq, backend, fmt)
+        except (ImportError, subprocess.CalledProcessError) as e:
+            results.append({"backend": backend, "format": fmt, "error": str(e)})
+            continue
+        results.append({"backend": backend, "format": fmt, **latency, **rss})
+
+    json.dump({"benchmark": "chart", "berries": args.berries, "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Time a full PokeAPI crawl against a synthetic upstream with fixed per-request latency.
+
+The upstream is an in-process httpx MockTransport, so no network is used.
+Each size is crawled cold, then re-crawled while the detail cache holds
+every berry, which measures the If-None-Match revalidation path. Requests
+go through the same client factory as the app (retries, hedging, breaker).
+Run from the repository root:
+
+    python -m benchmarks.bench_crawl [--sizes 64,1000,10000] [--latency-ms 5]
+        [--concurrency 10] [--page-size 100] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Any
+
+from benchmarks.synthetic import BASE_URL, SyntheticPokeApi, synthetic_berries
+from src.cache import MemoryCache
+from src.config import Settings
+from src.upstream_api import create_http_client, create_upstream_transport, fetch_berry_snapshot
+
+
+async def crawl(
+    api: SyntheticPokeApi, cache: MemoryCache, concurrency: int, page_size: int
+) -> dict[str, Any]:
+    """One forced crawl through a fresh client; wall time and upstream work done."""
+    settings = Settings(pokeapi_base_url=BASE_URL)
+    transport = create_upstream_transport(settings, api.transport())
+    client = create_http_client(settings, transport=transport)
+    requests, not_modified = api.requests, api.not_modified
+    try:
+        start = time.perf_counter()
+        snapshot = await fetch_berry_snapshot(
+            BASE_URL,
+            cache,
+            3600,
+            concurrency=concurrency,
+            client=client,
+            page_size=page_size,
+            max_pages=len(api.berries) // page_size + 1,
+            force_refresh=True,
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.aclose()
+    assert len(snapshot.dataset) == len(api.berries)
+    return {
+        "wall_s": elapsed,
+        "requests": api.requests - requests,
+        "not_modified": api.not_modified - not_modified,
+        "hedges": transport.stats.hedges,
+    }
+
+
+async def measure(
+    size: int, latency_seconds: float, concurrency: int, page_size: int, repeat: int
+) -> list[dict[str, Any]]:
+    api = SyntheticPokeApi(synthetic_berries(size), latency_seconds)
+    runs: dict[str, list[dict[str, Any]]] = {"cold": [], "revalidate": []}
+    for _ in range(repeat):
+        cache = MemoryCache(size + 16)
+        runs["cold"].append(await crawl(api, cache, concurrency, page_size))
+        runs["revalidate"].append(await crawl(api, cache, concurrency, page_size))
+
+    results = []
+    for mode, samples in runs.items():
+        wall = statistics.median(run["wall_s"] for run in samples)
+        results.append({
+            "mode": mode,
+            "berries": size,
+            "latency_ms": latency_seconds * 1000,
+            "concurrency": concurrency,
+            "page_size": page_size,
+            "wall_s": wall,
+            "berries_per_s": size / wall,
+            "requests": samples[-1]["requests"],
+            "not_modified": samples[-1]["not_modified"],
+            "hedges": sum(run["hedges"] for run in samples),
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="64,1000,10000")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        results.extend(asyncio.run(measure(
+            size, args.latency_ms / 1000, args.concurrency, args.page_size, args.repeat
+        )))
+
+    json.dump({"benchmark": "crawl", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Per-request JSON serialization cost: response_model path vs the fast path.
+
+Measures the encode step alone and a full in-process request through a
+FastAPI app, for the /allBerryStats document at several dataset sizes.
+Run from the repository root:
+
+    python -m benchmarks.bench_json [--sizes 64,1000,100000] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.synthetic import median_seconds, median_seconds_async, synthetic_snapshot
+from src.fastjson import FastJSONResponse, dumps
+from src.models import AllBerryStatsResponse
+from src.router import _all_berry_stats_document
+
+
+def _bench_app(document: dict[str, Any]) -> FastAPI:
+    """The old route (model + response_model) next to the fast one."""
+    app = FastAPI()
+
+    @app.get("/model", response_model=AllBerryStatsResponse)
+    async def model() -> AllBerryStatsResponse:
+        return AllBerryStatsResponse(**document)
+
+    @app.get("/fast", response_model=AllBerryStatsResponse)
+    async def fast() -> FastJSONResponse:
+        return FastJSONResponse(document)
+
+    return app
+
+
+async def _request_timings(document: dict[str, Any], repeat: int) -> dict[str, float]:
+    transport = httpx.ASGITransport(app=_bench_app(document))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        assert (await client.get("/model")).json() == (await client.get("/fast")).json()
+        return {
+            route: await median_seconds_async(lambda: client.get(f"/{route}"), repeat)
+            for route in ("model", "fast")
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="64,1000,100000")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        document = _all_berry_stats_document(synthetic_snapshot(size))
+        encoders: dict[str, Callable[[], bytes]] = {
+            "model+model_dump_json": lambda: AllBerryStatsResponse(**document).model_dump_json().encode(),
+            "json.dumps": lambda: json.dumps(document, separators=(",", ":")).encode(),
+            "orjson": lambda: dumps(document),
+        }
+        for name, encode in encoders.items():
+            results.append({
+                "path": name,
+                "berries": size,
+                "bytes": len(encode()),
+                "encode_s": median_seconds(encode, args.repeat),
+            })
+
+        requests = asyncio.run(_request_timings(document, args.repeat))
+        for route, seconds in requests.items():
+            results.append({
+                "path": f"request:{'response_model' if route == 'model' else 'FastJSONResponse'}",
+                "berries": size,
+                "request_s": seconds,
+            })
+
+    json.dump({"benchmark": "json", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare cache serializers for the berry dataset: payload size and dump/load time.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization [--sizes 64,1000,100000] [--repeat N]
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.synthetic import median_seconds, synthetic_snapshot
+from src.cache import CompactSerializer, PickleSerializer, Serializer
+
+SERIALIZERS: dict[str, Serializer] = {
+    "pickle": PickleSerializer(),
+    "compact": CompactSerializer(compress=False),
+    "compact+zlib": CompactSerializer(compress=True),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="64,1000,100000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        snapshot = synthetic_snapshot(size)
+        # Baseline: the pickled list of Berry models the cache used to store.
+        legacy = snapshot.berries
+        data = SERIALIZERS["pickle"].dumps(legacy)
+        results.append({
+            "serializer": "pickle:list[Berry]",
+            "berries": size,
+            "bytes": len(data),
+            "dumps_s": median_seconds(lambda: SERIALIZERS["pickle"].dumps(legacy), args.repeat),
+            "loads_s": median_seconds(lambda: SERIALIZERS["pickle"].loads(data), args.repeat),
+        })
+        for name, serializer in SERIALIZERS.items():
+            data = serializer.dumps(snapshot)
+            results.append({
+                "serializer": name,
+                "berries": size,
+                "bytes": len(data),
+                "dumps_s": median_seconds(lambda: serializer.dumps(snapshot), args.repeat),
+                "loads_s": median_seconds(lambda: serializer.loads(data), args.repeat),
+            })
+
+    json.dump({"benchmark": "serialization", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
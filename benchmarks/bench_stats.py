@@ -0,0 +1,78 @@
+"""Time the CPU-bound request paths: snapshot build, stats, grouping and chart rendering.
+
+Each operation runs against an already crawled synthetic dataset, so the
+numbers exclude upstream I/O (see bench_crawl for that). Run from the
+repository root:
+
+    python -m benchmarks.bench_stats [--sizes 64,1000,100000] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.synthetic import BASE_URL, median_seconds, synthetic_berries
+from src.cache import MemoryCache
+from src.chart import render_chart
+from src.dataset import AttributeSummary, BerrySnapshot
+from src.fastjson import dumps
+from src.router import _all_berry_stats_document
+from src.upstream_api import SNAPSHOT_CACHE_KEY, fetch_berry_data
+
+QUANTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+FILTERS = {"flavors": "sweet", "firmness": "soft"}
+
+
+def operations(snapshot: BerrySnapshot) -> dict[str, Callable[[], Any]]:
+    """Benchmarked operations by name, each a zero-argument callable."""
+    berries = snapshot.berries
+    dataset = snapshot.dataset
+    column = dataset.numeric["growth_time"]
+    cache = MemoryCache(4)
+    cache.set(SNAPSHOT_CACHE_KEY, snapshot, 3600)
+    loop = asyncio.new_event_loop()
+    freq = Counter(dataset.frequency("growth_time"))
+
+    return {
+        "snapshot_create": lambda: BerrySnapshot.create(berries),
+        "fetch_berry_data": lambda: loop.run_until_complete(fetch_berry_data(BASE_URL, cache, 3600)),
+        "summary": lambda: AttributeSummary.from_counts(Counter(column)),
+        "quantiles": lambda: [dataset.summary("growth_time").quantile(q) for q in QUANTILES],
+        "all_berry_stats": lambda: dumps(_all_berry_stats_document(snapshot)),
+        "grouped_filtered": lambda: dataset.grouped_summaries("growth_time", "natural_gift_type", FILTERS),
+        "render_native_png": lambda: render_chart(freq, "png", "native"),
+        "render_matplotlib_png": lambda: render_chart(freq, "png", "matplotlib"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="64,1000,100000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        snapshot = BerrySnapshot.create(synthetic_berries(size))
+        for name, fn in operations(snapshot).items():
+            try:
+                fn()  # warm-up: imports, lazily built caches
+            except ImportError as e:
+                results.append({"operation": name, "berries": size, "error": str(e)})
+                continue
+            results.append({
+                "operation": name,
+                "berries": size,
+                "median_s": median_seconds(fn, args.repeat),
+            })
+
+    json.dump({"benchmark": "stats", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
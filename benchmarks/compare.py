@@ -0,0 +1,111 @@
+"""Compare two benchmark reports written by `benchmarks.run` and flag regressions.
+
+Rows are matched by benchmark and their descriptive fields (operation,
+size, format, ...). Timings (`*_s`) and sizes (`bytes`) are compared as
+new / base; higher is worse. Run from the repository root:
+
+    python -m benchmarks.compare BASE.json NEW.json [--threshold 0.10] [--fail]
+
+With `--fail` the exit status is 1 when any metric regressed by more than
+the threshold, so the comparison can gate a CI job.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any
+
+Key = tuple[str, tuple[tuple[str, Any], ...]]
+
+# Per-run measurements that are neither row identity nor compared metrics.
+MEASURED = {
+    "requests",
+    "not_modified",
+    "hedges",
+    "berries_per_s",
+    "baseline_rss_kib",
+    "rss_kib",
+    "errors",
+    "statuses",
+    "throughput_rps",
+    "upstream_requests",
+    "upstream_list_requests",
+    "upstream_not_modified",
+    "upstream_errors",
+}
+
+
+def _is_metric(field: str) -> bool:
+    return field not in MEASURED and (field.endswith("_s") or field == "bytes")
+
+
+def index_rows(report: dict[str, Any]) -> dict[Key, dict[str, float]]:
+    """(benchmark, descriptive fields) -> metrics, for every result row."""
+    rows = {}
+    for benchmark in report["benchmarks"]:
+        for row in benchmark.get("results", []):
+            if "error" in row:
+                continue
+            identity = tuple(
+                sorted(
+                    (field, value)
+                    for field, value in row.items()
+                    if not _is_metric(field) and field not in MEASURED
+                )
+            )
+            metrics = {field: value for field, value in row.items() if _is_metric(field)}
+            rows[(benchmark["benchmark"], identity)] = metrics
+    return rows
+
+
+def compare(
+    base: dict[str, Any], new: dict[str, Any], threshold: float
+) -> tuple[list[str], int]:
+    """Report lines for every metric present in both reports, and the regression count."""
+    base_rows, new_rows = index_rows(base), index_rows(new)
+    lines, regressions = [], 0
+    for key in sorted(base_rows.keys() & new_rows.keys(), key=repr):
+        name, identity = key
+        label = " ".join(f"{field}={value}" for field, value in identity)
+        for metric, before in base_rows[key].items():
+            after = new_rows[key].get(metric)
+            if after is None or not before:
+                continue
+            ratio = after / before
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif ratio < 1 - threshold:
+                flag = "  improved"
+            lines.append(f"{name:<14} {label:<60} {metric:<10} {before:>12.6g} -> {after:<12.6g} x{ratio:.2f}{flag}")
+    for key in sorted(base_rows.keys() - new_rows.keys(), key=repr):
+        lines.append(f"{key[0]:<14} only in base: {dict(key[1])}")
+    for key in sorted(new_rows.keys() - base_rows.keys(), key=repr):
+        lines.append(f"{key[0]:<14} only in new: {dict(key[1])}")
+    return lines, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change to report")
+    parser.add_argument("--fail", action="store_true", help="exit 1 on any regression")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"base {base.get('commit')}  new {new.get('commit')}")
+    lines, regressions = compare(base, new, args.threshold)
+    print("\n".join(lines))
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    if args.fail and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
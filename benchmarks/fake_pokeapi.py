@@ -0,0 +1,116 @@
+"""Local PokeAPI stand-in served over HTTP, for load tests without network access.
+
+Serves the paginated berry list (`/api/v2/berry/?offset=&limit=`) and berry
+details (`/api/v2/berry/{id}/`) for a synthetic dataset, with injectable
+latency and error rate. Two control endpoints sit outside the API:
+
+    GET  /_stats                                        request counters as JSON
+    POST /_faults?latency_ms=&jitter_ms=&error_rate=    change faults while running
+
+Run from the repository root, then point the app at it:
+
+    python -m benchmarks.fake_pokeapi [--port 8081] [--berries 64] [--latency-ms 50]
+        [--jitter-ms 0] [--error-rate 0]
+    POKEAPI_BASE_URL=http://127.0.0.1:8081/api/v2 uvicorn src.main:app
+"""
+
+import argparse
+import json
+from typing import Any
+from urllib.parse import parse_qsl
+
+from benchmarks.synthetic import SyntheticPokeApi, synthetic_berries
+
+
+class FakePokeApiServer:
+    """ASGI application serving a SyntheticPokeApi under `/api/v2`."""
+
+    def __init__(self, api: SyntheticPokeApi):
+        self.api = api
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+        params = dict(parse_qsl(scope["query_string"].decode()))
+        headers = {key.decode().lower(): value.decode() for key, value in scope["headers"]}
+        path = scope["path"]
+        if path == "/_stats":
+            status, body, extra = 200, self.stats(), {}
+        elif path == "/_faults" and scope["method"] == "POST":
+            self.set_faults(params)
+            status, body, extra = 200, self.stats(), {}
+        elif scope["method"] != "GET":
+            status, body, extra = 405, {"detail": "Method not allowed."}, {}
+        else:
+            status, body, extra = await self.api.serve(path, params, headers)
+
+        payload = b"" if body is None else json.dumps(body).encode()
+        response_headers = [(key.lower().encode(), value.encode()) for key, value in extra.items()]
+        if body is not None:
+            response_headers.append((b"content-type", b"application/json"))
+        response_headers.append((b"content-length", str(len(payload)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": payload})
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "berries": len(self.api.berries),
+            "requests": self.api.requests,
+            "list_requests": self.api.list_requests,
+            "not_modified": self.api.not_modified,
+            "errors": self.api.errors,
+            "latency_ms": self.api.latency_seconds * 1000,
+            "jitter_ms": self.api.jitter_seconds * 1000,
+            "error_rate": self.api.error_rate,
+        }
+
+    def set_faults(self, params: dict[str, str]) -> None:
+        if "latency_ms" in params:
+            self.api.latency_seconds = float(params["latency_ms"]) / 1000
+        if "jitter_ms" in params:
+            self.api.jitter_seconds = float(params["jitter_ms"]) / 1000
+        if "error_rate" in params:
+            self.api.error_rate = float(params["error_rate"])
+
+
+def create_server(
+    berries: int, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, base_url: str = ""
+) -> FakePokeApiServer:
+    api = SyntheticPokeApi(
+        synthetic_berries(berries),
+        latency_seconds=latency_ms / 1000,
+        base_url=base_url,
+        jitter_seconds=jitter_ms / 1000,
+        error_rate=error_rate,
+    )
+    return FakePokeApiServer(api)
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--berries", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = create_server(
+        args.berries,
+        args.latency_ms,
+        args.jitter_ms,
+        args.error_rate,
+        base_url=f"http://{args.host}:{args.port}/api/v2",
+    )
+    uvicorn.run(server, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""End-to-end load test: the real app under uvicorn against a local fake PokeAPI.
+
+Starts `benchmarks.fake_pokeapi` and `uvicorn src.main:app` as local
+processes (no network, no Redis: the in-process cache only) and drives
+`/allBerryStats` and `/histogram` with concurrent clients. Scenarios:
+
+    cold        fresh app per run, one burst of concurrent requests on an empty cache
+    warm        sustained load on a primed cache
+    expiry      sustained load on a short hard TTL: every expiry stalls requests on a re-crawl
+    expiry_swr  same TTL with stale-while-revalidate at half of it: re-crawls in the background
+
+Reports p50/p95/p99 latency and throughput per scenario and endpoint, plus
+the upstream requests each scenario caused, as JSON in the same report
+shape as `benchmarks.run` (so `benchmarks.compare` works on it). Run from
+the repository root:
+
+    python -m benchmarks.loadtest [--scenarios cold,warm,expiry,expiry_swr]
+        [--concurrency 32] [--duration 10] [--berries 64] [--upstream-latency-ms 50]
+        [--upstream-error-rate 0] [--storm-ttl 4] [--workers 1] [--output FILE]
+
+The load generator is a single asyncio process sharing the box with the
+app; at high request rates it can saturate first, so check its CPU use
+before reading a throughput ceiling as the app's.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from benchmarks.run import _git_commit
+
+ENDPOINTS = {
+    "allBerryStats": ("/allBerryStats", {}),
+    "histogram": ("/histogram", {"format": "png"}),
+}
+
+SCENARIOS = ("cold", "warm", "expiry", "expiry_swr")
+
+
+@dataclass
+class Samples:
+    """Latencies and outcomes of one endpoint's requests in one scenario."""
+
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter[str] = field(default_factory=Counter)
+
+    def add(self, seconds: float, status: str) -> None:
+        self.latencies.append(seconds)
+        self.statuses[status] += 1
+
+    def summary(self, wall_seconds: float) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+        errors = sum(count for status, count in self.statuses.items() if not status.startswith(("2", "3")))
+        return {
+            "requests": len(ordered),
+            "errors": errors,
+            "statuses": dict(self.statuses),
+            "throughput_rps": len(ordered) / wall_seconds if wall_seconds else 0.0,
+            "p50_s": _percentile(ordered, 50),
+            "p95_s": _percentile(ordered, 95),
+            "p99_s": _percentile(ordered, 99),
+            "mean_s": sum(ordered) / len(ordered) if ordered else None,
+            "max_s": ordered[-1] if ordered else None,
+        }
+
+
+def _percentile(ordered: list[float], percentile: float) -> float | None:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * percentile // 100))
+    return ordered[int(rank) - 1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _process(command: list[str], ready_url: str, env: dict[str, str] | None = None) -> Iterator[None]:
+    """Run `command` until the block exits, once `ready_url` answers."""
+    process = subprocess.Popen(command, env={**os.environ, **(env or {})})
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"{command[2]} exited with status {process.returncode}")
+            try:
+                if httpx.get(ready_url, timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{command[2]} did not become ready")
+            time.sleep(0.1)
+        yield
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@contextmanager
+def app_server(upstream_url: str, workers: int, settings: dict[str, str]) -> Iterator[str]:
+    """The real app under uvicorn, configured through environment variables like in production."""
+    port = _free_port()
+    env = {
+        "POKEAPI_BASE_URL": f"{upstream_url}/api/v2",
+        "REDIS_URL": "",
+        "CACHE_WARMUP_ENABLED": "false",
+        "CACHE_REFRESH_ENABLED": "false",
+        **settings,
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "src.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    url = f"http://127.0.0.1:{port}"
+    with _process(command, f"{url}/health", env):
+        yield url
+
+
+async def _request(client: httpx.AsyncClient, endpoint: str, samples: dict[str, Samples]) -> None:
+    path, params = ENDPOINTS[endpoint]
+    start = time.perf_counter()
+    try:
+        response = await client.get(path, params=params)
+        await response.aread()
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    samples[endpoint].add(time.perf_counter() - start, status)
+
+
+async def burst(url: str, concurrency: int, samples: dict[str, Samples]) -> float:
+    """`concurrency` simultaneous requests, split across the endpoints; returns wall time."""
+    names = list(ENDPOINTS)
+    async with _client(url, concurrency) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _request(client, names[i % len(names)], samples) for i in range(concurrency)
+        ))
+        return time.perf_counter() - start
+
+
+async def sustained(url: str, concurrency: int, duration: float, samples: dict[str, Samples]) -> float:
+    """Closed-loop load: each client sends its next request as soon as the last one returns."""
+    names = list(ENDPOINTS)
+
+    async def client_loop(client: httpx.AsyncClient, offset: int) -> None:
+        i = offset
+        while time.perf_counter() < deadline:
+            await _request(client, names[i % len(names)], samples)
+            i += 1
+
+    async with _client(url, concurrency) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(client_loop(client, i) for i in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def _client(url: str, concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(base_url=url, limits=limits, timeout=60)
+
+
+def _prime(url: str, attempts: int = 10) -> None:
+    """Fill the caches; at high injected error rates a crawl may take several attempts."""
+    for path, params in ENDPOINTS.values():
+        for _ in range(attempts):
+            if httpx.get(f"{url}{path}", params=params, timeout=60).status_code == 200:
+                break
+        else:
+            raise RuntimeError(f"{path} did not succeed in {attempts} attempts; lower --upstream-error-rate")
+
+
+def run_scenario(name: str, args: argparse.Namespace, upstream_url: str) -> list[dict[str, Any]]:
+    samples = {endpoint: Samples() for endpoint in ENDPOINTS}
+    upstream_before = httpx.get(f"{upstream_url}/_stats").json()
+    settings: dict[str, str] = {}
+    if name.startswith("expiry"):
+        soft_ttl = args.storm_ttl // 2 if name == "expiry_swr" else args.storm_ttl  # soft >= hard: no SWR
+        settings = {
+            "CACHE_TTL_SECONDS": str(args.storm_ttl),
+            "CACHE_SOFT_TTL_SECONDS": str(max(1, soft_ttl)),
+        }
+
+    if name == "cold":
+        wall = 0.0
+        for _ in range(args.cold_runs):
+            with app_server(upstream_url, args.workers, settings) as url:
+                wall += asyncio.run(burst(url, args.concurrency, samples))
+    else:
+        with app_server(upstream_url, args.workers, settings) as url:
+            _prime(url)
+            wall = asyncio.run(sustained(url, args.concurrency, args.duration, samples))
+
+    upstream_after = httpx.get(f"{upstream_url}/_stats").json()
+    upstream = {
+        f"upstream_{key}": upstream_after[key] - upstream_before[key]
+        for key in ("requests", "list_requests", "not_modified", "errors")
+    }
+    return [
+        {
+            "scenario": name,
+            "endpoint": endpoint,
+            "concurrency": args.concurrency,
+            "berries": args.berries,
+            "wall_s": wall,
+            **samples[endpoint].summary(wall),
+            **upstream,
+        }
+        for endpoint in ENDPOINTS
+    ]
+
+
+def _print_table(results: list[dict[str, Any]]) -> None:
+    print(f"{'scenario':<11} {'endpoint':<14} {'reqs':>6} {'errs':>5} {'rps':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'upstream':>9}", file=sys.stderr)
+    for row in results:
+        ms = [f"{row[key] * 1000:8.1f}" if row[key] is not None else f"{'-':>8}" for key in ("p50_s", "p95_s", "p99_s")]
+        print(f"{row['scenario']:<11} {row['endpoint']:<14} {row['requests']:>6} {row['errors']:>5} "
+              f"{row['throughput_rps']:>8.1f} {' '.join(ms)} {row['upstream_requests']:>9}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of sustained load")
+    parser.add_argument("--cold-runs", type=int, default=3, help="fresh app starts in the cold scenario")
+    parser.add_argument("--berries", type=int, default=64)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--storm-ttl", type=int, default=4, help="cache TTL seconds in expiry scenarios")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",")
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    upstream_url = f"http://127.0.0.1:{_free_port()}"
+    port = upstream_url.rsplit(":", 1)[1]
+    fake = [
+        sys.executable, "-m", "benchmarks.fake_pokeapi", "--port", port,
+        "--berries", str(args.berries),
+        "--latency-ms", str(args.upstream_latency_ms),
+        "--jitter-ms", str(args.upstream_jitter_ms),
+        "--error-rate", str(args.upstream_error_rate),
+    ]
+    results = []
+    with _process(fake, f"{upstream_url}/_stats"):
+        for name in scenarios:
+            print(f"running {name}...", file=sys.stderr)
+            results.extend(run_scenario(name, args, upstream_url))
+    _print_table(results)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "upstream": {
+            "latency_ms": args.upstream_latency_ms,
+            "jitter_ms": args.upstream_jitter_ms,
+            "error_rate": args.upstream_error_rate,
+        },
+        "benchmarks": [{"benchmark": "loadtest", "results": results}],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
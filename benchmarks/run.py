@@ -0,0 +1,90 @@
+"""Run the benchmark suite and write one JSON report for comparing commits.
+
+Each benchmark runs in its own interpreter so imports and caches of one do
+not skew another. The report records the commit, interpreter and host it
+was measured on. Run from the repository root:
+
+    python -m benchmarks.run [--sizes 64,1000,100000] [--only stats,crawl] [--output FILE]
+
+Compare two reports with `python -m benchmarks.compare BASE.json NEW.json`.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Any
+
+# Benchmark name -> (module, accepts --sizes)
+BENCHMARKS: dict[str, tuple[str, bool]] = {
+    "stats": ("benchmarks.bench_stats", True),
+    "serialization": ("benchmarks.bench_serialization", True),
+    "json": ("benchmarks.bench_json", True),
+    "crawl": ("benchmarks.bench_crawl", True),
+    "chart": ("benchmarks.bench_chart", False),
+}
+
+# Crawls issue one request per berry, so they stop short of the largest sizes.
+MAX_CRAWL_SIZE = 10_000
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_benchmark(name: str, sizes: list[int]) -> dict[str, Any]:
+    module, takes_sizes = BENCHMARKS[name]
+    command = [sys.executable, "-m", module]
+    if takes_sizes:
+        if name == "crawl":
+            sizes = [size for size in sizes if size <= MAX_CRAWL_SIZE] or [min(sizes)]
+        command += ["--sizes", ",".join(map(str, sizes))]
+    print(f"running {name}...", file=sys.stderr)
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"benchmark": name, "error": result.stderr.strip().splitlines()[-1:], "results": []}
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="64,1000,100000")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="comma-separated benchmark names")
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    names = args.only.split(",")
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "sizes": sizes,
+        "benchmarks": [run_benchmark(name, sizes) for name in names],
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+
+from src.dataset import BerrySnapshot
+from src.models import Berry
+
+BASE_URL = "https://pokeapi.test/api/v2"
+
+GROWTH_TIMES = [2, 3, 4, 5, 6, 8, 12, 15, 18, 24]
+FIRMNESSES = ["very-soft", "soft", "hard", "very-hard", "super-hard"]
+GIFT_TYPES = ["fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground"]
+FLAVORS = ["spicy", "dry", "sweet", "bitter", "sour"]
+
+
+def synthetic_berries(count: int, seed: int = 0) -> list[Berry]:
+    """Berries shaped like PokeAPI's: unique names, small-integer attributes."""
+    rng = random.Random(seed)
+    return [
+        Berry(
+            name=f"berry-{i}",
+            growth_time=rng.choice(GROWTH_TIMES),
+            max_harvest=rng.choice([5, 10, 15]),
+            natural_gift_power=rng.choice([60, 70, 80, 100]),
+            size=rng.randint(20, 300),
+            smoothness=rng.choice([20, 25, 30, 35, 40, 60]),
+            soil_dryness=rng.choice([4, 6, 7, 8, 10, 15, 35]),
+            firmness=rng.choice(FIRMNESSES),
+            natural_gift_type=rng.choice(GIFT_TYPES),
+            flavors=rng.sample(FLAVORS, rng.randint(1, 3)),
+        )
+        for i in range(count)
+    ]
+
+
+def synthetic_snapshot(count: int, seed: int = 0) -> BerrySnapshot:
+    return BerrySnapshot.create(synthetic_berries(count, seed))
+
+
+def median_seconds(fn: Callable[[], Any], repeat: int) -> float:
+    """Median wall time of `repeat` calls to `fn`."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def median_seconds_async(fn: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """Median wall time of `repeat` awaited calls to `fn`."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def pokeapi_detail(berry: Berry, berry_id: int, base_url: str = BASE_URL) -> dict[str, Any]:
+    """The PokeAPI berry detail document for `berry`, named resources and all."""
+    return {
+        "id": berry_id,
+        **berry.model_dump(exclude={"firmness", "natural_gift_type", "flavors"}),
+        "firmness": {"name": berry.firmness, "url": f"{base_url}/berry-firmness/1/"},
+        "natural_gift_type": {"name": berry.natural_gift_type, "url": f"{base_url}/type/1/"},
+        "flavors": [
+            {
+                "potency": 10 if flavor in berry.flavors else 0,
+                "flavor": {"name": flavor, "url": f"{base_url}/berry-flavor/{FLAVORS.index(flavor) + 1}/"},
+            }
+            for flavor in [*berry.flavors, *(f for f in FLAVORS if f not in berry.flavors)]
+        ],
+        "item": {"name": f"{berry.name}-item", "url": f"{base_url}/item/{berry_id}/"},
+    }
+
+
+def pokeapi_list_page(
+    berries: list[Berry], offset: int, limit: int, base_url: str = BASE_URL
+) -> dict[str, Any]:
+    """One page of the PokeAPI berry list, honouring offset/limit."""
+    end = min(offset + limit, len(berries))
+    return {
+        "count": len(berries),
+        "next": f"{base_url}/berry/?offset={end}&limit={limit}" if end < len(berries) else None,
+        "previous": None,
+        "results": [
+            {"name": berries[i].name, "url": f"{base_url}/berry/{i + 1}/"}
+            for i in range(offset, end)
+        ],
+    }
+
+
+class SyntheticPokeApi:
+    """Offline stand-in for PokeAPI's berry endpoints with injectable latency and errors.
+
+    Every request waits `latency_seconds` plus up to `jitter_seconds`, then
+    fails with a 503 with probability `error_rate`. Detail responses carry an
+    ETag and answer a matching If-None-Match with 304, like PokeAPI's CDN,
+    so revalidating crawls can be measured too.
+    """
+
+    def __init__(
+        self,
+        berries: list[Berry],
+        latency_seconds: float = 0.0,
+        base_url: str = BASE_URL,
+        jitter_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.berries = berries
+        self.latency_seconds = latency_seconds
+        self.base_url = base_url
+        self.jitter_seconds = jitter_seconds
+        self.error_rate = error_rate
+        self.requests = 0
+        self.list_requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        status, body, headers = await self.serve(request.url.path, request.url.params, request.headers)
+        if body is None:
+            return httpx.Response(status, headers=headers)
+        return httpx.Response(status, json=body, headers=headers)
+
+    async def serve(
+        self, path: str, params: Any, headers: Any
+    ) -> tuple[int, dict[str, Any] | None, dict[str, str]]:
+        """Answer a GET of `path` after the configured latency, or fail at the error rate."""
+        self.requests += 1
+        delay = self.latency_seconds + self._rng.uniform(0, self.jitter_seconds)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return 503, {"detail": "Injected failure."}, {}
+        return self.respond(path, params, headers)
+
+    def respond(
+        self, path: str, params: Any, headers: Any
+    ) -> tuple[int, dict[str, Any] | None, dict[str, str]]:
+        """(status, JSON body or None, headers) for a GET of `path`."""
+        segments = [segment for segment in path.split("/") if segment]
+        if segments[-1:] == ["berry"]:
+            self.list_requests += 1
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 20))
+            return 200, pokeapi_list_page(self.berries, offset, limit, self.base_url), {}
+        if segments[-2:-1] == ["berry"] and segments[-1].isdigit() and 0 < int(segments[-1]) <= len(self.berries):
+            berry_id = int(segments[-1])
+            etag = f'"berry-{berry_id}"'
+            if headers.get("if-none-match") == etag:
+                self.not_modified += 1
+                return 304, None, {"ETag": etag}
+            berry = self.berries[berry_id - 1]
+            return 200, pokeapi_detail(berry, berry_id, self.base_url), {"ETag": etag}
+        return 404, {"detail": "Not found."}, {}
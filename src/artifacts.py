@@ -0,0 +1,56 @@
+from collections.abc import Awaitable, Callable
+
+from src.cache import AnyCacheBackend, cache_delete, cache_get, cache_set
+from src.compression import SUFFIXES
+from src.singleflight import SingleFlight
+
+# Every artifact derived from a dataset snapshot; dropped together on change.
+ARTIFACT_KINDS = ("stats.json", "histogram.png", "histogram.svg")
+
+artifacts_flight = SingleFlight()
+
+
+def encoded_kind(kind: str, encoding: str) -> str:
+    """Artifact kind of the `encoding` variant of `kind`, e.g. stats.json.gz."""
+    return f"{kind}.{SUFFIXES[encoding]}"
+
+
+def artifact_key(kind: str, version: str) -> str:
+    """Cache key of a derived artifact for one dataset version."""
+    return f"artifacts:{version}:{kind}"
+
+
+async def get_or_build_artifact(
+    cache: AnyCacheBackend | None,
+    kind: str,
+    version: str,
+    ttl: int,
+    build: Callable[[], Awaitable[bytes]],
+) -> bytes:
+    """Return the cached bytes for (kind, version), building and storing them on a miss.
+
+    Concurrent misses for the same key share one build, so a burst after a
+    version change renders or compresses each artifact once.
+    """
+    if cache is None:
+        return await build()
+
+    key = artifact_key(kind, version)
+    cached = await cache_get(cache, key)
+    if cached is not None:
+        return cached
+
+    async def build_and_store() -> bytes:
+        body = await build()
+        await cache_set(cache, key, body, ttl)
+        return body
+
+    return await artifacts_flight.do(key, build_and_store)
+
+
+async def invalidate_artifacts(cache: AnyCacheBackend, version: str) -> None:
+    """Drop every derived artifact of a superseded dataset version, encoded variants included."""
+    for kind in ARTIFACT_KINDS:
+        await cache_delete(cache, artifact_key(kind, version))
+        for encoding in SUFFIXES:
+            await cache_delete(cache, artifact_key(encoded_kind(kind, encoding), version))
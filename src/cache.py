@@ -1,8 +1,173 @@
 import pickle
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any
 from abc import ABC, abstractmethod
 
 import redis
+import redis.asyncio
+
+from src.metrics import SIZE_BUCKETS, Histogram
+
+from src.dataset import BerrySnapshot, CrawlStats, decode_columns, encode_columns
+
+
+class SerializationError(Exception):
+    """Raised when cached bytes cannot be decoded, e.g. written by an incompatible version."""
+    pass
+
+
+class Serializer(ABC):
+    """Converts cache values to bytes and back."""
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value for storage."""
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Decode stored bytes; raises SerializationError if they cannot be used."""
+        pass
+
+
+class PickleSerializer(Serializer):
+    """Plain pickle of any value."""
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class CompactSerializer(Serializer):
+    """Versioned binary format with a columnar layout for dataset snapshots.
+
+    Every value starts with a header: magic, schema version, type tag and
+    flags. BerrySnapshot values are stored column by column (names joined,
+    one packed int32 array per integer attribute); raw bytes are stored
+    as-is; anything else falls back to pickle. Payloads of at least
+    `compress_min_size` bytes are zlib-compressed when `compress` is set.
+    Bytes written under another schema version decode as SerializationError.
+    """
+
+    MAGIC = b"PKB"
+    SCHEMA_VERSION = 1
+    HEADER = struct.Struct("<3sBBB")
+
+    TAG_BYTES = 0
+    TAG_PICKLE = 1
+    TAG_SNAPSHOT = 2
+
+    FLAG_ZLIB = 1
+
+    def __init__(self, compress: bool = True, compress_min_size: int = 1024, level: int = 6):
+        self.compress = compress
+        self.compress_min_size = compress_min_size
+        self.level = level
+
+    def dumps(self, value: Any) -> bytes:
+        if isinstance(value, bytes):
+            tag, payload = self.TAG_BYTES, value
+        elif isinstance(value, BerrySnapshot):
+            tag, payload = self.TAG_SNAPSHOT, _pack_snapshot(value)
+        else:
+            tag, payload = self.TAG_PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        flags = 0
+        if self.compress and len(payload) >= self.compress_min_size:
+            payload = zlib.compress(payload, self.level)
+            flags |= self.FLAG_ZLIB
+        return self.HEADER.pack(self.MAGIC, self.SCHEMA_VERSION, tag, flags) + payload
+
+    def loads(self, data: bytes) -> Any:
+        if len(data) < self.HEADER.size:
+            raise SerializationError("Truncated cache value")
+        magic, version, tag, flags = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC or version != self.SCHEMA_VERSION:
+            raise SerializationError(f"Unsupported cache format {magic!r} v{version}")
+
+        payload = memoryview(data)[self.HEADER.size:]
+        if flags & self.FLAG_ZLIB:
+            payload = memoryview(zlib.decompress(payload))
+
+        if tag == self.TAG_BYTES:
+            return bytes(payload)
+        if tag == self.TAG_SNAPSHOT:
+            return _unpack_snapshot(payload)
+        if tag == self.TAG_PICKLE:
+            return pickle.loads(payload)
+        raise SerializationError(f"Unknown cache value tag {tag}")
+
+
+def _pack_snapshot(snapshot: BerrySnapshot) -> bytes:
+    """Columnar encoding: metadata, then one length-prefixed block per dataset column."""
+    stats = snapshot.crawl_stats
+    columns = encode_columns(snapshot.dataset)
+    parts = [
+        struct.pack(
+            "<dIqq",
+            snapshot.fetched_at,
+            len(snapshot.dataset),
+            stats.reused if stats else -1,
+            stats.downloaded if stats else -1,
+        ),
+        _pack_blob(snapshot.version.encode()),
+        struct.pack("<H", len(columns)),
+    ]
+    for name, kind, block in columns:
+        parts += [_pack_blob(name.encode()), struct.pack("<B", kind), _pack_blob(block)]
+    return b"".join(parts)
+
+
+def _unpack_snapshot(payload: memoryview) -> BerrySnapshot:
+    fetched_at, count, reused, downloaded = struct.unpack_from("<dIqq", payload)
+    offset = struct.calcsize("<dIqq")
+    version, offset = _unpack_blob(payload, offset)
+    (column_count,) = struct.unpack_from("<H", payload, offset)
+    offset += 2
+
+    columns = []
+    for _ in range(column_count):
+        name_bytes, offset = _unpack_blob(payload, offset)
+        kind = payload[offset]
+        offset += 1
+        block, offset = _unpack_blob(payload, offset)
+        columns.append((bytes(name_bytes).decode(), kind, block))
+    try:
+        dataset = decode_columns(columns, count)
+    except ValueError as e:
+        raise SerializationError(f"Cached snapshot {e}") from e
+
+    return BerrySnapshot(
+        dataset=dataset,
+        fetched_at=fetched_at,
+        version=bytes(version).decode(),
+        crawl_stats=CrawlStats(reused, downloaded) if reused >= 0 else None,
+    )
+
+
+def _pack_blob(data: bytes) -> bytes:
+    return struct.pack("<I", len(data)) + data
+
+
+def _unpack_blob(payload: memoryview, offset: int) -> tuple[memoryview, int]:
+    (length,) = struct.unpack_from("<I", payload, offset)
+    start = offset + 4
+    return payload[start:start + length], start + length
+
+
+def create_serializer(name: str = "pickle", compress: bool = False) -> Serializer:
+    """Factory: "compact" for CompactSerializer, "pickle" for PickleSerializer."""
+    if name == "compact":
+        return CompactSerializer(compress=compress)
+    if name == "pickle":
+        return PickleSerializer()
+    raise ValueError(f"Unknown cache serializer: {name}")
 
 
 class CacheBackend(ABC):
@@ -18,6 +183,10 @@ class CacheBackend(ABC):
         """Set value in cache with TTL in seconds."""
         pass
 
+    def get_with_ttl(self, key: str) -> tuple[Any | None, float | None]:
+        """Get value and its remaining TTL in seconds; None when unknown or unlimited."""
+        return self.get(key), None
+
     @abstractmethod
     def delete(self, key: str) -> None:
         """Delete key from cache."""
@@ -29,10 +198,89 @@ class CacheBackend(ABC):
         pass
 
 
-class RedisCache(CacheBackend):
+class AsyncCacheBackend(ABC):
+    """Abstract cache backend interface for non-blocking backends."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        """Get value from cache."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        """Set value in cache with TTL in seconds."""
+        pass
+
+    async def get_with_ttl(self, key: str) -> tuple[Any | None, float | None]:
+        """Get value and its remaining TTL in seconds; None when unknown or unlimited."""
+        return await self.get(key), None
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete key from cache."""
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Clear all cache entries."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release backend resources."""
+        pass
+
+
+AnyCacheBackend = CacheBackend | AsyncCacheBackend
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for one cache tier; errors are failed backend calls."""
+
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+
+
+class RedisCodec:
+    """Serialization for the Redis backends, measuring payload size and codec time.
+
+    Backend errors are still swallowed so a Redis outage degrades to cache
+    misses, but every one is counted in `stats.errors`.
+    """
+
+    def __init__(self, serializer: Serializer | None):
+        self.serializer = serializer or PickleSerializer()
+        self.stats = CacheStats()
+        self.payload_bytes = Histogram(SIZE_BUCKETS)  # by operation: get, set
+        self.codec_seconds = Histogram()  # by operation: loads, dumps
+
+    def _loads(self, data: bytes) -> Any:
+        self.payload_bytes.observe(len(data), "get")
+        start = time.perf_counter()
+        try:
+            return self.serializer.loads(data)
+        finally:
+            self.codec_seconds.observe(time.perf_counter() - start, "loads")
+
+    @staticmethod
+    def _remaining_seconds(pttl: int) -> float | None:
+        """PTTL reply as seconds; negative replies mean no expiry or no key."""
+        return pttl / 1000 if pttl >= 0 else None
+
+    def _dumps(self, value: Any) -> bytes:
+        start = time.perf_counter()
+        data = self.serializer.dumps(value)
+        self.codec_seconds.observe(time.perf_counter() - start, "dumps")
+        self.payload_bytes.observe(len(data), "set")
+        return data
+
+
+class RedisCache(RedisCodec, CacheBackend):
     """Redis-based cache with TTL support."""
 
-    def __init__(self, redis_url: str):
+    def __init__(self, redis_url: str, serializer: Serializer | None = None):
+        super().__init__(serializer)
         self.client = redis.from_url(redis_url)
 
     def get(self, key: str) -> Any | None:
@@ -40,39 +288,284 @@ class RedisCache(CacheBackend):
         try:
             data = self.client.get(key)
             if data is None:
+                self.stats.misses += 1
                 return None
-            return pickle.loads(data)
+            value = self._loads(data)
         except Exception:
+            self.stats.errors += 1
             return None
+        self.stats.hits += 1
+        return value
+
+    def get_with_ttl(self, key: str) -> tuple[Any | None, float | None]:
+        """GET and PTTL in one round trip."""
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                data, pttl = pipe.execute()
+            if data is None:
+                self.stats.misses += 1
+                return None, None
+            value = self._loads(data)
+        except Exception:
+            self.stats.errors += 1
+            return None, None
+        self.stats.hits += 1
+        return value, self._remaining_seconds(pttl)
 
     def set(self, key: str, value: Any, ttl: int) -> None:
         """Set value in Redis cache with TTL in seconds."""
         try:
-            serialized = pickle.dumps(value)
-            self.client.setex(key, ttl, serialized)
+            self.client.setex(key, ttl, self._dumps(value))
         except Exception:
-            pass
+            self.stats.errors += 1
 
     def delete(self, key: str) -> None:
         """Delete key from Redis cache."""
         try:
             self.client.delete(key)
         except Exception:
-            pass
+            self.stats.errors += 1
 
     def clear(self) -> None:
         """Clear all cache entries."""
         try:
             self.client.flushdb()
+        except Exception:
+            self.stats.errors += 1
+
+
+class AsyncRedisCache(RedisCodec, AsyncCacheBackend):
+    """Redis-based cache on redis.asyncio; never blocks the event loop."""
+
+    def __init__(self, redis_url: str, serializer: Serializer | None = None):
+        super().__init__(serializer)
+        self.pool = redis.asyncio.ConnectionPool.from_url(redis_url)
+        self.client = redis.asyncio.Redis(connection_pool=self.pool)
+
+    async def get(self, key: str) -> Any | None:
+        """Get value from Redis cache, returns None if missing or expired."""
+        try:
+            data = await self.client.get(key)
+            if data is None:
+                self.stats.misses += 1
+                return None
+            value = self._loads(data)
+        except Exception:
+            self.stats.errors += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    async def get_with_ttl(self, key: str) -> tuple[Any | None, float | None]:
+        """GET and PTTL in one round trip."""
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                data, pttl = await pipe.execute()
+            if data is None:
+                self.stats.misses += 1
+                return None, None
+            value = self._loads(data)
+        except Exception:
+            self.stats.errors += 1
+            return None, None
+        self.stats.hits += 1
+        return value, self._remaining_seconds(pttl)
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        """Set value in Redis cache with TTL in seconds."""
+        try:
+            await self.client.setex(key, ttl, self._dumps(value))
+        except Exception:
+            self.stats.errors += 1
+
+    async def delete(self, key: str) -> None:
+        """Delete key from Redis cache."""
+        try:
+            await self.client.delete(key)
+        except Exception:
+            self.stats.errors += 1
+
+    async def clear(self) -> None:
+        """Clear all cache entries."""
+        try:
+            await self.client.flushdb()
+        except Exception:
+            self.stats.errors += 1
+
+    async def aclose(self) -> None:
+        """Close the client and disconnect the shared connection pool."""
+        try:
+            await self.client.aclose()
+            await self.pool.disconnect()
         except Exception:
             pass
 
 
-def create_cache(redis_url: str | None) -> CacheBackend | None:
-    """Factory: create a cache backend from a Redis URL, or None if unavailable."""
-    if redis_url is None:
-        return None
-    try:
-        return RedisCache(redis_url)
-    except Exception:
-        return None
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL and a bounded number of entries.
+
+    Values are stored by reference, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """Get value and mark it most recently used; None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Set value with TTL capped by `ttl_seconds`, evicting the LRU entry if full."""
+        if self.ttl_seconds is not None:
+            ttl = min(ttl, self.ttl_seconds)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Delete key from memory."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Clear all cache entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache(AsyncCacheBackend):
+    """Two-tier cache: in-process MemoryCache (L1) in front of a shared L2 backend.
+
+    L2 hits are copied into L1 so hot keys are served without a network round
+    trip, for at most the L1 TTL and never past the entry's remaining L2 TTL.
+    Writes and deletes go to both tiers.
+    """
+
+    def __init__(self, l1: MemoryCache, l2: AnyCacheBackend):
+        self.l1 = l1
+        self.l2 = l2
+        self.l2_stats = CacheStats()
+
+    @property
+    def stats(self) -> dict[str, CacheStats]:
+        """Per-tier hit/miss counters."""
+        return {"l1": self.l1.stats, "l2": self.l2_stats}
+
+    async def get(self, key: str) -> Any | None:
+        """Get from L1, falling back to L2 and filling L1 on an L2 hit."""
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        value, remaining = await cache_get_with_ttl(self.l2, key)
+        if value is None:
+            self.l2_stats.misses += 1
+            return None
+        self.l2_stats.hits += 1
+        if self.l1.ttl_seconds is not None:
+            ttl = self.l1.ttl_seconds if remaining is None else min(self.l1.ttl_seconds, remaining)
+            self.l1.set(key, value, ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        """Set in both tiers; the L1 entry never outlives the L2 TTL."""
+        await cache_set(self.l2, key, value, ttl)
+        self.l1.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        """Delete key from both tiers."""
+        self.l1.delete(key)
+        await cache_delete(self.l2, key)
+
+    async def clear(self) -> None:
+        """Clear both tiers."""
+        self.l1.clear()
+        if isinstance(self.l2, AsyncCacheBackend):
+            await self.l2.clear()
+        else:
+            self.l2.clear()
+
+    async def aclose(self) -> None:
+        """Release L2 resources."""
+        if isinstance(self.l2, AsyncCacheBackend):
+            await self.l2.aclose()
+
+
+async def cache_get(cache: AnyCacheBackend, key: str) -> Any | None:
+    """Get a value from either a sync or an async cache backend."""
+    if isinstance(cache, AsyncCacheBackend):
+        return await cache.get(key)
+    return cache.get(key)
+
+
+async def cache_get_with_ttl(cache: AnyCacheBackend, key: str) -> tuple[Any | None, float | None]:
+    """Get a value and its remaining TTL from either a sync or an async cache backend."""
+    if isinstance(cache, AsyncCacheBackend):
+        return await cache.get_with_ttl(key)
+    return cache.get_with_ttl(key)
+
+
+async def cache_set(cache: AnyCacheBackend, key: str, value: Any, ttl: int) -> None:
+    """Set a value on either a sync or an async cache backend."""
+    if isinstance(cache, AsyncCacheBackend):
+        await cache.set(key, value, ttl)
+    else:
+        cache.set(key, value, ttl)
+
+
+async def cache_delete(cache: AnyCacheBackend, key: str) -> None:
+    """Delete a key from either a sync or an async cache backend."""
+    if isinstance(cache, AsyncCacheBackend):
+        await cache.delete(key)
+    else:
+        cache.delete(key)
+
+
+def create_cache(
+    redis_url: str | None,
+    async_backend: bool = False,
+    l1_max_entries: int = 0,
+    l1_ttl_seconds: int = 60,
+    serializer: Serializer | None = None,
+) -> AnyCacheBackend | None:
+    """Factory: create a cache backend from a Redis URL, or None if unavailable.
+
+    `async_backend` selects AsyncRedisCache instead of the blocking RedisCache.
+    A positive `l1_max_entries` puts an in-process MemoryCache in front of
+    Redis, or uses it alone when no Redis URL is configured. `serializer`
+    encodes values stored in Redis (pickle by default).
+    """
+    l2: AnyCacheBackend | None = None
+    if redis_url:
+        try:
+            backend_cls = AsyncRedisCache if async_backend else RedisCache
+            l2 = backend_cls(redis_url, serializer)
+        except Exception:
+            l2 = None
+
+    if l1_max_entries <= 0:
+        return l2
+    if l2 is None:
+        return MemoryCache(l1_max_entries)
+    return TieredCache(MemoryCache(l1_max_entries, l1_ttl_seconds), l2)
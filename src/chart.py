@@ -1,26 +1,121 @@
+import asyncio
+import time
 from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from io import BytesIO
 
-import matplotlib
-import matplotlib.pyplot as plt
+from src.metrics import Histogram
+from src.native_chart import render_growth_time_png, render_growth_time_svg
 
-matplotlib.use("Agg")
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
 
 
-def render_growth_time_histogram(freq: Counter[int]) -> bytes:
-    """Render a bar chart of berry growth time frequencies as PNG bytes."""
+class ChartRenderUnavailable(Exception):
+    """Raised when a chart cannot be rendered in time or the render queue is full."""
+    pass
+
+
+def render_growth_time_histogram(freq: Counter[int], fmt: str = "png") -> bytes:
+    """Render a bar chart of berry growth time frequencies with matplotlib.
+
+    Uses the object-oriented Figure API (no pyplot global state), so it is
+    safe to call from worker threads. matplotlib is imported on first use
+    only; it is an optional backend.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
     x = sorted(freq.keys())
     y = [freq[k] for k in x]
 
-    fig, ax = plt.subplots()
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
     ax.bar([str(v) for v in x], y)
     ax.set_xlabel("Growth Time")
     ax.set_ylabel("Number of Berries")
     ax.set_title("Berry Growth Time Frequency")
 
     buf = BytesIO()
-    fig.savefig(buf, format="png")
-    plt.close(fig)
+    fig.savefig(buf, format=fmt)
     buf.seek(0)
 
     return buf.getvalue()
+
+
+def render_chart(freq: Counter[int], fmt: str = "png", backend: str = "native") -> bytes:
+    """Render the growth time chart as `fmt` ("png" or "svg") with the chosen backend."""
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    if backend == "matplotlib":
+        return render_growth_time_histogram(freq, fmt)
+    if fmt == "svg":
+        return render_growth_time_svg(freq)
+    return render_growth_time_png(freq)
+
+
+def _timed_render(freq: Counter[int], fmt: str, backend: str) -> tuple[bytes, float]:
+    """Worker entry point: render and report the time spent rendering."""
+    start = time.perf_counter()
+    body = render_chart(freq, fmt, backend)
+    return body, time.perf_counter() - start
+
+
+class ChartRenderer:
+    """Renders charts on a worker pool so the event loop keeps serving requests.
+
+    At most `queue_size` renders may be queued or running; further requests
+    and renders exceeding `timeout_seconds` raise ChartRenderUnavailable.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 8,
+        timeout_seconds: float = 10.0,
+        executor: str = "thread",
+        backend: str = "native",
+    ):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.timeout_seconds = timeout_seconds
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=workers)
+            if executor == "process"
+            else ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chart")
+        )
+        self.queue_depth = 0
+        self.render_seconds = Histogram()  # time inside the worker, by format
+        self.rejected = 0
+        self.timeouts = 0
+
+    async def render_growth_time_histogram(self, freq: Counter[int], fmt: str = "png") -> bytes:
+        """Render the growth time histogram on the pool, bounded by queue and timeout."""
+        if self.queue_depth >= self.queue_size:
+            self.rejected += 1
+            raise ChartRenderUnavailable("Chart render queue is full")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, _timed_render, freq, fmt, self.backend)
+        self.queue_depth += 1
+        future.add_done_callback(partial(self._on_done, fmt))
+
+        try:
+            body, _ = await asyncio.wait_for(asyncio.shield(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ChartRenderUnavailable("Chart rendering timed out")
+        return body
+
+    def _on_done(self, fmt: str, future: "asyncio.Future[tuple[bytes, float]]") -> None:
+        # The slot is only freed once the worker is done, even after a timeout.
+        self.queue_depth -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+        seconds = future.result()[1]
+        self.render_seconds.observe(seconds, fmt)
+
+    def close(self) -> None:
+        """Stop the worker pool, dropping renders that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
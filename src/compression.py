@@ -0,0 +1,126 @@
+import asyncio
+import gzip
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+Encoder = Callable[[bytes], bytes]
+
+# Server preference among encodings the client accepts with equal weight.
+PREFERENCE = ("br", "zstd", "gzip")
+
+# Artifact cache-key suffix of each encoded variant.
+SUFFIXES = {"br": "br", "zstd": "zst", "gzip": "gz"}
+
+# Media types worth compressing; PNG is already deflated.
+COMPRESSIBLE_MEDIA_TYPES = frozenset({"application/json", "image/svg+xml"})
+
+
+def _gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    import brotli
+
+    return brotli.compress(data, quality=11)
+
+
+def _zstd(data: bytes) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+
+def available_encoders() -> dict[str, Encoder]:
+    """Encoders usable here. brotli and zstd need the `compression` extra."""
+    encoders: dict[str, Encoder] = {"gzip": _gzip}
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        encoders["br"] = _brotli
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        encoders["zstd"] = _zstd
+    return encoders
+
+
+def negotiate(accept_encoding: str | None, available: Iterable[str]) -> str | None:
+    """Best available encoding for an Accept-Encoding header; None means identity."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    offered = set(available)
+    best, best_weight = None, 0.0
+    for encoding in PREFERENCE:
+        if encoding not in offered:
+            continue
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+@dataclass
+class EncodingStats:
+    """Bytes served with one content encoding, before and after compression."""
+
+    responses: int = 0
+    raw_bytes: int = 0
+    encoded_bytes: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """Encoded size as a fraction of the raw size (lower is better)."""
+        return self.encoded_bytes / self.raw_bytes if self.raw_bytes else 0.0
+
+
+class ResponseCompressor:
+    """Content negotiation and encoding for cached response bodies.
+
+    Bodies smaller than `min_size` are always sent as-is. Encoding runs in a
+    worker thread; callers cache the result per dataset version.
+    """
+
+    def __init__(self, encodings: Iterable[str] | None = None, min_size: int = 1024):
+        available = available_encoders()
+        wanted = available if encodings is None else encodings
+        self.encoders = {name: available[name] for name in wanted if name in available}
+        self.min_size = min_size
+        self.stats = {name: EncodingStats() for name in self.encoders}
+        self.below_min_size = 0
+
+    def choose(self, accept_encoding: str | None, media_type: str, size: int) -> str | None:
+        """Encoding to send a body of `media_type` and `size` with, or None."""
+        if media_type not in COMPRESSIBLE_MEDIA_TYPES:
+            return None
+        encoding = negotiate(accept_encoding, self.encoders)
+        if encoding is not None and size < self.min_size:
+            self.below_min_size += 1
+            return None
+        return encoding
+
+    async def encode(self, encoding: str, body: bytes) -> bytes:
+        return await asyncio.to_thread(self.encoders[encoding], body)
+
+    def record(self, encoding: str, raw_size: int, encoded_size: int) -> None:
+        stats = self.stats[encoding]
+        stats.responses += 1
+        stats.raw_bytes += raw_size
+        stats.encoded_bytes += encoded_size
@@ -1,8 +1,44 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     pokeapi_base_url: str
     cache_enabled: bool = True
-    cache_ttl_seconds: int = 3600
+    cache_ttl_seconds: int = 3600  # hard TTL: older data is never served
+    cache_soft_ttl_seconds: int | None = 3000  # past this, serve stale and refresh
+    cache_stale_if_error_seconds: int = 86400  # past the hard TTL, served only if PokeAPI fails
     redis_url: str = "redis://redis:6379/0"
+    redis_async: bool = True
+    cache_serializer: Literal["compact", "pickle"] = "compact"
+    cache_compression: bool = True
+    l1_cache_max_entries: int = 256
+    l1_cache_ttl_seconds: int = 60
+    cache_warmup_enabled: bool = True  # crawl into the cache before serving
+    cache_warmup_timeout_seconds: float = 60.0
+    cache_refresh_enabled: bool = True  # re-crawl ahead of the soft (else hard) TTL
+    cache_refresh_jitter_seconds: float = 60.0
+    cache_refresh_retry_seconds: float = 30.0
+    snapshot_path: str | None = None  # on-disk snapshot mapped at startup (python -m src.snapshot)
+    upstream_concurrency: int = 10
+    upstream_page_size: int = 100  # list items requested per page
+    upstream_max_pages: int = 100  # safety cap on list pages per crawl
+    http_timeout_seconds: float = 30.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = False
+    upstream_retries: int = 2
+    upstream_retry_backoff_seconds: float = 0.1
+    upstream_retry_max_backoff_seconds: float = 2.0
+    upstream_hedge_percentile: float | None = 95.0  # None disables hedged requests
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+    chart_backend: Literal["native", "matplotlib"] = "native"
+    chart_render_executor: Literal["thread", "process"] = "thread"
+    chart_render_workers: int = 2
+    chart_render_queue_size: int = 8
+    chart_render_timeout_seconds: float = 10.0
+    response_compression_encodings: str = "br,zstd,gzip"  # empty disables compression
+    response_compression_min_size: int = 1024
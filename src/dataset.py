@@ -0,0 +1,412 @@
+import bisect
+import hashlib
+import math
+import sys
+import time
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any
+
+from src.models import Berry
+
+
+def numeric_fields() -> list[str]:
+    """Names of the integer Berry attributes kept as typed columns."""
+    return [name for name, info in Berry.model_fields.items() if info.annotation is int]
+
+
+def categorical_fields() -> list[str]:
+    """Names of the label-valued Berry attributes that get an inverted index."""
+    return [
+        name
+        for name, info in Berry.model_fields.items()
+        if name != "name" and info.annotation in (str, list[str])
+    ]
+
+
+def multi_valued_fields() -> list[str]:
+    """Categorical attributes holding a list of labels per berry (e.g. flavors)."""
+    return [name for name, info in Berry.model_fields.items() if info.annotation == list[str]]
+
+
+@dataclass(frozen=True)
+class AttributeSummary:
+    """Descriptive statistics of one integer attribute, derived from its counts.
+
+    Values are small integers, so the sorted (value, count) distribution is
+    tiny and every statistic, including quantiles, is computed from it
+    without sorting the raw values.
+    """
+
+    count: int
+    min: int
+    max: int
+    mean: float
+    variance: float
+    frequency: dict[int, int]
+    _values: tuple[int, ...] = field(repr=False, compare=False)
+    _cumulative: tuple[int, ...] = field(repr=False, compare=False)
+
+    @classmethod
+    def from_counts(cls, counts: dict[int, int]) -> "AttributeSummary":
+        values = tuple(sorted(counts))
+        frequency = {v: counts[v] for v in values}
+        n = sum(frequency.values())
+        if n == 0:
+            raise ValueError("Cannot summarize an empty attribute")
+
+        # Exact integer sums, divided once: rounds like statistics.mean/pvariance.
+        total = sum(v * c for v, c in frequency.items())
+        squares = sum(v * v * c for v, c in frequency.items())
+        mean = total / n
+        variance = (n * squares - total * total) / (n * n)
+        cumulative, running = [], 0
+        for v in values:
+            running += frequency[v]
+            cumulative.append(running)
+        return cls(
+            count=n,
+            min=values[0],
+            max=values[-1],
+            mean=mean,
+            variance=variance,
+            frequency=frequency,
+            _values=values,
+            _cumulative=tuple(cumulative),
+        )
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def quantile(self, q: float) -> float:
+        """Quantile with linear interpolation between closest ranks (0 <= q <= 1)."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("Quantile must be between 0 and 1")
+        position = (self.count - 1) * q
+        lower = math.floor(position)
+        low_value = self._value_at(lower)
+        if position == lower:
+            return float(low_value)
+        high_value = self._value_at(lower + 1)
+        return low_value + (high_value - low_value) * (position - lower)
+
+    def _value_at(self, rank: int) -> int:
+        """Value of the element at 0-based `rank` in sorted order."""
+        return self._values[bisect.bisect_right(self._cumulative, rank)]
+
+
+class BerryDataset:
+    """Columnar berry data: names, one int32 array per numeric attribute and
+    one tuple of labels per berry for each categorical attribute. Numeric
+    columns may also be int32 memoryviews over a mapped snapshot file.
+
+    Built once per snapshot; every attribute summary and an inverted index
+    (label -> sorted row ids) per categorical attribute are built on load, so
+    filtered and grouped queries only touch the rows they select.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        numeric: dict[str, array | memoryview],
+        categorical: dict[str, list[tuple[str, ...]]],
+    ):
+        self.names = names
+        self.numeric = numeric
+        self.categorical = categorical
+        self._summaries: dict[str, AttributeSummary] = {}
+        self._group_summaries: dict[tuple[str, str], dict[str, AttributeSummary]] = {}
+        self._index = {
+            attribute: _inverted_index(rows) for attribute, rows in categorical.items()
+        }
+        if names:
+            for attribute in numeric:
+                self.summary(attribute)
+
+    @classmethod
+    def from_berries(cls, berries: list[Berry]) -> "BerryDataset":
+        multi = multi_valued_fields()
+        return cls(
+            names=[b.name for b in berries],
+            numeric={
+                name: array("i", (getattr(b, name) for b in berries))
+                for name in numeric_fields()
+            },
+            categorical={
+                name: [
+                    tuple(getattr(b, name)) if name in multi else (getattr(b, name),)
+                    for b in berries
+                ]
+                for name in categorical_fields()
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BerryDataset):
+            return NotImplemented
+        return (
+            self.names == other.names
+            and self.numeric == other.numeric
+            and self.categorical == other.categorical
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(self.__dict__)
+        # Mapped columns are memoryviews, which cannot be pickled.
+        state["numeric"] = {name: array("i", column) for name, column in self.numeric.items()}
+        return state
+
+    def frequency(self, attribute: str) -> dict[int, int]:
+        """Value -> number of berries, in ascending value order."""
+        return self.summary(attribute).frequency
+
+    def summary(self, attribute: str) -> AttributeSummary:
+        """Statistics for a numeric attribute, computed once per dataset."""
+        summary = self._summaries.get(attribute)
+        if summary is None:
+            summary = AttributeSummary.from_counts(Counter(self.numeric[attribute]))
+            self._summaries[attribute] = summary
+        return summary
+
+    def labels(self, attribute: str) -> list[str]:
+        """Distinct labels of a categorical attribute, sorted."""
+        return sorted(self._index[attribute])
+
+    def select(self, filters: dict[str, str]) -> array | None:
+        """Row ids matching every `attribute == label` filter, or None for all rows.
+
+        Intersects the posting lists, smallest first; no column is scanned.
+        """
+        if not filters:
+            return None
+        postings = sorted(
+            (self._index[attribute].get(label, _NO_ROWS) for attribute, label in filters.items()),
+            key=len,
+        )
+        selected = set(postings[0])
+        for posting in postings[1:]:
+            selected.intersection_update(posting)
+        return array("i", sorted(selected))
+
+    def grouped_summaries(
+        self,
+        attribute: str,
+        group_by: str | None = None,
+        filters: dict[str, str] | None = None,
+    ) -> dict[str, AttributeSummary]:
+        """Summaries of `attribute` per `group_by` label over the filtered rows.
+
+        Without `group_by` the single group is keyed "all". Groups with no
+        matching rows are left out. Unfiltered groupings are cached.
+        """
+        rows = self.select(filters or {})
+        if group_by is None:
+            if rows is None:
+                return {"all": self.summary(attribute)} if self.names else {}
+            return {"all": self._summarize(attribute, rows)} if rows else {}
+
+        if rows is None:
+            cache_key = (attribute, group_by)
+            cached = self._group_summaries.get(cache_key)
+            if cached is None:
+                cached = {
+                    label: self._summarize(attribute, self._index[group_by][label])
+                    for label in self.labels(group_by)
+                }
+                self._group_summaries[cache_key] = cached
+            return cached
+
+        # Bucket only the selected rows by their labels: O(selected), not O(N).
+        labels = self.categorical[group_by]
+        members: dict[str, list[int]] = {}
+        for row in rows:
+            for label in labels[row]:
+                members.setdefault(label, []).append(row)
+        return {label: self._summarize(attribute, members[label]) for label in sorted(members)}
+
+    def _summarize(self, attribute: str, rows: Iterable[int]) -> AttributeSummary:
+        column = self.numeric[attribute]
+        return AttributeSummary.from_counts(Counter(column[row] for row in rows))
+
+    def rows(
+        self, fields: list[str], start: int = 0, stop: int | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Yield berries `start:stop` as dicts of `fields`, read straight from the columns."""
+        multi = multi_valued_fields()
+        getters: list[tuple[str, Callable[[int], Any]]] = []
+        for field_name in fields:
+            if field_name == "name":
+                getters.append((field_name, self.names.__getitem__))
+            elif field_name in self.numeric:
+                getters.append((field_name, self.numeric[field_name].__getitem__))
+            elif field_name in multi:
+                labels = self.categorical[field_name]
+                getters.append((field_name, lambda i, labels=labels: list(labels[i])))
+            else:
+                labels = self.categorical[field_name]
+                getters.append((field_name, lambda i, labels=labels: labels[i][0]))
+
+        end = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, end):
+            yield {field_name: get(i) for field_name, get in getters}
+
+    def to_berries(self) -> list[Berry]:
+        fields = list(self.numeric)
+        multi = multi_valued_fields()
+        labels = {
+            name: [list(row) if name in multi else row[0] for row in rows]
+            for name, rows in self.categorical.items()
+        }
+        return [
+            Berry.model_construct(
+                name=name,
+                **dict(zip(fields, row)),
+                **{attribute: values[i] for attribute, values in labels.items()},
+            )
+            for i, (name, *row) in enumerate(zip(self.names, *self.numeric.values()))
+        ]
+
+
+_NO_ROWS = array("i")
+
+
+def _inverted_index(rows: list[tuple[str, ...]]) -> dict[str, array]:
+    """Label -> ascending row ids of the berries carrying that label."""
+    index: dict[str, array] = {}
+    for row_id, labels in enumerate(rows):
+        for label in labels:
+            index.setdefault(label, array("i")).append(row_id)
+    return index
+
+
+# Column kinds of the serialized layout shared by the cache and snapshot files.
+INT_COLUMN = 0  # little-endian int32
+STR_COLUMN = 1  # names, NUL-separated
+LABELS_COLUMN = 2  # rows NUL-separated, labels within a row US-separated
+
+
+def encode_columns(dataset: BerryDataset) -> list[tuple[str, int, bytes]]:
+    """(name, kind, block) for every column of `dataset`, names first."""
+    columns = [("name", STR_COLUMN, "\x00".join(dataset.names).encode())]
+    for name, column in dataset.numeric.items():
+        columns.append((name, INT_COLUMN, _int32_le(array("i", column)).tobytes()))
+    for name, rows in dataset.categorical.items():
+        block = "\x00".join("\x1f".join(labels) for labels in rows).encode()
+        columns.append((name, LABELS_COLUMN, block))
+    return columns
+
+
+def decode_columns(
+    columns: Iterable[tuple[str, int, memoryview]],
+    count: int,
+    int_column: Callable[[memoryview], array | memoryview] | None = None,
+) -> BerryDataset:
+    """Rebuild a dataset of `count` rows from `encode_columns` blocks.
+
+    `int_column` turns an int32 block into a column; by default the block is
+    copied into an array. Raises ValueError if a block has the wrong length
+    or a Berry field is missing.
+    """
+    names: list[str] | None = None
+    numeric: dict[str, array | memoryview] = {}
+    categorical: dict[str, list[tuple[str, ...]]] = {}
+    for name, kind, block in columns:
+        if kind == INT_COLUMN:
+            if len(block) != 4 * count:
+                raise ValueError(f"column {name} has the wrong length")
+            numeric[name] = (int_column or int32_column)(block)
+        elif kind == LABELS_COLUMN:
+            categorical[name] = _label_rows(name, block, count)
+        elif name == "name":
+            names = bytes(block).decode().split("\x00") if count else []
+
+    missing = [f for f in numeric_fields() if f not in numeric]
+    missing += [f for f in categorical_fields() if f not in categorical]
+    if names is None or missing:
+        raise ValueError(f"lacks Berry fields {missing or ['name']}")
+    return BerryDataset(
+        names,
+        {f: numeric[f] for f in numeric_fields()},
+        {f: categorical[f] for f in categorical_fields()},
+    )
+
+
+def int32_column(block: memoryview) -> array:
+    """Copy a little-endian int32 block into a native array."""
+    column = array("i")
+    column.frombytes(block)
+    return _int32_le(column)
+
+
+def _int32_le(column: array) -> array:
+    """Swap an int32 array to or from little-endian in place on big-endian hosts."""
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _label_rows(name: str, block: memoryview, count: int) -> list[tuple[str, ...]]:
+    """Decode a label column block into one tuple of labels per berry."""
+    rows = bytes(block).decode().split("\x00") if count else []
+    if name in multi_valued_fields():
+        return [tuple(row.split("\x1f")) if row else () for row in rows]
+    return [(row,) for row in rows]
+
+
+@dataclass
+class CrawlStats:
+    """How many berry details a crawl reused from cache versus re-downloaded."""
+
+    reused: int = 0
+    downloaded: int = 0
+
+
+@dataclass
+class BerrySnapshot:
+    """One crawl of the berry dataset with its crawl time and content version."""
+
+    dataset: BerryDataset
+    fetched_at: float
+    version: str
+    crawl_stats: CrawlStats | None = None
+
+    @classmethod
+    def create(
+        cls, berries: list[Berry], crawl_stats: CrawlStats | None = None
+    ) -> "BerrySnapshot":
+        # The crawled Berry models are not kept: the columns are the snapshot.
+        return cls(
+            dataset=BerryDataset.from_berries(berries),
+            fetched_at=time.time(),
+            version=dataset_version(berries),
+            crawl_stats=crawl_stats,
+        )
+
+    @cached_property
+    def berries(self) -> list[Berry]:
+        """Row view of the dataset, materialized only when a caller needs Berry objects."""
+        return self.dataset.to_berries()
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def __getstate__(self) -> dict[str, object]:
+        state = dict(self.__dict__)
+        state.pop("berries", None)  # derived from the dataset
+        return state
+
+
+def dataset_version(berries: list[Berry]) -> str:
+    """Content hash of a dataset; identical data always gets the same version."""
+    digest = hashlib.sha256()
+    for berry in berries:
+        digest.update(berry.model_dump_json().encode())
+        digest.update(b"\n")
+    return digest.hexdigest()[:16]
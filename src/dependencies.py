@@ -1,10 +1,15 @@
 from functools import lru_cache
 from typing import Annotated
 
-from fastapi import Depends, Request
+import httpx
+from fastapi import Depends, HTTPException, Request
 
-from src.cache import CacheBackend
+from src.cache import AnyCacheBackend
+from src.chart import ChartRenderer
+from src.compression import ResponseCompressor
 from src.config import Settings
+from src.refresher import SnapshotRefresher
+from src.upstream_api import BerrySnapshot, UpstreamApiError, fetch_berry_snapshot
 
 
 @lru_cache
@@ -18,7 +23,7 @@ def get_base_url(settings: Settings = Depends(get_settings)) -> str:
     return settings.pokeapi_base_url
 
 
-def get_cache(request: Request) -> CacheBackend | None:
+def get_cache(request: Request) -> AnyCacheBackend | None:
     """Read cache backend from app.state. Returns None when caching is disabled."""
     settings = get_settings()
     if not settings.cache_enabled:
@@ -26,11 +31,108 @@ def get_cache(request: Request) -> CacheBackend | None:
     return getattr(request.app.state, "cache", None)
 
 
+def get_http_client(request: Request) -> httpx.AsyncClient | None:
+    """Read the shared upstream HTTP client from app.state, set by the lifespan."""
+    return getattr(request.app.state, "http_client", None)
+
+
+def get_chart_renderer(request: Request) -> ChartRenderer:
+    """Read the chart rendering worker pool from app.state, set by the lifespan."""
+    return request.app.state.chart_renderer
+
+
+def get_response_compressor(request: Request) -> ResponseCompressor:
+    """Read the response compressor from app.state."""
+    return request.app.state.response_compressor
+
+
+def get_warm_snapshot(request: Request) -> BerrySnapshot | None:
+    """Read the snapshot mapped from SNAPSHOT_PATH at startup, if any."""
+    return getattr(request.app.state, "warm_snapshot", None)
+
+
+def get_refresher(request: Request) -> SnapshotRefresher | None:
+    """Read the snapshot refresher from app.state; None when caching is off."""
+    return getattr(request.app.state, "refresher", None)
+
+
 def get_cache_ttl(settings: Settings = Depends(get_settings)) -> int:
     """Provide the cache TTL in seconds."""
     return settings.cache_ttl_seconds
 
 
+def get_cache_soft_ttl(settings: Settings = Depends(get_settings)) -> int | None:
+    """Provide the stale-while-revalidate soft TTL in seconds, or None to disable it."""
+    return settings.cache_soft_ttl_seconds
+
+
+def get_cache_stale_if_error(settings: Settings = Depends(get_settings)) -> int:
+    """Provide how long past the hard TTL data may be served while PokeAPI fails."""
+    return settings.cache_stale_if_error_seconds
+
+
+def get_upstream_concurrency(settings: Settings = Depends(get_settings)) -> int:
+    """Provide the maximum number of concurrent upstream detail requests."""
+    return settings.upstream_concurrency
+
+
+def get_upstream_page_size(settings: Settings = Depends(get_settings)) -> int:
+    """Provide the number of items requested per upstream list page."""
+    return settings.upstream_page_size
+
+
+def get_upstream_max_pages(settings: Settings = Depends(get_settings)) -> int:
+    """Provide the safety cap on upstream list pages per crawl."""
+    return settings.upstream_max_pages
+
+
 BaseUrlDep = Annotated[str, Depends(get_base_url)]
-CacheDep = Annotated[CacheBackend | None, Depends(get_cache)]
+CacheDep = Annotated[AnyCacheBackend | None, Depends(get_cache)]
+HttpClientDep = Annotated[httpx.AsyncClient | None, Depends(get_http_client)]
+ChartRendererDep = Annotated[ChartRenderer, Depends(get_chart_renderer)]
+ResponseCompressorDep = Annotated[ResponseCompressor, Depends(get_response_compressor)]
+WarmSnapshotDep = Annotated[BerrySnapshot | None, Depends(get_warm_snapshot)]
+RefresherDep = Annotated[SnapshotRefresher | None, Depends(get_refresher)]
 CacheTtlDep = Annotated[int, Depends(get_cache_ttl)]
+CacheSoftTtlDep = Annotated[int | None, Depends(get_cache_soft_ttl)]
+CacheStaleIfErrorDep = Annotated[int, Depends(get_cache_stale_if_error)]
+UpstreamConcurrencyDep = Annotated[int, Depends(get_upstream_concurrency)]
+UpstreamPageSizeDep = Annotated[int, Depends(get_upstream_page_size)]
+UpstreamMaxPagesDep = Annotated[int, Depends(get_upstream_max_pages)]
+
+
+async def get_berry_snapshot(
+    base_url: BaseUrlDep,
+    cache: CacheDep,
+    cache_ttl: CacheTtlDep,
+    soft_ttl: CacheSoftTtlDep,
+    concurrency: UpstreamConcurrencyDep,
+    http_client: HttpClientDep,
+    page_size: UpstreamPageSizeDep,
+    max_pages: UpstreamMaxPagesDep,
+    stale_if_error: CacheStaleIfErrorDep,
+    warm_snapshot: WarmSnapshotDep,
+) -> BerrySnapshot:
+    """Provide the current berry dataset snapshot; 502 when PokeAPI fails and no
+    stale snapshot is left to fall back on."""
+    try:
+        return await fetch_berry_snapshot(
+            base_url,
+            cache,
+            cache_ttl,
+            concurrency=concurrency,
+            client=http_client,
+            soft_ttl_seconds=soft_ttl,
+            page_size=page_size,
+            max_pages=max_pages,
+            stale_if_error_seconds=stale_if_error,
+            warm_snapshot=warm_snapshot,
+        )
+    except UpstreamApiError:
+        raise HTTPException(
+            status_code=502,
+            detail="Failed to fetch data from PokeAPI"
+        )
+
+
+BerrySnapshotDep = Annotated[BerrySnapshot, Depends(get_berry_snapshot)]
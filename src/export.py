@@ -0,0 +1,91 @@
+import base64
+import binascii
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Any
+
+from src.fastjson import dumps
+from src.models import Berry
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows per chunk when streaming from a cached dataset.
+LINES_PER_CHUNK = 256
+
+
+class InvalidExportRequest(ValueError):
+    """Raised for an unknown projection field or a malformed cursor."""
+
+
+def parse_fields(raw: str | None) -> list[str]:
+    """Projected Berry fields in model order; every field when `raw` is empty."""
+    available = list(Berry.model_fields)
+    if not raw:
+        return available
+    requested = {part.strip() for part in raw.split(",") if part.strip()}
+    unknown = requested.difference(available)
+    if unknown:
+        raise InvalidExportRequest(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in available if name in requested]
+
+
+def encode_cursor(offset: int) -> str:
+    """Opaque cursor for the row at `offset` in upstream order."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int:
+    """Row offset of a cursor from `encode_cursor`; 0 when there is none."""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, value = raw.partition(":")
+        offset = int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidExportRequest("Invalid cursor")
+    if prefix != "o" or offset < 0:
+        raise InvalidExportRequest("Invalid cursor")
+    return offset
+
+
+def _line(row: dict[str, Any]) -> bytes:
+    return dumps(row) + b"\n"
+
+
+def ndjson_chunks(rows: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    """Encode rows as NDJSON, batching lines so large exports send few chunks."""
+    batch: list[bytes] = []
+    for row in rows:
+        batch.append(_line(row))
+        if len(batch) >= LINES_PER_CHUNK:
+            yield b"".join(batch)
+            batch.clear()
+    if batch:
+        yield b"".join(batch)
+
+
+async def ndjson_lines(
+    first: Berry | None, berries: AsyncIterator[Berry], fields: list[str]
+) -> AsyncIterator[bytes]:
+    """Encode berries as NDJSON one line at a time, as they arrive."""
+    include = set(fields)
+    if first is not None:
+        yield _line(first.model_dump(include=include))
+    async for berry in berries:
+        yield _line(berry.model_dump(include=include))
+
+
+async def slice_berries(
+    berries: AsyncIterator[Berry], start: int, stop: int | None
+) -> AsyncIterator[Berry]:
+    """Yield berries `start:stop`, closing the source (and its crawl) once done."""
+    try:
+        index = 0
+        async for berry in berries:
+            if stop is not None and index >= stop:
+                break
+            if index >= start:
+                yield berry
+            index += 1
+    finally:
+        await berries.aclose()  # type: ignore[attr-defined]
@@ -0,0 +1,22 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes of plain data; int dict keys become strings."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """JSON response for data the service built itself.
+
+    Returning it from a route skips FastAPI's response_model validation and
+    encoding; the route's response_model then only documents the schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,45 @@
+from src.dataset import BerrySnapshot
+
+
+def artifact_etag(kind: str, version: str) -> str:
+    """Strong ETag of an artifact: identical for the same dataset version and kind."""
+    return f'"{version}-{kind}"'
+
+
+def representation_etag(etag: str, encoding: str | None) -> str:
+    """ETag of the `encoding` variant; strong ETags must differ per content coding."""
+    return etag if encoding is None else f'{etag[:-1]}+{encoding}"'
+
+
+def matching_etag(if_none_match: str | None, etag: str) -> str | None:
+    """The If-None-Match entry that matches `etag`, or None (weak comparison, RFC 9110).
+
+    Encoded variants of the same artifact match each other, since they carry
+    the same content.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        opaque = tag.removeprefix("W/")
+        if opaque == etag or (opaque.startswith(etag[:-1] + "+") and opaque.endswith('"')):
+            return tag
+    return None
+
+
+def max_age(snapshot: BerrySnapshot, cache_ttl: int, soft_ttl: int | None) -> int:
+    """Seconds until the snapshot is due for a refresh, and may change."""
+    lifetime = cache_ttl if soft_ttl is None else min(soft_ttl, cache_ttl)
+    return max(0, int(lifetime - snapshot.age()))
+
+
+def validator_headers(
+    kind: str, snapshot: BerrySnapshot, cache_ttl: int, soft_ttl: int | None
+) -> dict[str, str]:
+    """ETag and Cache-Control for an artifact of `snapshot`, sent with 200 and 304 alike."""
+    return {
+        "ETag": artifact_etag(kind, snapshot.version),
+        "Cache-Control": f"public, max-age={max_age(snapshot, cache_ttl, soft_ttl)}",
+    }
@@ -1,18 +1,112 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import partial
+
+import httpx
 from fastapi import FastAPI
 
-from src.cache import create_cache
+from src.cache import AsyncCacheBackend, SerializationError, create_cache, create_serializer
+from src.chart import ChartRenderer
+from src.compression import ResponseCompressor
+from src.config import Settings
 from src.dependencies import get_settings
+from src.metrics import Histogram, RequestMetricsMiddleware
+from src.refresher import SnapshotRefresher
 from src.router import router
+from src.snapshot import load_snapshot
+from src.upstream_api import (
+    cached_snapshot,
+    create_http_client,
+    create_upstream_transport,
+    fetch_berry_snapshot,
+)
 
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="Poke-berries Statistics API")
-
+def create_app(http_transport: httpx.AsyncBaseTransport | None = None) -> FastAPI:
+    """Build the application. `http_transport` lets tests mock the upstream."""
     settings = get_settings()
-    app.state.cache = create_cache(settings.redis_url)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        app.state.upstream_transport = create_upstream_transport(settings, http_transport)
+        app.state.http_client = create_http_client(settings, transport=app.state.upstream_transport)
+        app.state.chart_renderer = ChartRenderer(
+            workers=settings.chart_render_workers,
+            queue_size=settings.chart_render_queue_size,
+            timeout_seconds=settings.chart_render_timeout_seconds,
+            executor=settings.chart_render_executor,
+            backend=settings.chart_backend,
+        )
+        app.state.refresher = _create_refresher(app, settings)
+        if app.state.refresher is not None:
+            if settings.cache_warmup_enabled:
+                await app.state.refresher.warm_up(settings.cache_warmup_timeout_seconds)
+            if settings.cache_refresh_enabled:
+                app.state.refresher.start()
+        try:
+            yield
+        finally:
+            if app.state.refresher is not None:
+                await app.state.refresher.stop()
+            app.state.chart_renderer.close()
+            await app.state.http_client.aclose()
+            if isinstance(app.state.cache, AsyncCacheBackend):
+                await app.state.cache.aclose()
+
+    app = FastAPI(title="Poke-berries Statistics API", lifespan=lifespan)
+
+    app.state.cache = create_cache(
+        settings.redis_url,
+        async_backend=settings.redis_async,
+        l1_max_entries=settings.l1_cache_max_entries,
+        l1_ttl_seconds=min(settings.l1_cache_ttl_seconds, settings.cache_ttl_seconds),
+        serializer=create_serializer(settings.cache_serializer, settings.cache_compression),
+    )
+
+    app.state.warm_snapshot = None
+    if settings.snapshot_path:
+        try:
+            app.state.warm_snapshot = load_snapshot(settings.snapshot_path)
+        except (OSError, SerializationError):
+            pass  # start cold: the first request crawls PokeAPI
+
+    app.state.response_compressor = ResponseCompressor(
+        encodings=[e.strip() for e in settings.response_compression_encodings.split(",") if e.strip()],
+        min_size=settings.response_compression_min_size,
+    )
+
+    app.state.request_seconds = Histogram()
+    app.add_middleware(RequestMetricsMiddleware, histogram=app.state.request_seconds)
 
     app.include_router(router)
     return app
 
 
+def _create_refresher(app: FastAPI, settings: Settings) -> SnapshotRefresher | None:
+    """Refresher for the shared snapshot cache, or None when caching is off."""
+    cache = app.state.cache if settings.cache_enabled else None
+    if cache is None:
+        return None
+    return SnapshotRefresher(
+        refresh=partial(
+            fetch_berry_snapshot,
+            settings.pokeapi_base_url,
+            cache,
+            settings.cache_ttl_seconds,
+            concurrency=settings.upstream_concurrency,
+            client=app.state.http_client,
+            page_size=settings.upstream_page_size,
+            max_pages=settings.upstream_max_pages,
+            stale_if_error_seconds=settings.cache_stale_if_error_seconds,
+            force_refresh=True,
+        ),
+        current=partial(
+            cached_snapshot, cache, settings.cache_ttl_seconds, app.state.warm_snapshot
+        ),
+        refresh_after_seconds=settings.cache_soft_ttl_seconds or settings.cache_ttl_seconds,
+        jitter_seconds=settings.cache_refresh_jitter_seconds,
+        retry_seconds=settings.cache_refresh_retry_seconds,
+    )
+
+
 app = create_app()
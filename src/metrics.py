@@ -0,0 +1,281 @@
+"""Minimal Prometheus text exposition (format 0.0.4) without extra dependencies.
+
+Components own their measurements: a `Histogram` attribute observed on the
+code path that does the work, next to the plain counters they already keep.
+The `/metrics` route reads them all at scrape time, through a `MetricsWriter`
+and the `write_*_metrics` helpers below.
+Every worker process reports its own values.
+"""
+
+import bisect
+import math
+import time
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.cache import AnyCacheBackend
+    from src.chart import ChartRenderer
+    from src.compression import ResponseCompressor
+    from src.resilience import ResilientTransport
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(float(256 * 4**i) for i in range(10))  # 256 B .. 64 MiB
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[str, ...]
+
+
+class Histogram:
+    """Bucketed observations, kept separately per tuple of label values."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def series(self) -> Iterable[tuple[Labels, list[int], float]]:
+        """(label values, cumulative counts per bucket then +Inf, sum) per series."""
+        for labels, (counts, total) in self._series.items():
+            cumulative, running = [], 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            yield labels, cumulative, total[0]
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+
+class MetricsWriter:
+    """Accumulates metric families and renders them in the text exposition format."""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._lines: list[str] = []
+
+    def counter(
+        self, name: str, help: str, value: float | Mapping[Labels, float], labelnames: Labels = ()
+    ) -> None:
+        self._family(name, "counter", help, value, labelnames)
+
+    def gauge(
+        self, name: str, help: str, value: float | Mapping[Labels, float], labelnames: Labels = ()
+    ) -> None:
+        self._family(name, "gauge", help, value, labelnames)
+
+    def histogram(self, name: str, help: str, histogram: Histogram, labelnames: Labels = ()) -> None:
+        name = self.prefix + name
+        self._header(name, "histogram", help)
+        for labels, cumulative, total in histogram.series():
+            base = dict(zip(labelnames, labels))
+            for bound, count in zip((*histogram.buckets, math.inf), cumulative):
+                self._sample(f"{name}_bucket", {**base, "le": _format_value(bound)}, count)
+            self._sample(f"{name}_sum", base, total)
+            self._sample(f"{name}_count", base, cumulative[-1])
+
+    def render(self) -> bytes:
+        return ("\n".join(self._lines) + "\n").encode()
+
+    def _family(
+        self, name: str, kind: str, help: str, value: float | Mapping[Labels, float], labelnames: Labels
+    ) -> None:
+        name = self.prefix + name
+        self._header(name, kind, help)
+        values = value if isinstance(value, Mapping) else {(): value}
+        for labels, sample in values.items():
+            self._sample(name, dict(zip(labelnames, labels)), sample)
+
+    def _header(self, name: str, kind: str, help: str) -> None:
+        self._lines.append(f"# HELP {name} {help}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+    def _sample(self, name: str, labels: dict[str, str], value: float) -> None:
+        if labels:
+            rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+            name = f"{name}{{{rendered}}}"
+        self._lines.append(f"{name} {_format_value(value)}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def write_upstream_metrics(out: MetricsWriter, transport: "ResilientTransport | None") -> None:
+    """Crawl, coalescing and fallback totals, plus the transport's call metrics when given."""
+    # Imported here: these modules record into Histograms defined above.
+    from src.artifacts import artifacts_flight
+    from src.resilience import CircuitBreaker
+    from src.upstream_api import berries_flight, crawl_seconds, crawl_totals, fallback_totals
+
+    out.histogram(
+        "upstream_crawl_duration_seconds",
+        "Wall time of full PokeAPI crawls, by outcome.",
+        crawl_seconds,
+        ("outcome",),
+    )
+    out.counter(
+        "upstream_crawl_details_total",
+        "Berry details per crawl source: revalidated from cache or downloaded.",
+        {("reused",): crawl_totals.reused, ("downloaded",): crawl_totals.downloaded},
+        ("source",),
+    )
+    out.counter(
+        "upstream_crawls_coalesced_total",
+        "Callers that joined a crawl already in flight.",
+        berries_flight.coalesced,
+    )
+    out.counter(
+        "artifact_builds_coalesced_total",
+        "Callers that joined an artifact build already in flight.",
+        artifacts_flight.coalesced,
+    )
+    out.counter(
+        "stale_served_total",
+        "Snapshots served past their hard TTL because PokeAPI failed.",
+        fallback_totals.stale_served,
+    )
+
+    if transport is None:
+        return
+    out.histogram(
+        "upstream_request_duration_seconds",
+        "Latency of each HTTP call to PokeAPI, by endpoint template and status.",
+        transport.call_seconds,
+        ("endpoint", "status"),
+    )
+    stats = transport.stats
+    out.counter("upstream_requests_total", "Logical GET requests to PokeAPI.", stats.requests)
+    out.counter("upstream_retries_total", "Retried PokeAPI calls.", stats.retries)
+    out.counter("upstream_hedges_total", "Hedged duplicate PokeAPI calls.", stats.hedges)
+    out.counter("upstream_hedge_wins_total", "Hedged calls that answered first.", stats.hedge_wins)
+    out.counter("upstream_failures_total", "PokeAPI requests that failed after all retries.", stats.failures)
+    breaker = transport.breaker
+    out.gauge(
+        "upstream_circuit_state",
+        "1 for the circuit breaker's current state.",
+        {
+            (name,): int(breaker.state == name)
+            for name in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN)
+        },
+        ("state",),
+    )
+    out.counter("upstream_circuit_opened_total", "Times the circuit breaker opened.", breaker.opened)
+    out.counter("upstream_circuit_rejected_total", "Calls rejected by the open circuit.", breaker.rejected)
+
+
+def write_cache_metrics(out: MetricsWriter, cache: "AnyCacheBackend | None") -> None:
+    """Hit, miss and error counts per cache tier, and Redis codec sizes and timings."""
+    from src.cache import MemoryCache, RedisCodec, TieredCache
+
+    tiers: list[tuple[str, Any]] = []
+    if isinstance(cache, TieredCache):
+        tiers = [("memory", cache.l1), ("redis", cache.l2)]
+    elif cache is not None:
+        tiers = [("memory" if isinstance(cache, MemoryCache) else "redis", cache)]
+
+    stats = {name: backend.stats for name, backend in tiers if hasattr(backend, "stats")}
+    for result in ("hits", "misses", "errors"):
+        out.counter(
+            f"cache_{result}_total",
+            f"Cache {result}, by backend.",
+            {(name,): getattr(tier, result) for name, tier in stats.items()},
+            ("backend",),
+        )
+    for name, backend in tiers:
+        if isinstance(backend, RedisCodec):
+            out.histogram(
+                "cache_payload_bytes",
+                "Serialized sizes of values read from and written to Redis.",
+                backend.payload_bytes,
+                ("operation",),
+            )
+            out.histogram(
+                "cache_serialization_duration_seconds",
+                "Time spent encoding and decoding Redis values.",
+                backend.codec_seconds,
+                ("operation",),
+            )
+
+
+def write_render_metrics(
+    out: MetricsWriter, renderer: "ChartRenderer", compressor: "ResponseCompressor"
+) -> None:
+    """Chart render pool and response compression metrics."""
+    out.histogram(
+        "chart_render_duration_seconds",
+        "Time spent rendering histograms in the worker pool, by format.",
+        renderer.render_seconds,
+        ("format",),
+    )
+    out.gauge("chart_render_queue_depth", "Renders queued or running.", renderer.queue_depth)
+    out.counter("chart_render_rejected_total", "Renders rejected by a full queue.", renderer.rejected)
+    out.counter("chart_render_timeouts_total", "Renders that exceeded the timeout.", renderer.timeouts)
+
+    for field, help in (
+        ("responses", "Responses sent with each content encoding."),
+        ("raw_bytes", "Body bytes before compression, by encoding."),
+        ("encoded_bytes", "Body bytes after compression, by encoding."),
+    ):
+        out.counter(
+            f"response_compression_{field}_total",
+            help,
+            {(encoding,): getattr(stats, field) for encoding, stats in compressor.stats.items()},
+            ("encoding",),
+        )
+    out.counter(
+        "response_compression_skipped_small_total",
+        "Compressible responses sent as-is for being under the minimum size.",
+        compressor.below_min_size,
+    )
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing each HTTP request until its last body chunk is sent.
+
+    Observations are labelled by method, route template and status code, so
+    path parameters do not create new series; unmatched paths share one.
+    """
+
+    def __init__(self, app: Any, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.histogram.observe(time.perf_counter() - start, scope["method"], route, str(status))
@@ -1,4 +1,17 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+NumericAttribute = Literal[
+    "growth_time",
+    "max_harvest",
+    "natural_gift_power",
+    "size",
+    "smoothness",
+    "soil_dryness",
+]
+
+CategoricalAttribute = Literal["firmness", "natural_gift_type", "flavors"]
 
 
 class Berry(BaseModel):
@@ -6,6 +19,30 @@ class Berry(BaseModel):
 
     name: str
     growth_time: int
+    max_harvest: int
+    natural_gift_power: int
+    size: int
+    smoothness: int
+    soil_dryness: int
+    firmness: str
+    natural_gift_type: str
+    flavors: list[str]
+
+    @field_validator("firmness", "natural_gift_type", mode="before")
+    @classmethod
+    def _resource_name(cls, value: Any) -> Any:
+        """PokeAPI nests these as named resources; keep just the name."""
+        return value["name"] if isinstance(value, dict) else value
+
+    @field_validator("flavors", mode="before")
+    @classmethod
+    def _flavor_names(cls, value: Any) -> Any:
+        """Keep the names of the flavors the berry actually has (potency > 0)."""
+        return [
+            item["flavor"]["name"] if isinstance(item, dict) else item
+            for item in value
+            if not isinstance(item, dict) or item.get("potency", 0) > 0
+        ]
 
 
 class BerryListItem(BaseModel):
@@ -28,3 +65,45 @@ class AllBerryStatsResponse(BaseModel):
     variance_growth_time: float
     mean_growth_time: float
     frequency_growth_time: dict[int, int]
+
+
+class AttributeStatsResponse(BaseModel):
+    attribute: NumericAttribute
+    count: int
+    min: int
+    max: int
+    mean: float
+    median: float
+    variance: float
+    frequency: dict[int, int]
+    quantiles: dict[str, float]
+
+
+class GroupStats(BaseModel):
+    count: int
+    min: int
+    max: int
+    mean: float
+    median: float
+    variance: float
+
+
+class GroupedStatsResponse(BaseModel):
+    attribute: NumericAttribute
+    group_by: CategoricalAttribute | None
+    filters: dict[str, str]
+    groups: dict[str, GroupStats]
+
+
+class HealthResponse(BaseModel):
+    status: str
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    dataset_version: str | None
+    dataset_age_seconds: float | None
+    berries: int | None
+    refresher_running: bool
+    last_refresh_at: float | None
+    refresh_failures: int
@@ -0,0 +1,216 @@
+import struct
+import zlib
+from collections import Counter
+from xml.sax.saxutils import escape
+
+WIDTH = 640
+HEIGHT = 480
+MARGIN_LEFT = 72
+MARGIN_RIGHT = 24
+MARGIN_TOP = 48
+MARGIN_BOTTOM = 64
+
+TITLE = "Berry Growth Time Frequency"
+X_LABEL = "Growth Time"
+Y_LABEL = "Number of Berries"
+
+BAR_COLOR = "#1f77b4"
+
+# Palette indices for the PNG canvas.
+WHITE, BLACK, BLUE, GREY = 0, 1, 2, 3
+PALETTE = bytes([255, 255, 255, 0, 0, 0, 0x1F, 0x77, 0xB4, 0xDD, 0xDD, 0xDD])
+
+# 5x7 bitmap font; text is drawn upper-cased. Unknown characters render blank.
+GLYPH_WIDTH = 5
+GLYPH_HEIGHT = 7
+FONT: dict[str, tuple[str, ...]] = {
+    "0": ("01110", "10001", "10011", "10101", "11001", "10001", "01110"),
+    "1": ("00100", "01100", "00100", "00100", "00100", "00100", "01110"),
+    "2": ("01110", "10001", "00001", "00010", "00100", "01000", "11111"),
+    "3": ("11111", "00010", "00100", "00010", "00001", "10001", "01110"),
+    "4": ("00010", "00110", "01010", "10010", "11111", "00010", "00010"),
+    "5": ("11111", "10000", "11110", "00001", "00001", "10001", "01110"),
+    "6": ("00110", "01000", "10000", "11110", "10001", "10001", "01110"),
+    "7": ("11111", "00001", "00010", "00100", "01000", "01000", "01000"),
+    "8": ("01110", "10001", "10001", "01110", "10001", "10001", "01110"),
+    "9": ("01110", "10001", "10001", "01111", "00001", "00010", "01100"),
+    "A": ("01110", "10001", "10001", "11111", "10001", "10001", "10001"),
+    "B": ("11110", "10001", "10001", "11110", "10001", "10001", "11110"),
+    "C": ("01110", "10001", "10000", "10000", "10000", "10001", "01110"),
+    "D": ("11100", "10010", "10001", "10001", "10001", "10010", "11100"),
+    "E": ("11111", "10000", "10000", "11110", "10000", "10000", "11111"),
+    "F": ("11111", "10000", "10000", "11110", "10000", "10000", "10000"),
+    "G": ("01110", "10001", "10000", "10111", "10001", "10001", "01111"),
+    "H": ("10001", "10001", "10001", "11111", "10001", "10001", "10001"),
+    "I": ("01110", "00100", "00100", "00100", "00100", "00100", "01110"),
+    "J": ("00111", "00010", "00010", "00010", "00010", "10010", "01100"),
+    "K": ("10001", "10010", "10100", "11000", "10100", "10010", "10001"),
+    "L": ("10000", "10000", "10000", "10000", "10000", "10000", "11111"),
+    "M": ("10001", "11011", "10101", "10101", "10001", "10001", "10001"),
+    "N": ("10001", "10001", "11001", "10101", "10011", "10001", "10001"),
+    "O": ("01110", "10001", "10001", "10001", "10001", "10001", "01110"),
+    "P": ("11110", "10001", "10001", "11110", "10000", "10000", "10000"),
+    "Q": ("01110", "10001", "10001", "10001", "10101", "10010", "01101"),
+    "R": ("11110", "10001", "10001", "11110", "10100", "10010", "10001"),
+    "S": ("01111", "10000", "10000", "01110", "00001", "00001", "11110"),
+    "T": ("11111", "00100", "00100", "00100", "00100", "00100", "00100"),
+    "U": ("10001", "10001", "10001", "10001", "10001", "10001", "01110"),
+    "V": ("10001", "10001", "10001", "10001", "10001", "01010", "00100"),
+    "W": ("10001", "10001", "10001", "10101", "10101", "10101", "01010"),
+    "X": ("10001", "10001", "01010", "00100", "01010", "10001", "10001"),
+    "Y": ("10001", "10001", "10001", "01010", "00100", "00100", "00100"),
+    "Z": ("11111", "00001", "00010", "00100", "01000", "10000", "11111"),
+}
+
+
+class _Layout:
+    """Bar geometry and axis ticks shared by the SVG and PNG outputs."""
+
+    def __init__(self, freq: Counter[int]):
+        self.labels = [str(k) for k in sorted(freq)]
+        self.values = [freq[k] for k in sorted(freq)]
+        self.plot_left = MARGIN_LEFT
+        self.plot_right = WIDTH - MARGIN_RIGHT
+        self.plot_top = MARGIN_TOP
+        self.plot_bottom = HEIGHT - MARGIN_BOTTOM
+
+        top = max(self.values, default=0)
+        self.tick_step = max(1, -(-top // 5))
+        self.y_max = max(self.tick_step, -(-top // self.tick_step) * self.tick_step)
+        self.y_ticks = list(range(0, self.y_max + 1, self.tick_step))
+
+        slot = (self.plot_right - self.plot_left) / max(1, len(self.values))
+        self.bar_width = max(1, int(slot * 0.8))
+        self.bar_centers = [int(self.plot_left + slot * (i + 0.5)) for i in range(len(self.values))]
+
+    def y(self, value: float) -> int:
+        """Canvas y coordinate of a data value."""
+        height = self.plot_bottom - self.plot_top
+        return int(self.plot_bottom - value / self.y_max * height)
+
+
+def render_growth_time_svg(freq: Counter[int]) -> bytes:
+    """Render a bar chart of berry growth time frequencies as SVG bytes."""
+    layout = _Layout(freq)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+        f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{WIDTH}" height="{HEIGHT}" fill="#ffffff"/>',
+    ]
+    for tick in layout.y_ticks:
+        y = layout.y(tick)
+        parts.append(
+            f'<line x1="{layout.plot_left}" y1="{y}" x2="{layout.plot_right}" y2="{y}" '
+            f'stroke="#dddddd"/>'
+        )
+        parts.append(f'<text x="{layout.plot_left - 8}" y="{y + 4}" text-anchor="end">{tick}</text>')
+    for label, value, center in zip(layout.labels, layout.values, layout.bar_centers):
+        top = layout.y(value)
+        parts.append(
+            f'<rect x="{center - layout.bar_width // 2}" y="{top}" width="{layout.bar_width}" '
+            f'height="{layout.plot_bottom - top}" fill="{BAR_COLOR}"/>'
+        )
+        parts.append(
+            f'<text x="{center}" y="{layout.plot_bottom + 18}" text-anchor="middle">'
+            f"{escape(label)}</text>"
+        )
+    parts += [
+        f'<line x1="{layout.plot_left}" y1="{layout.plot_bottom}" x2="{layout.plot_right}" '
+        f'y2="{layout.plot_bottom}" stroke="#000000"/>',
+        f'<line x1="{layout.plot_left}" y1="{layout.plot_top}" x2="{layout.plot_left}" '
+        f'y2="{layout.plot_bottom}" stroke="#000000"/>',
+        f'<text x="{WIDTH // 2}" y="{MARGIN_TOP // 2 + 6}" text-anchor="middle" '
+        f'font-size="16">{escape(TITLE)}</text>',
+        f'<text x="{(layout.plot_left + layout.plot_right) // 2}" y="{HEIGHT - 16}" '
+        f'text-anchor="middle">{escape(X_LABEL)}</text>',
+        f'<text transform="translate(20 {(layout.plot_top + layout.plot_bottom) // 2}) '
+        f'rotate(-90)" text-anchor="middle">{escape(Y_LABEL)}</text>',
+        "</svg>",
+    ]
+    return "\n".join(parts).encode()
+
+
+class _Canvas:
+    """Paletted pixel buffer with just enough drawing primitives for a bar chart."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height)
+
+    def fill_rect(self, x0: int, y0: int, x1: int, y1: int, color: int) -> None:
+        x0, x1 = max(0, min(x0, x1)), min(self.width, max(x0, x1))
+        y0, y1 = max(0, min(y0, y1)), min(self.height, max(y0, y1))
+        if x0 >= x1:
+            return
+        run = bytes([color]) * (x1 - x0)
+        for y in range(y0, y1):
+            start = y * self.width + x0
+            self.pixels[start:start + len(run)] = run
+
+    def text(self, x: int, y: int, text: str, scale: int = 1, vertical: bool = False) -> None:
+        """Draw text with its top-left corner at (x, y); vertical text reads bottom-up."""
+        advance = (GLYPH_WIDTH + 1) * scale
+        for i, char in enumerate(text.upper()):
+            glyph = FONT.get(char)
+            if glyph is None:
+                continue
+            for row, bits in enumerate(glyph):
+                for col, bit in enumerate(bits):
+                    if bit != "1":
+                        continue
+                    if vertical:
+                        px = x + row * scale
+                        py = y - i * advance - col * scale
+                    else:
+                        px = x + i * advance + col * scale
+                        py = y + row * scale
+                    self.fill_rect(px, py, px + scale, py + scale, BLACK)
+
+    def to_png(self) -> bytes:
+        raw = bytearray()
+        for y in range(self.height):
+            raw.append(0)  # filter type: none
+            raw += self.pixels[y * self.width:(y + 1) * self.width]
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 3, 0, 0, 0)
+        return b"".join([
+            b"\x89PNG\r\n\x1a\n",
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"PLTE", PALETTE),
+            _png_chunk(b"IDAT", zlib.compress(bytes(raw), 6)),
+            _png_chunk(b"IEND", b""),
+        ])
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _text_width(text: str, scale: int = 1) -> int:
+    return len(text) * (GLYPH_WIDTH + 1) * scale - scale
+
+
+def render_growth_time_png(freq: Counter[int]) -> bytes:
+    """Render a bar chart of berry growth time frequencies as PNG bytes."""
+    layout = _Layout(freq)
+    canvas = _Canvas(WIDTH, HEIGHT)
+
+    for tick in layout.y_ticks:
+        y = layout.y(tick)
+        canvas.fill_rect(layout.plot_left, y, layout.plot_right, y + 1, GREY)
+        label = str(tick)
+        canvas.text(layout.plot_left - 8 - _text_width(label), y - GLYPH_HEIGHT // 2, label)
+    for label, value, center in zip(layout.labels, layout.values, layout.bar_centers):
+        left = center - layout.bar_width // 2
+        canvas.fill_rect(left, layout.y(value), left + layout.bar_width, layout.plot_bottom, BLUE)
+        canvas.text(center - _text_width(label) // 2, layout.plot_bottom + 8, label)
+
+    canvas.fill_rect(layout.plot_left, layout.plot_bottom, layout.plot_right, layout.plot_bottom + 1, BLACK)
+    canvas.fill_rect(layout.plot_left, layout.plot_top, layout.plot_left + 1, layout.plot_bottom, BLACK)
+    canvas.text((WIDTH - _text_width(TITLE, 2)) // 2, MARGIN_TOP // 2 - GLYPH_HEIGHT, TITLE, scale=2)
+    x_center = (layout.plot_left + layout.plot_right) // 2
+    canvas.text(x_center - _text_width(X_LABEL) // 2, HEIGHT - 24, X_LABEL)
+    y_center = (layout.plot_top + layout.plot_bottom) // 2
+    canvas.text(16, y_center + _text_width(Y_LABEL) // 2, Y_LABEL, vertical=True)
+
+    return canvas.to_png()
@@ -0,0 +1,99 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from src.dataset import BerrySnapshot
+
+
+class SnapshotRefresher:
+    """Fills the snapshot cache at startup and re-crawls it ahead of expiry.
+
+    A refresh is due `refresh_after_seconds` after the current snapshot was
+    crawled, minus a random jitter of up to `jitter_seconds` drawn per cycle,
+    so workers sharing a cache do not crawl in lockstep. A worker that finds
+    a newer snapshot (e.g. refreshed by another worker) waits for that one
+    to come due instead. Failed refreshes are retried after `retry_seconds`.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[], Awaitable[BerrySnapshot]],
+        current: Callable[[], Awaitable[BerrySnapshot | None]],
+        refresh_after_seconds: float,
+        jitter_seconds: float = 0.0,
+        retry_seconds: float = 30.0,
+    ):
+        self._refresh = refresh
+        self._current = current
+        self.refresh_after_seconds = refresh_after_seconds
+        self.jitter_seconds = min(jitter_seconds, refresh_after_seconds)
+        self.retry_seconds = retry_seconds
+        self.snapshot: BerrySnapshot | None = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_at: float | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def warm_up(self, timeout_seconds: float | None = None) -> bool:
+        """Crawl once unless a usable snapshot is already cached; False if that failed."""
+        if await self._latest() is not None:
+            return True
+        try:
+            await asyncio.wait_for(self.refresh_now(), timeout_seconds)
+        except Exception:
+            return False
+        return True
+
+    async def refresh_now(self) -> BerrySnapshot:
+        """Crawl PokeAPI into the cache; exceptions propagate after being counted."""
+        try:
+            snapshot = await self._refresh()
+        except Exception:
+            self.failures += 1
+            raise
+        self.snapshot = snapshot
+        self.refreshes += 1
+        self.last_refresh_at = time.time()
+        return snapshot
+
+    def start(self) -> None:
+        """Start the periodic refresh task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refresh task and wait until it has finished."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def due_in(self, snapshot: BerrySnapshot | None, jitter: float = 0.0) -> float:
+        """Seconds until `snapshot` should be refreshed; 0 when there is none."""
+        if snapshot is None:
+            return 0.0
+        return max(0.0, self.refresh_after_seconds - jitter - snapshot.age())
+
+    async def _run(self) -> None:
+        while True:
+            jitter = random.uniform(0, self.jitter_seconds)
+            while (delay := self.due_in(await self._latest(), jitter)) > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.refresh_now()
+            except Exception:
+                await asyncio.sleep(self.retry_seconds)
+
+    async def _latest(self) -> BerrySnapshot | None:
+        """The cached snapshot, or the last one this refresher crawled if newer."""
+        cached = await self._current()
+        if cached is None or (self.snapshot is not None and self.snapshot.fetched_at > cached.fetched_at):
+            return self.snapshot
+        return cached
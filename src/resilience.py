@@ -0,0 +1,244 @@
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import httpx
+
+from src.metrics import Histogram
+
+# Upstream answers worth retrying: overload and gateway failures.
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    fail fast for `reset_seconds`. Then one trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def before_call(self) -> None:
+        """Reserve a call, or raise CircuitOpenError when the circuit is open."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                self.rejected += 1
+                raise CircuitOpenError("PokeAPI circuit breaker is open")
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError("PokeAPI circuit breaker is half-open")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._trial_in_flight = False
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+
+    def release_trial(self) -> None:
+        """Give back a call reserved by `before_call` that ended without an outcome."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """The most recent upstream latencies, for percentile-based hedging."""
+
+    def __init__(self, size: int = 256, min_samples: int = 20):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        """Nearest-rank percentile (0-100), or None until enough samples are seen."""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+@dataclass
+class UpstreamCallStats:
+    """Counters of the resilience layer, for metrics."""
+
+    requests: int = 0
+    retries: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    failures: int = 0
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper adding retries, hedging and a circuit breaker to GETs.
+
+    Transport errors and RETRYABLE_STATUS_CODES are retried up to `retries`
+    times with full-jitter exponential backoff. Once latencies are known, a
+    request still running past the `hedge_percentile` latency gets a
+    duplicate; whichever answers first wins. Other methods pass through.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retries: int = 2,
+        backoff_seconds: float = 0.1,
+        max_backoff_seconds: float = 2.0,
+        hedge_percentile: float | None = 95.0,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.transport = transport
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyWindow()
+        self.stats = UpstreamCallStats()
+        self.call_seconds = Histogram()  # every upstream call, by endpoint and status
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self._call(request)
+
+        self.stats.requests += 1
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                response = await self._send(request)
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                if attempt >= self.retries:
+                    self.stats.failures += 1
+                    raise
+            except BaseException:
+                # Cancelled or otherwise aborted: neither success nor failure,
+                # but a half-open trial must not stay reserved forever.
+                self.breaker.release_trial()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt >= self.retries:
+                    self.stats.failures += 1
+                    return response
+                await response.aclose()
+
+            attempt += 1
+            self.stats.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2**(attempt - 1))]."""
+        ceiling = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        """Send once, hedging with a duplicate if the first try is slow."""
+        start = time.monotonic()
+        delay = None
+        if self.hedge_percentile is not None:
+            delay = self.latency.percentile(self.hedge_percentile)
+
+        if delay is None:
+            response = await self._call(request)
+        else:
+            primary = asyncio.ensure_future(self._call(request))
+            response = await self._hedge(request, primary, delay)
+        self.latency.observe(time.monotonic() - start)
+        return response
+
+    async def _hedge(
+        self, request: httpx.Request, primary: asyncio.Future[httpx.Response], delay: float
+    ) -> httpx.Response:
+        """Race a duplicate against `primary` once it has run for `delay` seconds."""
+        pending: set[asyncio.Future[httpx.Response]] = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.stats.hedges += 1
+            hedge = asyncio.ensure_future(self._call(request))
+            pending.add(hedge)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [future for future in done if future.exception() is None]
+                if succeeded:
+                    winner, *extra = succeeded
+                    for future in extra:
+                        _close_response(future)
+                    if winner is hedge:
+                        self.stats.hedge_wins += 1
+                    return winner.result()
+                if not pending:
+                    return done.pop().result()  # both failed: raise the last error
+        finally:
+            for future in pending:
+                future.cancel()
+                future.add_done_callback(_close_response)
+
+    async def _call(self, request: httpx.Request) -> httpx.Response:
+        """One call to the wrapped transport, timed into `call_seconds`."""
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        except asyncio.CancelledError:
+            status = "cancelled"  # a hedge that lost the race
+            raise
+        finally:
+            self.call_seconds.observe(
+                time.perf_counter() - start, endpoint_label(request.url.path), status
+            )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def endpoint_label(path: str) -> str:
+    """Path template for metrics: numeric segments become `{id}`."""
+    return "/".join("{id}" if segment.isdigit() else segment for segment in path.split("/"))
+
+
+def _close_response(future: asyncio.Future[httpx.Response]) -> None:
+    """Close the response of a losing hedge that finished despite cancellation."""
+    if not future.cancelled() and future.exception() is None:
+        asyncio.ensure_future(future.result().aclose())
@@ -1,58 +1,380 @@
-import statistics
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import Any, Literal
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
-from src.chart import render_growth_time_histogram
-from src.dependencies import BaseUrlDep, CacheDep, CacheTtlDep
-from src.models import AllBerryStatsResponse
-from src.upstream_api import fetch_berry_data, UpstreamApiError
+from src.artifacts import encoded_kind, get_or_build_artifact
+from src.cache import AnyCacheBackend
+from src.chart import MEDIA_TYPES, ChartRenderUnavailable
+from src.compression import COMPRESSIBLE_MEDIA_TYPES, ResponseCompressor
+from src.dataset import AttributeSummary, BerrySnapshot
+from src.dependencies import (
+    BaseUrlDep,
+    BerrySnapshotDep,
+    CacheDep,
+    CacheSoftTtlDep,
+    CacheStaleIfErrorDep,
+    CacheTtlDep,
+    ChartRendererDep,
+    HttpClientDep,
+    RefresherDep,
+    ResponseCompressorDep,
+    UpstreamConcurrencyDep,
+    UpstreamMaxPagesDep,
+    UpstreamPageSizeDep,
+    WarmSnapshotDep,
+)
+from src.export import (
+    NDJSON_MEDIA_TYPE,
+    InvalidExportRequest,
+    decode_cursor,
+    encode_cursor,
+    ndjson_chunks,
+    ndjson_lines,
+    parse_fields,
+    slice_berries,
+)
+from src.fastjson import FastJSONResponse, dumps
+from src.http_caching import matching_etag, representation_etag, validator_headers
+from src.models import (
+    AllBerryStatsResponse,
+    AttributeStatsResponse,
+    CategoricalAttribute,
+    GroupedStatsResponse,
+    HealthResponse,
+    NumericAttribute,
+    ReadinessResponse,
+)
+from src.metrics import (
+    CONTENT_TYPE,
+    MetricsWriter,
+    write_cache_metrics,
+    write_render_metrics,
+    write_upstream_metrics,
+)
+from src.upstream_api import (
+    UpstreamApiError,
+    cached_snapshot,
+    stream_berries,
+)
 
 router = APIRouter()
 
 
 @router.get("/allBerryStats", response_model=AllBerryStatsResponse)
 async def all_berry_stats(
+    snapshot: BerrySnapshotDep,
+    cache: CacheDep,
+    cache_ttl: CacheTtlDep,
+    soft_ttl: CacheSoftTtlDep,
+    compressor: ResponseCompressorDep,
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+) -> Response:
+    async def build() -> bytes:
+        return dumps(_all_berry_stats_document(snapshot))
+
+    return await _artifact_response(
+        "stats.json",
+        "application/json",
+        build,
+        snapshot,
+        cache,
+        cache_ttl,
+        soft_ttl,
+        compressor,
+        if_none_match,
+        accept_encoding,
+    )
+
+
+def _all_berry_stats_document(snapshot: BerrySnapshot) -> dict[str, Any]:
+    """The /allBerryStats body, shaped like AllBerryStatsResponse."""
+    summary = snapshot.dataset.summary("growth_time")
+    return {
+        "berries_names": snapshot.dataset.names,
+        "min_growth_time": summary.min,
+        "median_growth_time": summary.median,
+        "max_growth_time": summary.max,
+        "variance_growth_time": summary.variance,
+        "mean_growth_time": summary.mean,
+        "frequency_growth_time": summary.frequency,
+    }
+
+
+@router.get("/stats/{attribute}", response_model=AttributeStatsResponse)
+async def attribute_stats(
+    attribute: NumericAttribute,
+    snapshot: BerrySnapshotDep,
+    q: str = Query(default="0.25,0.5,0.75", description="Comma-separated quantiles in [0, 1]"),
+) -> FastJSONResponse:
+    quantiles = _parse_quantiles(q)
+    summary = snapshot.dataset.summary(attribute)
+    return FastJSONResponse({
+        "attribute": attribute,
+        **_group_stats(summary),
+        "frequency": summary.frequency,
+        "quantiles": {str(value): summary.quantile(value) for value in quantiles},
+    })
+
+
+@router.get("/query", response_model=GroupedStatsResponse)
+async def grouped_stats(
+    snapshot: BerrySnapshotDep,
+    attribute: NumericAttribute = "growth_time",
+    group_by: CategoricalAttribute | None = None,
+    firmness: str | None = None,
+    natural_gift_type: str | None = None,
+    flavors: str | None = Query(default=None, description="Berries having this flavor"),
+) -> FastJSONResponse:
+    filters = {
+        name: label
+        for name, label in (
+            ("firmness", firmness),
+            ("natural_gift_type", natural_gift_type),
+            ("flavors", flavors),
+        )
+        if label is not None
+    }
+    summaries = snapshot.dataset.grouped_summaries(attribute, group_by, filters)
+    return FastJSONResponse({
+        "attribute": attribute,
+        "group_by": group_by,
+        "filters": filters,
+        "groups": {label: _group_stats(summary) for label, summary in summaries.items()},
+    })
+
+
+def _group_stats(summary: AttributeSummary) -> dict[str, Any]:
+    """The GroupStats fields of a summary."""
+    return {
+        "count": summary.count,
+        "min": summary.min,
+        "max": summary.max,
+        "mean": summary.mean,
+        "median": summary.median,
+        "variance": summary.variance,
+    }
+
+
+def _parse_quantiles(raw: str) -> list[float]:
+    """Parse a comma-separated quantile list, rejecting values outside [0, 1]."""
+    try:
+        values = [float(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Quantiles must be numbers")
+    if not all(0.0 <= value <= 1.0 for value in values):
+        raise HTTPException(status_code=422, detail="Quantiles must be between 0 and 1")
+    return values
+
+
+@router.get("/berries", response_class=StreamingResponse)
+async def berries(
     base_url: BaseUrlDep,
     cache: CacheDep,
     cache_ttl: CacheTtlDep,
-) -> AllBerryStatsResponse:
+    concurrency: UpstreamConcurrencyDep,
+    http_client: HttpClientDep,
+    page_size: UpstreamPageSizeDep,
+    max_pages: UpstreamMaxPagesDep,
+    stale_if_error: CacheStaleIfErrorDep,
+    warm_snapshot: WarmSnapshotDep,
+    fields: str | None = Query(default=None, description="Comma-separated Berry fields"),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    limit: int | None = Query(default=None, ge=1),
+) -> StreamingResponse:
     try:
-        names, growth_times, frequency = await fetch_berry_data(
-            base_url, cache, cache_ttl
-        )
-    except UpstreamApiError:
-        raise HTTPException(
-            status_code=502,
-            detail="Failed to fetch data from PokeAPI"
-        )
+        projection = parse_fields(fields)
+        offset = decode_cursor(cursor)
+    except InvalidExportRequest as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    stop = None if limit is None else offset + limit
 
-    return AllBerryStatsResponse(
-        berries_names=names,
-        min_growth_time=min(growth_times),
-        max_growth_time=max(growth_times),
-        mean_growth_time=statistics.mean(growth_times),
-        median_growth_time=statistics.median(growth_times),
-        variance_growth_time=statistics.pvariance(growth_times),
-        frequency_growth_time=dict(frequency),
+    snapshot = await cached_snapshot(cache, cache_ttl, warm_snapshot)
+    if snapshot is not None:
+        headers = {}
+        if stop is not None and stop < len(snapshot.dataset):
+            headers["X-Next-Cursor"] = encode_cursor(stop)
+        rows = snapshot.dataset.rows(projection, offset, stop)
+        return StreamingResponse(ndjson_chunks(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    # No cached dataset: stream details as the shared crawl delivers them; it
+    # runs to the end and is cached even when this page stops early. Headers
+    # go out with the first row, before the page length is known, so any
+    # non-empty page links onward and an empty page marks the end.
+    upstream = slice_berries(
+        stream_berries(
+            base_url,
+            cache,
+            cache_ttl,
+            concurrency=concurrency,
+            client=http_client,
+            page_size=page_size,
+            max_pages=max_pages,
+            stale_if_error_seconds=stale_if_error,
+        ),
+        offset,
+        stop,
+    )
+    try:
+        first = await anext(upstream, None)
+    except UpstreamApiError:
+        raise HTTPException(status_code=502, detail="Failed to fetch data from PokeAPI")
+    headers = {"X-Next-Cursor": encode_cursor(stop)} if stop is not None and first else {}
+    return StreamingResponse(
+        ndjson_lines(first, upstream, projection), media_type=NDJSON_MEDIA_TYPE, headers=headers
     )
 
 
 @router.get("/histogram", response_class=Response)
 async def histogram(
-    base_url: BaseUrlDep,
+    snapshot: BerrySnapshotDep,
     cache: CacheDep,
     cache_ttl: CacheTtlDep,
+    soft_ttl: CacheSoftTtlDep,
+    renderer: ChartRendererDep,
+    compressor: ResponseCompressorDep,
+    format: Literal["png", "svg"] = "png",
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
 ) -> Response:
+    async def build() -> bytes:
+        frequency = Counter(snapshot.dataset.frequency("growth_time"))
+        return await renderer.render_growth_time_histogram(frequency, format)
+
     try:
-        _, growth_times, frequency = await fetch_berry_data(
-            base_url, cache, cache_ttl
+        return await _artifact_response(
+            f"histogram.{format}",
+            MEDIA_TYPES[format],
+            build,
+            snapshot,
+            cache,
+            cache_ttl,
+            soft_ttl,
+            compressor,
+            if_none_match,
+            accept_encoding,
         )
-    except UpstreamApiError:
+    except ChartRenderUnavailable:
         raise HTTPException(
-            status_code=502,
-            detail="Failed to fetch data from PokeAPI"
+            status_code=503,
+            detail="Chart rendering is temporarily unavailable",
+            headers={"Retry-After": "1"},
         )
 
-    png_bytes: bytes = render_growth_time_histogram(frequency)
-    return Response(content=png_bytes, media_type="image/png")
+
+@router.get("/health", response_model=HealthResponse)
+async def health() -> FastJSONResponse:
+    """Liveness: the process is serving requests."""
+    return FastJSONResponse({"status": "ok"}, headers={"Cache-Control": "no-store"})
+
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def ready(
+    cache: CacheDep,
+    cache_ttl: CacheTtlDep,
+    warm_snapshot: WarmSnapshotDep,
+    refresher: RefresherDep,
+) -> FastJSONResponse:
+    """Readiness: 503 until a dataset within the hard TTL can be served without a crawl."""
+    snapshot = await cached_snapshot(cache, cache_ttl, warm_snapshot)
+    is_ready = snapshot is not None or cache is None  # without a cache every request crawls
+    return FastJSONResponse(
+        {
+            "ready": is_ready,
+            "dataset_version": snapshot.version if snapshot else None,
+            "dataset_age_seconds": snapshot.age() if snapshot else None,
+            "berries": len(snapshot.dataset) if snapshot else None,
+            "refresher_running": refresher is not None and refresher.running,
+            "last_refresh_at": refresher.last_refresh_at if refresher else None,
+            "refresh_failures": refresher.failures if refresher else 0,
+        },
+        status_code=200 if is_ready else 503,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.get("/metrics", response_class=Response, include_in_schema=False)
+async def metrics(
+    request: Request,
+    cache: CacheDep,
+    cache_ttl: CacheTtlDep,
+    warm_snapshot: WarmSnapshotDep,
+) -> Response:
+    """Prometheus text exposition of this worker's counters and histograms."""
+    state = request.app.state
+    out = MetricsWriter(prefix="pokeberries_")
+    out.histogram(
+        "http_request_duration_seconds",
+        "Time from request receipt to the last body chunk, by route template.",
+        state.request_seconds,
+        ("method", "route", "status"),
+    )
+    write_upstream_metrics(out, getattr(state, "upstream_transport", None))
+    write_cache_metrics(out, cache)
+    write_render_metrics(out, state.chart_renderer, state.response_compressor)
+
+    snapshot = await cached_snapshot(cache, cache_ttl, warm_snapshot)
+    out.gauge(
+        "dataset_age_seconds",
+        "Age of the servable dataset snapshot (NaN when there is none).",
+        snapshot.age() if snapshot else float("nan"),
+    )
+    out.gauge(
+        "dataset_berries",
+        "Berries in the servable dataset snapshot.",
+        len(snapshot.dataset) if snapshot else 0,
+    )
+    refresher = getattr(state, "refresher", None)
+    if refresher is not None:
+        out.counter(
+            "snapshot_refreshes_total", "Warm-up and scheduled crawls that succeeded.", refresher.refreshes
+        )
+        out.counter(
+            "snapshot_refresh_failures_total", "Warm-up and scheduled crawls that failed.", refresher.failures
+        )
+    return Response(content=out.render(), media_type=CONTENT_TYPE)
+
+
+async def _artifact_response(
+    kind: str,
+    media_type: str,
+    build: Callable[[], Awaitable[bytes]],
+    snapshot: BerrySnapshot,
+    cache: AnyCacheBackend | None,
+    cache_ttl: int,
+    soft_ttl: int | None,
+    compressor: ResponseCompressor,
+    if_none_match: str | None,
+    accept_encoding: str | None,
+) -> Response:
+    """Serve a per-version artifact.
+
+    A matching If-None-Match gets a 304 before anything is built. Otherwise
+    the body comes from the artifact cache, and so does its encoded variant
+    when the client accepts one.
+    """
+    headers = validator_headers(kind, snapshot, cache_ttl, soft_ttl)
+    if media_type in COMPRESSIBLE_MEDIA_TYPES:
+        headers["Vary"] = "Accept-Encoding"
+    matched = matching_etag(if_none_match, headers["ETag"])
+    if matched is not None:
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+
+    body = await get_or_build_artifact(cache, kind, snapshot.version, cache_ttl, build)
+    encoding = compressor.choose(accept_encoding, media_type, len(body))
+    if encoding is None:
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def build_encoded() -> bytes:
+        return await compressor.encode(encoding, body)
+
+    encoded = await get_or_build_artifact(
+        cache, encoded_kind(kind, encoding), snapshot.version, cache_ttl, build_encoded
+    )
+    compressor.record(encoding, len(body), len(encoded))
+    headers["ETag"] = representation_etag(headers["ETag"], encoding)
+    headers["Content-Encoding"] = encoding
+    return Response(content=encoded, media_type=media_type, headers=headers)
@@ -0,0 +1,44 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same result or exception instead of repeating it.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Task[Any]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn` for `key`, or join the call already in flight."""
+        # shield: a cancelled caller must not cancel the work for the others
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task[Any]:
+        """The task running `fn` for `key`, started now unless one is in flight.
+
+        The task runs to completion whether or not anyone awaits it.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced += 1
+        return task
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for `key` is currently running."""
+        return key in self._calls
+
+    def _forget(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
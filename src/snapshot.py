@@ -0,0 +1,178 @@
+"""On-disk dataset snapshots that workers memory-map at startup.
+
+Build one from PokeAPI with:
+
+    python -m src.snapshot /var/lib/pokeapi/berries.snap
+
+and point `SNAPSHOT_PATH` at it. Every worker maps the same file, so the
+integer columns are shared through the OS page cache instead of being
+copied into each process.
+"""
+
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from src.cache import SerializationError
+from src.config import Settings
+from src.dataset import (
+    BerrySnapshot,
+    CrawlStats,
+    decode_columns,
+    encode_columns,
+    int32_column,
+)
+from src.upstream_api import create_http_client, fetch_berry_snapshot
+
+MAGIC = b"PKBSNAP\x00"
+FORMAT_VERSION = 1
+# magic, format version, column count, rows, fetched_at, reused, downloaded, dataset version
+HEADER = struct.Struct("<8sHHIdqq16s")
+# column name, kind, block offset from the start of the file, block length
+COLUMN = struct.Struct("<32sB7xQQ")
+ALIGNMENT = 8
+
+
+def dump_snapshot(snapshot: BerrySnapshot) -> bytes:
+    """Encode a snapshot: header, column table, then 8-byte aligned column blocks.
+
+    Integer columns are little-endian int32 so they can be mapped as-is.
+    """
+    columns = encode_columns(snapshot.dataset)
+    stats = snapshot.crawl_stats
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(columns),
+        len(snapshot.dataset),
+        snapshot.fetched_at,
+        stats.reused if stats else -1,
+        stats.downloaded if stats else -1,
+        snapshot.version.encode(),
+    )
+    table, blocks = [], []
+    offset = _aligned(HEADER.size + COLUMN.size * len(columns))
+    for name, kind, block in columns:
+        table.append(COLUMN.pack(name.encode(), kind, offset, len(block)))
+        padding = _aligned(len(block)) - len(block)
+        blocks.append(block + b"\x00" * padding)
+        offset += len(block) + padding
+
+    head = header + b"".join(table)
+    return head + b"\x00" * (_aligned(len(head)) - len(head)) + b"".join(blocks)
+
+
+def write_snapshot(path: str, snapshot: BerrySnapshot) -> int:
+    """Write a snapshot file atomically and return its size in bytes.
+
+    The file is replaced by rename, so workers that mapped the old one keep
+    reading it unchanged.
+    """
+    data = dump_snapshot(snapshot)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(data)
+
+
+def load_snapshot(path: str) -> BerrySnapshot:
+    """Memory-map a snapshot file.
+
+    On little-endian hosts the integer columns are views into the mapping and
+    are never copied; names and labels are decoded into Python strings.
+    Raises OSError if the file cannot be read and SerializationError if it is
+    not a compatible snapshot.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise SerializationError(f"Truncated snapshot file {path}")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _load_columns(memoryview(mapped))
+
+
+def _load_columns(data: memoryview) -> BerrySnapshot:
+    magic, version, column_count, count, fetched_at, reused, downloaded, dataset_version = (
+        HEADER.unpack_from(data)
+    )
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise SerializationError(f"Unsupported snapshot format {magic!r} v{version}")
+    if HEADER.size + COLUMN.size * column_count > len(data):
+        raise SerializationError("Truncated snapshot column table")
+
+    columns = []
+    for i in range(column_count):
+        raw_name, kind, offset, length = COLUMN.unpack_from(data, HEADER.size + COLUMN.size * i)
+        name = raw_name.rstrip(b"\x00").decode()
+        if offset + length > len(data):
+            raise SerializationError(f"Snapshot column {name} runs past the end of the file")
+        columns.append((name, kind, data[offset:offset + length]))
+    try:
+        dataset = decode_columns(columns, count, int_column=_int32_view)
+    except ValueError as e:
+        raise SerializationError(f"Snapshot file {e}") from e
+
+    return BerrySnapshot(
+        dataset=dataset,
+        fetched_at=fetched_at,
+        version=dataset_version.rstrip(b"\x00").decode(),
+        crawl_stats=CrawlStats(reused, downloaded) if reused >= 0 else None,
+    )
+
+
+def _int32_view(block: memoryview) -> memoryview | array:
+    """Zero-copy int32 view of a little-endian block; a swapped copy on big-endian hosts."""
+    if sys.byteorder == "little":
+        return block.cast("i")
+    return int32_column(block)
+
+
+def _aligned(size: int) -> int:
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+async def build_snapshot(settings: Settings) -> BerrySnapshot:
+    """Crawl PokeAPI once, bypassing every cache."""
+    async with create_http_client(settings) as client:
+        return await fetch_berry_snapshot(
+            settings.pokeapi_base_url,
+            None,
+            0,
+            concurrency=settings.upstream_concurrency,
+            client=client,
+            page_size=settings.upstream_page_size,
+            max_pages=settings.upstream_max_pages,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an on-disk berry dataset snapshot from PokeAPI.")
+    parser.add_argument("path", help="Snapshot file to write (replaced atomically)")
+    parser.add_argument("--base-url", help="PokeAPI base URL (default: POKEAPI_BASE_URL)")
+    args = parser.parse_args()
+
+    overrides = {"pokeapi_base_url": args.base_url} if args.base_url else {}
+    snapshot = asyncio.run(build_snapshot(Settings(**overrides)))
+    size = write_snapshot(args.path, snapshot)
+    json.dump(
+        {"path": args.path, "version": snapshot.version, "berries": len(snapshot.dataset), "bytes": size},
+        sys.stdout,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,128 @@
+import asyncio
+import time
 import httpx
 from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, aclosing
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
 
-from src.cache import CacheBackend
+from src.artifacts import invalidate_artifacts
+from src.cache import AnyCacheBackend, cache_get, cache_set
+from src.config import Settings
+from src.dataset import BerrySnapshot, CrawlStats
+from src.metrics import Histogram
 from src.models import Berry, BerryListResponse
+from src.resilience import CircuitBreaker, ResilientTransport
+from src.singleflight import SingleFlight
+
+
+DEFAULT_CONCURRENCY = 10
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_PAGES = 100  # safety cap on list pages per crawl
+DEFAULT_DETAIL_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_STALE_IF_ERROR_SECONDS = 0
+SNAPSHOT_CACHE_KEY = "berries:all"
+
+# Concurrent cache misses for the same key share one upstream crawl.
+berries_flight = SingleFlight()
+
+# Strong references to stale-while-revalidate refreshes until they finish.
+_background_refreshes: set[asyncio.Task[Any]] = set()
+
+
+class _CrawlFeed:
+    """Berries of one crawl in upstream order, readable while the crawl runs."""
+
+    def __init__(self) -> None:
+        self.berries: list[Berry] = []
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def publish(self, berry: Berry) -> None:
+        self.berries.append(berry)
+        self._notify()
+
+    def close(self) -> None:
+        self.done = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[Berry]:
+        """Yield the berries published so far, then each new one until the crawl ends."""
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.berries):
+                yield self.berries[index]
+                index += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+# Feed of the snapshot crawl in flight in berries_flight, for streaming readers.
+_crawl_feeds: dict[str, _CrawlFeed] = {}
+
+
+def _join_crawl(
+    crawl: Callable[[_CrawlFeed], Awaitable[BerrySnapshot]],
+) -> tuple[asyncio.Task[BerrySnapshot], _CrawlFeed]:
+    """The snapshot crawl in flight and the feed of its berries, starting `crawl` if none is.
+
+    Every snapshot crawl starts here, so fetches, background refreshes and
+    streamed /berries requests share one crawl. The crawl runs to the end
+    even when every caller has gone, so its snapshot still gets cached.
+    """
+    key = SNAPSHOT_CACHE_KEY
+    feed = _crawl_feeds.get(key)
+    if feed is not None:
+        return berries_flight.start(key, partial(crawl, feed)), feed
+
+    feed = _crawl_feeds[key] = _CrawlFeed()
+    task = berries_flight.start(key, partial(crawl, feed))
+
+    def finish(_: asyncio.Task[BerrySnapshot]) -> None:
+        feed.close()
+        if _crawl_feeds.get(key) is feed:
+            del _crawl_feeds[key]
+
+    task.add_done_callback(finish)
+    return task, feed
+
+
+@dataclass
+class CachedBerryDetail:
+    """Per-berry cache entry: the upstream detail document and its HTTP validators.
+
+    The raw document is kept rather than a parsed Berry so cached entries stay
+    valid when the Berry model changes between deploys.
+    """
+
+    document: dict[str, Any]
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+# Running totals over every crawl made by this process.
+crawl_totals = CrawlStats()
+
+# Wall time of every full crawl, by outcome ("ok" or "error").
+crawl_seconds = Histogram(buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+
+
+@dataclass
+class FallbackStats:
+    """How often data past its hard TTL was served because PokeAPI failed."""
+
+    stale_served: int = 0
+
+
+fallback_totals = FallbackStats()
 
 
 class UpstreamApiError(Exception):
@@ -10,66 +130,535 @@ class UpstreamApiError(Exception):
     pass
 
 
+def create_upstream_transport(
+    settings: Settings,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> ResilientTransport:
+    """Factory: ResilientTransport (retries, hedging, circuit breaker) for PokeAPI calls.
+
+    Wraps `transport`, or a pooled HTTP transport by default. The app keeps
+    it on `app.state` so /metrics can read its counters.
+    """
+    if transport is None:
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        )
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=settings.http2_enabled)
+    return ResilientTransport(
+        transport,
+        retries=settings.upstream_retries,
+        backoff_seconds=settings.upstream_retry_backoff_seconds,
+        max_backoff_seconds=settings.upstream_retry_max_backoff_seconds,
+        hedge_percentile=settings.upstream_hedge_percentile,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            reset_seconds=settings.circuit_breaker_reset_seconds,
+        ),
+    )
+
+
+def create_http_client(
+    settings: Settings,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Factory: create the pooled upstream HTTP client shared by the application.
+
+    A ResilientTransport is used as-is; any other `transport` (or none) is
+    wrapped by `create_upstream_transport` first.
+    """
+    if not isinstance(transport, ResilientTransport):
+        transport = create_upstream_transport(settings, transport)
+    return httpx.AsyncClient(timeout=settings.http_timeout_seconds, transport=transport)
+
+
 async def fetch_all_berries(
     base_url: str,
-    cache: CacheBackend | None,
+    cache: AnyCacheBackend | None,
     cache_ttl_seconds: int,
     endpoint: str = "berry/",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    soft_ttl_seconds: int | None = None,
+    detail_ttl_seconds: int = DEFAULT_DETAIL_TTL_SECONDS,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    stale_if_error_seconds: int = DEFAULT_STALE_IF_ERROR_SECONDS,
 ) -> list[Berry]:
     """Fetch all berries from PokeAPI, handling pagination and caching."""
-    cache_key = "berries:all"
+    snapshot = await _get_snapshot(
+        base_url,
+        cache,
+        cache_ttl_seconds,
+        endpoint,
+        concurrency,
+        client,
+        soft_ttl_seconds,
+        detail_ttl_seconds,
+        page_size,
+        max_pages,
+        stale_if_error_seconds,
+    )
+    return snapshot.berries
+
+
+async def _get_snapshot(
+    base_url: str,
+    cache: AnyCacheBackend | None,
+    cache_ttl_seconds: int,
+    endpoint: str = "berry/",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    soft_ttl_seconds: int | None = None,
+    detail_ttl_seconds: int = DEFAULT_DETAIL_TTL_SECONDS,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    stale_if_error_seconds: int = DEFAULT_STALE_IF_ERROR_SECONDS,
+    warm_snapshot: BerrySnapshot | None = None,
+    force_refresh: bool = False,
+) -> BerrySnapshot:
+    """Return the current dataset snapshot from cache, crawling PokeAPI when needed.
+
+    `cache_ttl_seconds` is the hard TTL: older data is not served while
+    PokeAPI answers. With a `soft_ttl_seconds`, data past the soft TTL is
+    still returned immediately while a single background task refreshes it
+    (stale-while-revalidate). Snapshots are kept `stale_if_error_seconds`
+    past the hard TTL and returned when the crawl fails (stale-if-error).
+    A `warm_snapshot` loaded from disk stands in for the cache entry when it
+    is newer. `force_refresh` crawls regardless of age and raises on failure
+    instead of falling back. Refreshes reuse per-berry cache entries through
+    conditional requests.
+    """
+    cached: BerrySnapshot | None = None
+
+    def crawl_and_store(feed: _CrawlFeed) -> Awaitable[BerrySnapshot]:
+        return _crawl_and_store(
+            base_url,
+            cache,
+            cache_ttl_seconds + stale_if_error_seconds,
+            endpoint,
+            concurrency,
+            client,
+            detail_ttl_seconds,
+            page_size,
+            max_pages,
+            previous=cached,
+            feed=feed,
+        )
 
     if cache is not None:
-        cached_berries = cache.get(cache_key)
-        if cached_berries is not None:
-            return cached_berries
+        cached = await _cached_entry(cache)
+    cached = _newest(cached, warm_snapshot)
+    if cached is not None and not force_refresh:
+        age = cached.age()
+        if age < cache_ttl_seconds:
+            if soft_ttl_seconds is not None and age >= soft_ttl_seconds:
+                _refresh_in_background(crawl_and_store)
+            return cached
+
+    try:
+        task, _ = _join_crawl(crawl_and_store)
+        # shield: a cancelled caller must not cancel the crawl for the others
+        return await asyncio.shield(task)
+    except httpx.HTTPError:
+        if force_refresh:
+            raise
+        if cached is not None and cached.age() < cache_ttl_seconds + stale_if_error_seconds:
+            fallback_totals.stale_served += 1
+            return cached
+        raise
 
-    berries = await _fetch_all_berries_from_api(base_url, endpoint)
 
+async def cached_snapshot(
+    cache: AnyCacheBackend | None,
+    cache_ttl_seconds: int,
+    warm_snapshot: BerrySnapshot | None = None,
+) -> BerrySnapshot | None:
+    """Return the cached (or newer warm) snapshot if it is within the hard TTL, without crawling."""
+    entry = None
     if cache is not None:
-        cache.set(cache_key, berries, cache_ttl_seconds)
+        entry = await _cached_entry(cache)
+    entry = _newest(entry, warm_snapshot)
+    if entry is not None and entry.age() < cache_ttl_seconds:
+        return entry
+    return None
 
-    return berries
 
+async def _cached_entry(cache: AnyCacheBackend) -> BerrySnapshot | None:
+    """The cached snapshot; any other value under the key (e.g. a pre-snapshot list) is a miss."""
+    entry = await cache_get(cache, SNAPSHOT_CACHE_KEY)
+    return entry if isinstance(entry, BerrySnapshot) else None
 
-async def _fetch_all_berries_from_api(base_url: str, endpoint: str = "berry/") -> list[Berry]:
-    """Internal function to fetch berries from API without caching."""
-    berries: list[Berry] = []
-    url = f"{base_url}/{endpoint}"
-    MAX_PAGES = 100  # Safety limit to prevent infinite loops
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        page_count = 0
-        while url is not None and page_count < MAX_PAGES:
-            response = await client.get(url)
-            response.raise_for_status()
-            list_response = BerryListResponse(**response.json())
+def _newest(*snapshots: BerrySnapshot | None) -> BerrySnapshot | None:
+    """The most recently crawled of the given snapshots, if any."""
+    present = [snapshot for snapshot in snapshots if snapshot is not None]
+    return max(present, key=lambda snapshot: snapshot.fetched_at, default=None)
+
+
+async def _store_snapshot(
+    cache: AnyCacheBackend,
+    snapshot: BerrySnapshot,
+    ttl_seconds: int,
+    previous: BerrySnapshot | None,
+) -> None:
+    """Cache a freshly crawled snapshot and drop artifacts of the version it replaces."""
+    await cache_set(cache, SNAPSHOT_CACHE_KEY, snapshot, ttl_seconds)
+    if previous is not None and previous.version != snapshot.version:
+        await invalidate_artifacts(cache, previous.version)
+
+
+async def _crawl_and_store(
+    base_url: str,
+    cache: AnyCacheBackend | None,
+    store_ttl_seconds: int,
+    endpoint: str,
+    concurrency: int,
+    client: httpx.AsyncClient | None,
+    detail_ttl_seconds: int,
+    page_size: int,
+    max_pages: int,
+    previous: BerrySnapshot | None,
+    feed: _CrawlFeed,
+) -> BerrySnapshot:
+    """Crawl PokeAPI into `feed`, then cache the snapshot for `store_ttl_seconds`."""
+    stats = CrawlStats()
+    start, outcome = time.perf_counter(), "error"
+    try:
+        berries = await _fetch_all_berries_from_api(
+            base_url,
+            endpoint,
+            concurrency,
+            client,
+            detail_cache=cache,
+            detail_ttl_seconds=detail_ttl_seconds,
+            stats=stats,
+            page_size=page_size,
+            max_pages=max_pages,
+            feed=feed,
+        )
+        outcome = "ok"
+    finally:
+        crawl_seconds.observe(time.perf_counter() - start, outcome)
+    snapshot = BerrySnapshot.create(berries, crawl_stats=stats)
+    if cache is not None:
+        await _store_snapshot(cache, snapshot, store_ttl_seconds, previous)
+    return snapshot
+
+
+def _refresh_in_background(crawl: Callable[[_CrawlFeed], Awaitable[BerrySnapshot]]) -> None:
+    """Start one background refresh of the snapshot unless a crawl is already running."""
+    if berries_flight.in_flight(SNAPSHOT_CACHE_KEY):
+        return
+
+    async def refresh() -> None:
+        try:
+            task, _ = _join_crawl(crawl)
+            await task
+        except Exception:
+            pass  # stale data keeps being served; the next caller retries
+
+    task = asyncio.create_task(refresh())
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
 
-            for item in list_response.results:
-                detail_response = await client.get(item.url)
-                detail_response.raise_for_status()
-                berry = Berry(**detail_response.json())
-                berries.append(berry)
 
-            url = list_response.next
-            page_count += 1
+async def _fetch_all_berries_from_api(
+    base_url: str,
+    endpoint: str = "berry/",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    detail_cache: AnyCacheBackend | None = None,
+    detail_ttl_seconds: int = DEFAULT_DETAIL_TTL_SECONDS,
+    stats: CrawlStats | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    feed: _CrawlFeed | None = None,
+) -> list[Berry]:
+    """Internal function to fetch berries from API without caching the dataset.
+
+    Uses the shared `client` when given, otherwise a short-lived one. With a
+    `detail_cache`, detail documents are revalidated instead of re-downloaded
+    and the outcome is counted in `stats`. Berries are also published to
+    `feed` as they arrive.
+    """
+    crawl = _Crawl(
+        detail_cache, detail_ttl_seconds, stats or CrawlStats(), page_size, max_pages
+    )
+    url = f"{base_url}/{endpoint}"
+    if client is None:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            berries = await _crawl_berries(client, url, concurrency, crawl, feed)
+    else:
+        berries = await _crawl_berries(client, url, concurrency, crawl, feed)
 
+    crawl_totals.reused += crawl.stats.reused
+    crawl_totals.downloaded += crawl.stats.downloaded
     return berries
 
 
-async def fetch_berry_data(
+@dataclass
+class _Crawl:
+    """Per-crawl settings for list pages and berry details, and its counters."""
+
+    cache: AnyCacheBackend | None
+    ttl_seconds: int
+    stats: CrawlStats
+    page_size: int = DEFAULT_PAGE_SIZE
+    max_pages: int = DEFAULT_MAX_PAGES
+
+
+async def _crawl_berries(
+    client: httpx.AsyncClient,
+    url: str,
+    concurrency: int,
+    crawl: _Crawl,
+    feed: _CrawlFeed | None = None,
+) -> list[Berry]:
+    """Follow list pages and fetch every berry detail. Results keep upstream order."""
+    if feed is None:
+        feed = _CrawlFeed()
+    async for berry in _iter_berries(client, url, concurrency, crawl):
+        feed.publish(berry)
+    return feed.berries
+
+
+async def _iter_berries(
+    client: httpx.AsyncClient,
+    url: str,
+    concurrency: int,
+    crawl: _Crawl,
+) -> AsyncIterator[Berry]:
+    """Yield berries in upstream order as their details arrive.
+
+    The first list page reports the total `count`. Every remaining page is
+    then requested by offset, up to `crawl.max_pages` pages in all, instead
+    of following `next` links one by one. Detail requests are scheduled as
+    each page arrives. List and detail requests share one semaphore, so at
+    most `concurrency` of either are in flight.
+    Closing the iterator early or any upstream error cancels every
+    outstanding request.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks: list[asyncio.Task[Any]] = []
+    scheduled: asyncio.Queue[asyncio.Task[Berry] | None] = asyncio.Queue()
+
+    def schedule_details(page: BerryListResponse) -> None:
+        for item in page.results:
+            task = asyncio.create_task(_fetch_berry_detail(client, item.url, semaphore, crawl))
+            tasks.append(task)
+            scheduled.put_nowait(task)
+
+    async def fetch_pages() -> None:
+        try:
+            first = await _fetch_list_page(client, url, 0, crawl.page_size, semaphore)
+            schedule_details(first)
+            # Upstream may serve fewer items than asked for; page by what it served.
+            served = len(first.results)
+            if served == 0:
+                return
+            offsets = range(served, first.count, served)[: max(0, crawl.max_pages - 1)]
+            pages = [
+                asyncio.create_task(_fetch_list_page(client, url, offset, served, semaphore))
+                for offset in offsets
+            ]
+            tasks.extend(pages)
+            for page in pages:
+                schedule_details(await page)
+        finally:
+            scheduled.put_nowait(None)
+
+    pages_task = asyncio.create_task(fetch_pages())
+    try:
+        while (task := await scheduled.get()) is not None:
+            yield await task
+        await pages_task  # surface list page errors
+    finally:
+        pages_task.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(pages_task, *tasks, return_exceptions=True)
+
+
+async def _fetch_list_page(
+    client: httpx.AsyncClient, url: str, offset: int, limit: int, semaphore: asyncio.Semaphore
+) -> BerryListResponse:
+    """Fetch one list page by offset and limit, bounded by the shared semaphore."""
+    async with semaphore:
+        response = await client.get(url, params={"offset": offset, "limit": limit})
+    response.raise_for_status()
+    return BerryListResponse(**response.json())
+
+
+async def _fetch_berry_detail(
+    client: httpx.AsyncClient,
+    url: str,
+    semaphore: asyncio.Semaphore,
+    crawl: _Crawl,
+) -> Berry:
+    """Fetch a single berry detail document, bounded by the shared semaphore.
+
+    A cached copy is revalidated with If-None-Match / If-Modified-Since and
+    reused as-is when upstream answers 304 Not Modified.
+    """
+    cache_key = f"berries:detail:{url}"
+    cached: CachedBerryDetail | None = None
+    headers: dict[str, str] = {}
+    if crawl.cache is not None:
+        cached = await cache_get(crawl.cache, cache_key)
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+    async with semaphore:
+        response = await client.get(url, headers=headers)
+
+    if cached is not None and response.status_code == httpx.codes.NOT_MODIFIED:
+        crawl.stats.reused += 1
+        return Berry(**cached.document)
+
+    response.raise_for_status()
+    document = response.json()
+    berry = Berry(**document)
+    crawl.stats.downloaded += 1
+
+    if crawl.cache is not None:
+        entry = CachedBerryDetail(
+            document=document,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        await cache_set(crawl.cache, cache_key, entry, crawl.ttl_seconds)
+    return berry
+
+
+async def stream_berries(
     base_url: str,
-    cache: CacheBackend | None,
+    cache: AnyCacheBackend | None,
     cache_ttl_seconds: int,
-) -> tuple[list[str], list[int], Counter[int]]:
-    """Fetch and process berry data. Returns (names, growth_times, frequency)."""
+    endpoint: str = "berry/",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    detail_ttl_seconds: int = DEFAULT_DETAIL_TTL_SECONDS,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    stale_if_error_seconds: int = DEFAULT_STALE_IF_ERROR_SECONDS,
+) -> AsyncIterator[Berry]:
+    """Crawl PokeAPI and yield berries as their details arrive.
+
+    With a cache, the stream follows the shared snapshot crawl, joining one
+    already in flight. Closing the stream early (e.g. after one page) leaves
+    that crawl running, and its snapshot is cached like any other crawl.
+    Without a cache there is nothing to keep, so the stream runs its own
+    crawl and closing it cancels the outstanding requests. Errors surface as
+    `UpstreamApiError`.
+    """
+    try:
+        if cache is None:
+            private = _stream_private_crawl(base_url, endpoint, concurrency, client, page_size, max_pages)
+            async with aclosing(private):
+                async for berry in private:
+                    yield berry
+            return
+
+        task, feed = _join_crawl(partial(
+            _crawl_and_store,
+            base_url,
+            cache,
+            cache_ttl_seconds + stale_if_error_seconds,
+            endpoint,
+            concurrency,
+            client,
+            detail_ttl_seconds,
+            page_size,
+            max_pages,
+            None,
+        ))
+        async for berry in feed.follow():
+            yield berry
+        await asyncio.shield(task)  # surface the crawl's error, if any
+    except httpx.HTTPError as e:
+        raise UpstreamApiError("Failed to fetch data from PokeAPI") from e
+
+
+async def _stream_private_crawl(
+    base_url: str,
+    endpoint: str,
+    concurrency: int,
+    client: httpx.AsyncClient | None,
+    page_size: int,
+    max_pages: int,
+) -> AsyncIterator[Berry]:
+    """An uncached crawl for one caller; closing the iterator cancels it."""
+    crawl = _Crawl(None, 0, CrawlStats(), page_size, max_pages)
+    url = f"{base_url}/{endpoint}"
+    try:
+        async with AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(httpx.AsyncClient(timeout=30.0))
+            berries = await stack.enter_async_context(aclosing(_iter_berries(client, url, concurrency, crawl)))
+            async for berry in berries:
+                yield berry
+    finally:
+        crawl_totals.downloaded += crawl.stats.downloaded
+
+
+async def fetch_berry_snapshot(
+    base_url: str,
+    cache: AnyCacheBackend | None,
+    cache_ttl_seconds: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    soft_ttl_seconds: int | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    stale_if_error_seconds: int = DEFAULT_STALE_IF_ERROR_SECONDS,
+    warm_snapshot: BerrySnapshot | None = None,
+    force_refresh: bool = False,
+) -> BerrySnapshot:
+    """Fetch the current dataset snapshot, including its version for derived caches."""
     try:
-        berries = await fetch_all_berries(base_url, cache, cache_ttl_seconds)
+        return await _get_snapshot(
+            base_url,
+            cache,
+            cache_ttl_seconds,
+            concurrency=concurrency,
+            client=client,
+            soft_ttl_seconds=soft_ttl_seconds,
+            page_size=page_size,
+            max_pages=max_pages,
+            stale_if_error_seconds=stale_if_error_seconds,
+            warm_snapshot=warm_snapshot,
+            force_refresh=force_refresh,
+        )
     except httpx.HTTPError as e:
         raise UpstreamApiError("Failed to fetch data from PokeAPI") from e
 
-    names = [b.name for b in berries]
-    growth_times = [b.growth_time for b in berries]
-    frequency = Counter(growth_times)
+
+async def fetch_berry_data(
+    base_url: str,
+    cache: AnyCacheBackend | None,
+    cache_ttl_seconds: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: httpx.AsyncClient | None = None,
+    soft_ttl_seconds: int | None = None,
+) -> tuple[list[str], list[int], Counter[int]]:
+    """Fetch and process berry data. Returns (names, growth_times, frequency)."""
+    snapshot = await fetch_berry_snapshot(
+        base_url,
+        cache,
+        cache_ttl_seconds,
+        concurrency=concurrency,
+        client=client,
+        soft_ttl_seconds=soft_ttl_seconds,
+    )
+    dataset = snapshot.dataset
+
+    names = list(dataset.names)
+    growth_times = dataset.numeric["growth_time"].tolist()
+    frequency = Counter(dataset.frequency("growth_time"))
 
     return names, growth_times, frequency
@@ -1,13 +1,21 @@
+import os
 from typing import Any
-from collections.abc import Generator
-from unittest.mock import AsyncMock, Mock, patch
+from collections.abc import Awaitable, Callable, Generator
+from contextlib import contextmanager
+from unittest.mock import patch
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
+# Tests drive every crawl themselves: no startup warm-up or background refresher.
+os.environ.setdefault("CACHE_WARMUP_ENABLED", "false")
+os.environ.setdefault("CACHE_REFRESH_ENABLED", "false")
+
 from src.cache import CacheBackend
 from src.dependencies import get_base_url, get_cache, get_cache_ttl
 from src.main import create_app
+from src.models import Berry
 
 
 class NoOpCache(CacheBackend):
@@ -34,6 +42,8 @@ SAMPLE_BERRIES: list[tuple[str, int]] = [
     ("aspear", 5),
 ]
 
+UpstreamHandler = Callable[[httpx.Request], Awaitable[httpx.Response]]
+
 TEST_BASE_URL = "https://pokeapi.co/api/v2"
 TEST_CACHE_TTL = 3600
 
@@ -50,21 +60,30 @@ def _make_berry_detail(name: str, growth_time: int) -> dict[str, Any]:
         "soil_dryness": 15,
         "natural_gift_power": 60,
         "firmness": {"name": "soft", "url": "https://pokeapi.co/api/v2/berry-firmness/2/"},
-        "flavors": [],
+        "flavors": [
+            {"potency": 10 if flavor == "spicy" else 0, "flavor": {"name": flavor, "url": f"https://pokeapi.co/api/v2/berry-flavor/{i}/"}}
+            for i, flavor in enumerate(["spicy", "dry", "sweet", "bitter", "sour"], start=1)
+        ],
         "item": {"name": f"{name}-berry", "url": f"https://pokeapi.co/api/v2/item/{hash(name) % 1000}/"},
         "natural_gift_type": {"name": "fire", "url": "https://pokeapi.co/api/v2/type/10/"},
     }
 
 
+def _make_berry(name: str, growth_time: int, **overrides: Any) -> Berry:
+    """Build a Berry model from a minimal PokeAPI detail dict."""
+    return Berry(**{**_make_berry_detail(name, growth_time), **overrides})
+
+
 def _make_berry_list_response(
     berries: list[tuple[str, int]],
     *,
     offset: int = 0,
     next_url: str | None = None,
+    count: int | None = None,
 ) -> dict[str, Any]:
-    """Build a PokeAPI paginated berry list response."""
+    """Build a PokeAPI paginated berry list response; `count` is the total across pages."""
     return {
-        "count": len(berries),
+        "count": len(berries) if count is None else count,
         "next": next_url,
         "previous": None,
         "results": [
@@ -92,9 +111,53 @@ def mock_berry_detail():
     return _make_berry_detail
 
 
+class FakePokeApi:
+    """Mock transport target that routes requests to the handler installed by a fixture."""
+
+    def __init__(self) -> None:
+        self.handler: UpstreamHandler | None = None
+        self.requests: list[httpx.Request] = []
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._dispatch)
+
+    async def _dispatch(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.handler is None:
+            raise httpx.ConnectError("No mocked PokeAPI installed", request=request)
+        return await self.handler(request)
+
+
+def _berry_id(url: str) -> int | None:
+    """Return the berry id from a detail URL, or None for list URLs."""
+    last = url.split("?")[0].rstrip("/").split("/")[-1]
+    return int(last) if last.isdigit() else None
+
+
+@contextmanager
+def _install_handler(
+    pokeapi: FakePokeApi, handler: UpstreamHandler
+) -> Generator[FakePokeApi, None, None]:
+    """Route both the app's shared client and ad-hoc clients to `handler`."""
+    pokeapi.handler = handler
+    real_client_cls = httpx.AsyncClient
+
+    def client_factory(*args: Any, **kwargs: Any) -> httpx.AsyncClient:
+        kwargs.setdefault("transport", pokeapi.transport())
+        return real_client_cls(*args, **kwargs)
+
+    with patch("src.upstream_api.httpx.AsyncClient", side_effect=client_factory):
+        yield pokeapi
+
+
+@pytest.fixture()
+def pokeapi() -> FakePokeApi:
+    return FakePokeApi()
+
+
 @pytest.fixture()
-def app() -> Generator[Any, None, None]:
-    application = create_app()
+def app(pokeapi: FakePokeApi) -> Generator[Any, None, None]:
+    application = create_app(http_transport=pokeapi.transport())
     application.dependency_overrides[get_base_url] = lambda: TEST_BASE_URL
     application.dependency_overrides[get_cache] = lambda: NoOpCache()
     application.dependency_overrides[get_cache_ttl] = lambda: TEST_CACHE_TTL
@@ -109,35 +172,26 @@ def client(app: Any) -> Generator[TestClient, None, None]:
 
 
 @pytest.fixture()
-def mock_pokeapi(mock_berry_list_response: dict[str, Any]) -> Generator[AsyncMock, None, None]:
-    """Patch httpx calls to return mocked PokeAPI responses."""
+def mock_pokeapi(
+    pokeapi: FakePokeApi, mock_berry_list_response: dict[str, Any]
+) -> Generator[FakePokeApi, None, None]:
+    """Serve mocked PokeAPI responses for the sample berries."""
     berry_details = {name: _make_berry_detail(name, gt) for name, gt in SAMPLE_BERRIES}
 
-    async def mock_get(url: str, **kwargs: Any) -> Mock:
-        response = Mock()
-        response.raise_for_status = lambda: None
-
-        if "/api/v2/berry/" in url and url.rstrip("/").split("/")[-1].isdigit():
-            berry_id = int(url.rstrip("/").split("/")[-1])
+    async def handler(request: httpx.Request) -> httpx.Response:
+        berry_id = _berry_id(str(request.url))
+        if berry_id is not None:
             berry_name = SAMPLE_BERRIES[berry_id - 1][0]
-            response.json.return_value = berry_details[berry_name]
-        else:
-            response.json.return_value = mock_berry_list_response
-
-        return response
+            return httpx.Response(200, json=berry_details[berry_name])
+        return httpx.Response(200, json=mock_berry_list_response)
 
-    with patch("src.upstream_api.httpx.AsyncClient") as mock_client_cls:
-        mock_client_instance = AsyncMock()
-        mock_client_instance.get = mock_get
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_cls.return_value = mock_client_instance
-        yield mock_client_instance
+    with _install_handler(pokeapi, handler):
+        yield pokeapi
 
 
 @pytest.fixture()
-def mock_pokeapi_paginated() -> Generator[AsyncMock, None, None]:
-    """Patch httpx to return two pages of berries."""
+def mock_pokeapi_paginated(pokeapi: FakePokeApi) -> Generator[FakePokeApi, None, None]:
+    """Serve two pages of berries."""
     page1_berries = SAMPLE_BERRIES[:3]
     page2_berries = SAMPLE_BERRIES[3:]
 
@@ -145,47 +199,32 @@ def mock_pokeapi_paginated() -> Generator[AsyncMock, None, None]:
         page1_berries,
         offset=0,
         next_url="https://pokeapi.co/api/v2/berry/?offset=3&limit=3",
+        count=len(SAMPLE_BERRIES),
     )
-    page2 = _make_berry_list_response(page2_berries, offset=3)
+    page2 = _make_berry_list_response(page2_berries, offset=3, count=len(SAMPLE_BERRIES))
 
     all_details = {name: _make_berry_detail(name, gt) for name, gt in SAMPLE_BERRIES}
 
-    async def mock_get(url: str, **kwargs: Any) -> Mock:
-        response = Mock()
-        response.raise_for_status = lambda: None
-
-        if "/api/v2/berry/" in url and url.rstrip("/").split("/")[-1].isdigit():
-            berry_id = int(url.rstrip("/").split("/")[-1])
+    async def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        berry_id = _berry_id(url)
+        if berry_id is not None:
             berry_name = SAMPLE_BERRIES[berry_id - 1][0]
-            response.json.return_value = all_details[berry_name]
-        elif "offset=3" in url:
-            response.json.return_value = page2
-        else:
-            response.json.return_value = page1
+            return httpx.Response(200, json=all_details[berry_name])
+        if "offset=3" in url:
+            return httpx.Response(200, json=page2)
+        return httpx.Response(200, json=page1)
 
-        return response
-
-    with patch("src.upstream_api.httpx.AsyncClient") as mock_client_cls:
-        mock_client_instance = AsyncMock()
-        mock_client_instance.get = mock_get
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_cls.return_value = mock_client_instance
-        yield mock_client_instance
+    with _install_handler(pokeapi, handler):
+        yield pokeapi
 
 
 @pytest.fixture()
-def mock_pokeapi_error() -> Generator[AsyncMock, None, None]:
-    """Patch httpx to simulate PokeAPI being unreachable."""
-    import httpx
-
-    async def mock_get(url: str, **kwargs: Any) -> None:
-        raise httpx.ConnectError("Connection refused")
-
-    with patch("src.upstream_api.httpx.AsyncClient") as mock_client_cls:
-        mock_client_instance = AsyncMock()
-        mock_client_instance.get = mock_get
-        mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-        mock_client_cls.return_value = mock_client_instance
-        yield mock_client_instance
+def mock_pokeapi_error(pokeapi: FakePokeApi) -> Generator[FakePokeApi, None, None]:
+    """Simulate PokeAPI being unreachable."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    with _install_handler(pokeapi, handler):
+        yield pokeapi
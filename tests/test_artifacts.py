@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.artifacts import (
+    artifact_key,
+    encoded_kind,
+    get_or_build_artifact,
+    invalidate_artifacts,
+)
+from src.dependencies import get_cache
+from tests.conftest import _make_berry
+from src.router import _all_berry_stats_document
+from src.dataset import BerrySnapshot, dataset_version
+from src.upstream_api import fetch_all_berries
+from tests.test_cache import MockCache
+
+BASE_URL = "https://pokeapi.co/api/v2"
+
+
+class TestDatasetVersion:
+    def test_version_is_stable_for_equal_data(self) -> None:
+        berries = [_make_berry("cheri", 3)]
+        assert dataset_version(berries) == dataset_version(list(berries))
+
+    def test_version_changes_with_content(self) -> None:
+        before = dataset_version([_make_berry("cheri", 3)])
+        after = dataset_version([_make_berry("cheri", 4)])
+        assert before != after
+
+
+class TestGetOrBuildArtifact:
+    @pytest.mark.asyncio
+    async def test_artifact_is_built_once_per_version(self) -> None:
+        """A cached artifact is returned without calling build again."""
+        cache = MockCache()
+        builds = 0
+
+        async def build() -> bytes:
+            nonlocal builds
+            builds += 1
+            return b"payload"
+
+        for _ in range(3):
+            assert await get_or_build_artifact(cache, "stats.json", "v1", 60, build) == b"payload"
+        await get_or_build_artifact(cache, "stats.json", "v2", 60, build)
+
+        assert builds == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_build(self) -> None:
+        cache = MockCache()
+        builds = 0
+
+        async def build() -> bytes:
+            nonlocal builds
+            builds += 1
+            await asyncio.sleep(0.01)
+            return b"payload"
+
+        bodies = await asyncio.gather(*(
+            get_or_build_artifact(cache, "histogram.png", "v1", 60, build) for _ in range(10)
+        ))
+
+        assert bodies == [b"payload"] * 10
+        assert builds == 1
+        assert cache.set_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_artifact_without_cache_is_always_built(self) -> None:
+        async def build() -> bytes:
+            return b"x"
+
+        assert await get_or_build_artifact(None, "stats.json", "v1", 60, build) == b"x"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_every_kind(self) -> None:
+        cache = MockCache()
+        cache.set(artifact_key("stats.json", "v1"), b"{}", 60)
+        cache.set(artifact_key("histogram.png", "v1"), b"png", 60)
+        cache.set(artifact_key(encoded_kind("stats.json", "gzip"), "v1"), b"gz", 60)
+
+        await invalidate_artifacts(cache, "v1")
+
+        assert cache.store == {}
+
+
+class TestArtifactInvalidationOnRefresh:
+    @pytest.mark.asyncio
+    async def test_new_dataset_version_drops_old_artifacts(self, mock_pokeapi: Any) -> None:
+        """A crawl producing different data invalidates the previous version's artifacts."""
+        cache = MockCache()
+        old = BerrySnapshot.create([_make_berry("old", 1)])
+        old.fetched_at -= 7200
+        cache.set("berries:all", old, 3600)
+        cache.set(artifact_key("stats.json", old.version), b"{}", 3600)
+
+        await fetch_all_berries(BASE_URL, cache=cache, cache_ttl_seconds=3600)
+
+        assert artifact_key("stats.json", old.version) not in cache.store
+        assert cache.store["berries:all"].version != old.version
+
+
+class TestRoutesServePrebuiltArtifacts:
+    def test_stats_are_computed_once_per_version(
+        self, app: Any, mock_pokeapi: Any
+    ) -> None:
+        cache = MockCache()
+        app.dependency_overrides[get_cache] = lambda: cache
+
+        with TestClient(app) as client:
+            with patch(
+                "src.router._all_berry_stats_document", wraps=_all_berry_stats_document
+            ) as build:
+                first = client.get("/allBerryStats")
+                second = client.get("/allBerryStats")
+
+        assert first.content == second.content
+        assert build.call_count == 1
+
+    def test_histogram_is_rendered_once_per_version(
+        self, app: Any, mock_pokeapi: Any
+    ) -> None:
+        cache = MockCache()
+        app.dependency_overrides[get_cache] = lambda: cache
+
+        with TestClient(app) as client:
+            with patch("src.chart.render_chart", return_value=b"\x89PNG") as render:
+                client.get("/histogram")
+                response = client.get("/histogram")
+
+        assert response.content == b"\x89PNG"
+        assert render.call_count == 1
@@ -1,11 +1,38 @@
+import asyncio
+import pickle
 from typing import Any
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
 import pytest
-
-from src.cache import CacheBackend, RedisCache, create_cache
-from src.upstream_api import fetch_all_berries
+from pydantic import ValidationError
+
+from src.cache import (
+    AsyncCacheBackend,
+    AsyncRedisCache,
+    CacheBackend,
+    CompactSerializer,
+    MemoryCache,
+    PickleSerializer,
+    RedisCache,
+    SerializationError,
+    TieredCache,
+    create_cache,
+    create_serializer,
+)
+from src.config import Settings
+from src.dataset import BerrySnapshot
+from src.upstream_api import _background_refreshes, fetch_all_berries
 from src.models import Berry
+from tests.conftest import (
+    _make_berry,
+    SAMPLE_BERRIES,
+    FakePokeApi,
+    _berry_id,
+    _install_handler,
+    _make_berry_detail,
+    _make_berry_list_response,
+)
 
 
 class MockCache(CacheBackend):
@@ -31,6 +58,29 @@ class MockCache(CacheBackend):
         self.store.clear()
 
 
+class MockAsyncCache(AsyncCacheBackend):
+    """Mock non-blocking cache for testing."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, Any] = {}
+        self.get_calls = 0
+        self.set_calls = 0
+
+    async def get(self, key: str) -> Any | None:
+        self.get_calls += 1
+        return self.store.get(key)
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        self.set_calls += 1
+        self.store[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.store.pop(key, None)
+
+    async def clear(self) -> None:
+        self.store.clear()
+
+
 class TestCacheBackend:
     def test_mock_cache_get_miss(self) -> None:
         """Mock cache returns None on cache miss."""
@@ -75,6 +125,246 @@ class TestRedisCacheInit:
             mock_redis.from_url.assert_called_once_with("redis://localhost:6379/0")
 
 
+class TestAsyncRedisCache:
+    def _cache_with_client(self, client: AsyncMock) -> AsyncRedisCache:
+        with patch("src.cache.redis"):
+            cache = AsyncRedisCache("redis://localhost:6379/0")
+        cache.client = client
+        return cache
+
+    def test_async_redis_cache_uses_shared_pool(self) -> None:
+        """AsyncRedisCache builds its client on a connection pool from the URL."""
+        mock_redis = Mock()
+        with patch("src.cache.redis", mock_redis):
+            cache = AsyncRedisCache("redis://localhost:6379/0")
+
+        mock_redis.asyncio.ConnectionPool.from_url.assert_called_once_with(
+            "redis://localhost:6379/0"
+        )
+        mock_redis.asyncio.Redis.assert_called_once_with(connection_pool=cache.pool)
+
+    @pytest.mark.asyncio
+    async def test_async_redis_cache_round_trip(self) -> None:
+        """AsyncRedisCache awaits setex/get and unpickles the stored value."""
+        client = AsyncMock()
+        client.get.return_value = pickle.dumps({"a": 1})
+        cache = self._cache_with_client(client)
+
+        await cache.set("key", {"a": 1}, 60)
+        client.setex.assert_awaited_once_with("key", 60, pickle.dumps({"a": 1}))
+        assert await cache.get("key") == {"a": 1}
+        assert cache.stats.hits == 1
+        assert cache.payload_bytes.count("get") == cache.payload_bytes.count("set") == 1
+        assert cache.codec_seconds.count("loads") == 1
+
+    @pytest.mark.asyncio
+    async def test_async_redis_cache_counts_misses(self) -> None:
+        client = AsyncMock()
+        client.get.return_value = None
+        cache = self._cache_with_client(client)
+
+        assert await cache.get("key") is None
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.errors) == (0, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_async_redis_cache_swallows_errors(self) -> None:
+        """Redis failures are treated as misses / no-ops, like RedisCache."""
+        client = AsyncMock()
+        client.get.side_effect = ConnectionError("down")
+        client.setex.side_effect = ConnectionError("down")
+        client.delete.side_effect = ConnectionError("down")
+        client.flushdb.side_effect = ConnectionError("down")
+        cache = self._cache_with_client(client)
+
+        assert await cache.get("key") is None
+        await cache.set("key", "value", 60)
+        await cache.delete("key")
+        await cache.clear()
+        assert cache.stats.errors == 4
+
+
+class TestMemoryCache:
+    def test_memory_cache_evicts_least_recently_used(self) -> None:
+        """MemoryCache keeps at most max_entries, dropping the LRU key."""
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+        cache.get("a")
+        cache.set("c", 3, 60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_memory_cache_expires_entries(self) -> None:
+        """Entries are misses once their TTL has elapsed."""
+        cache = MemoryCache(max_entries=4)
+        with patch("src.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1, 10)
+        with patch("src.cache.time.monotonic", return_value=109.0):
+            assert cache.get("a") == 1
+        with patch("src.cache.time.monotonic", return_value=110.0):
+            assert cache.get("a") is None
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_memory_cache_caps_ttl(self) -> None:
+        """A configured ttl_seconds caps the TTL passed to set."""
+        cache = MemoryCache(max_entries=4, ttl_seconds=5)
+        with patch("src.cache.time.monotonic", return_value=0.0):
+            cache.set("a", 1, 3600)
+        with patch("src.cache.time.monotonic", return_value=5.0):
+            assert cache.get("a") is None
+
+
+class TestTieredCache:
+    @pytest.mark.asyncio
+    async def test_tiered_cache_serves_hot_keys_from_l1(self) -> None:
+        """After a set, reads never reach L2."""
+        l2 = MockCache()
+        cache = TieredCache(MemoryCache(max_entries=4, ttl_seconds=60), l2)
+
+        await cache.set("key", "value", 3600)
+        assert await cache.get("key") == "value"
+        assert await cache.get("key") == "value"
+
+        assert l2.get_calls == 0
+        assert cache.stats["l1"].hits == 2
+
+    @pytest.mark.asyncio
+    async def test_tiered_cache_fills_l1_on_l2_hit(self) -> None:
+        """An L2 hit is copied into L1 for subsequent reads."""
+        l2 = MockAsyncCache()
+        l2.store["key"] = "value"
+        cache = TieredCache(MemoryCache(max_entries=4, ttl_seconds=60), l2)
+
+        assert await cache.get("key") == "value"
+        assert await cache.get("key") == "value"
+        assert await cache.get("missing") is None
+
+        assert l2.get_calls == 2
+        assert (cache.stats["l1"].hits, cache.stats["l1"].misses) == (1, 2)
+        assert (cache.stats["l2"].hits, cache.stats["l2"].misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_tiered_cache_l1_entry_never_outlives_l2_ttl(self) -> None:
+        """An L2 hit with 2 s left is kept in L1 for 2 s, not the L1 TTL."""
+        l2 = MockAsyncCache()
+        l2.store["key"] = "value"
+        l2.get_with_ttl = AsyncMock(return_value=("value", 2.0))  # type: ignore[method-assign]
+        cache = TieredCache(MemoryCache(max_entries=4, ttl_seconds=60), l2)
+
+        with patch("src.cache.time.monotonic", return_value=100.0):
+            assert await cache.get("key") == "value"
+        with patch("src.cache.time.monotonic", return_value=101.9):
+            assert cache.l1.get("key") == "value"
+        with patch("src.cache.time.monotonic", return_value=102.0):
+            assert cache.l1.get("key") is None
+
+    def test_redis_cache_reads_value_and_ttl_in_one_pipeline(self) -> None:
+        with patch("src.cache.redis"):
+            cache = RedisCache("redis://localhost:6379/0")
+        pipe = cache.client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [pickle.dumps("value"), 2500]
+
+        assert cache.get_with_ttl("key") == ("value", 2.5)
+        pipe.execute.return_value = [pickle.dumps("value"), -1]
+        assert cache.get_with_ttl("key") == ("value", None)
+        pipe.execute.return_value = [None, -2]
+        assert cache.get_with_ttl("key") == (None, None)
+        assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_tiered_cache_delete_hits_both_tiers(self) -> None:
+        """delete removes the key from L1 and L2."""
+        l2 = MockCache()
+        cache = TieredCache(MemoryCache(max_entries=4, ttl_seconds=60), l2)
+        await cache.set("key", "value", 3600)
+
+        await cache.delete("key")
+
+        assert await cache.get("key") is None
+        assert "key" not in l2.store
+
+
+class TestCompactSerializer:
+    def _snapshot(self, size: int = 50) -> BerrySnapshot:
+        berries = [_make_berry(f"berry-{i}", i % 24 + 1) for i in range(size)]
+        return BerrySnapshot.create(berries)
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_snapshot_round_trip(self, compress: bool) -> None:
+        """A snapshot decodes to equal berries and metadata."""
+        serializer = CompactSerializer(compress=compress)
+        snapshot = self._snapshot()
+
+        loaded = serializer.loads(serializer.dumps(snapshot))
+
+        assert loaded == snapshot
+        assert all(isinstance(b, Berry) for b in loaded.berries)
+
+    def test_label_columns_round_trip(self) -> None:
+        """Single- and multi-valued labels, including an empty flavor list, survive encoding."""
+        serializer = CompactSerializer()
+        snapshot = BerrySnapshot.create([
+            _make_berry("cheri", 3, firmness="soft", flavors=["spicy", "sour"]),
+            _make_berry("chesto", 3, firmness="super-hard", flavors=[]),
+        ])
+
+        loaded = serializer.loads(serializer.dumps(snapshot))
+
+        assert loaded.berries == snapshot.berries
+        assert loaded.berries[1].flavors == []
+
+    def test_empty_snapshot_round_trip(self) -> None:
+        serializer = CompactSerializer()
+        snapshot = BerrySnapshot.create([])
+        assert serializer.loads(serializer.dumps(snapshot)).berries == []
+
+    def test_snapshot_is_smaller_than_pickle(self) -> None:
+        snapshot = self._snapshot(500)
+        compact = CompactSerializer(compress=False).dumps(snapshot)
+        assert len(compact) < len(PickleSerializer().dumps(snapshot.berries)) / 2
+
+    def test_bytes_and_other_values(self) -> None:
+        """Raw bytes are stored as-is; other values fall back to pickle."""
+        serializer = CompactSerializer()
+        assert serializer.loads(serializer.dumps(b"\x89PNG")) == b"\x89PNG"
+        assert serializer.loads(serializer.dumps({"etag": '"v1"'})) == {"etag": '"v1"'}
+
+    def test_other_schema_version_is_rejected(self) -> None:
+        """Bytes from a different schema version never decode into wrong objects."""
+        data = bytearray(CompactSerializer().dumps(self._snapshot()))
+        data[3] = CompactSerializer.SCHEMA_VERSION + 1
+
+        with pytest.raises(SerializationError):
+            CompactSerializer().loads(bytes(data))
+        with pytest.raises(SerializationError):
+            CompactSerializer().loads(pickle.dumps(self._snapshot()))
+
+    def test_redis_cache_treats_undecodable_value_as_miss(self) -> None:
+        with patch("src.cache.redis"):
+            cache = RedisCache("redis://localhost:6379/0", CompactSerializer())
+        cache.client.get.return_value = b"PKB\xff\x00\x00"
+        assert cache.get("berries:all") is None
+
+    def test_create_serializer(self) -> None:
+        serializer = create_serializer("compact", compress=True)
+        assert isinstance(serializer, CompactSerializer)
+        assert serializer.compress
+        assert isinstance(create_serializer("pickle"), PickleSerializer)
+        with pytest.raises(ValueError):
+            create_serializer("compcat")
+
+    @pytest.mark.parametrize(
+        "setting", ["cache_serializer", "chart_backend", "chart_render_executor"]
+    )
+    def test_settings_reject_unknown_choices(self, setting: str) -> None:
+        """A typo in the environment fails at startup instead of picking a default."""
+        with pytest.raises(ValidationError):
+            Settings(pokeapi_base_url="https://pokeapi.co/api/v2", **{setting: "typo"})
+
+
 class TestCreateCache:
     def test_create_cache_returns_none_without_redis_url(self) -> None:
         """create_cache returns None when redis_url is empty or None."""
@@ -92,6 +382,25 @@ class TestCreateCache:
             assert isinstance(cache, RedisCache)
             assert cache.client == mock_client
 
+    def test_create_cache_selects_async_backend(self) -> None:
+        """create_cache returns AsyncRedisCache when async_backend is set."""
+        with patch("src.cache.redis", Mock()):
+            cache = create_cache("redis://localhost:6379/0", async_backend=True)
+            assert isinstance(cache, AsyncRedisCache)
+
+    def test_create_cache_puts_memory_tier_in_front_of_redis(self) -> None:
+        """A positive l1_max_entries wraps Redis in a TieredCache."""
+        with patch("src.cache.redis", Mock()):
+            cache = create_cache("redis://localhost:6379/0", l1_max_entries=8, l1_ttl_seconds=30)
+        assert isinstance(cache, TieredCache)
+        assert isinstance(cache.l2, RedisCache)
+        assert cache.l1.max_entries == 8
+        assert cache.l1.ttl_seconds == 30
+
+    def test_create_cache_memory_only_without_redis_url(self) -> None:
+        """Without Redis the L1 tier is used on its own."""
+        assert isinstance(create_cache(None, l1_max_entries=8), MemoryCache)
+
     def test_create_cache_returns_none_on_redis_error(self) -> None:
         """create_cache returns None if Redis initialization fails."""
         with patch("src.cache.RedisCache", side_effect=Exception("Connection failed")):
@@ -112,8 +421,9 @@ class TestCachingIntegration:
         )
 
         assert len(berries) == 5
-        assert mock_cache.get_calls == 1
-        assert mock_cache.set_calls == 1
+        # the dataset key plus one per-berry detail entry each
+        assert mock_cache.get_calls == 1 + 5
+        assert mock_cache.set_calls == 1 + 5
         assert "berries:all" in mock_cache.store
 
     @pytest.mark.asyncio
@@ -129,7 +439,7 @@ class TestCachingIntegration:
                 flavors=[], item={"name": "test", "url": "http://test.com"},
             )
         ]
-        mock_cache.set("berries:all", cached_berries, 3600)
+        mock_cache.set("berries:all", BerrySnapshot.create(cached_berries), 3600)
 
         berries = await fetch_all_berries(
             "https://pokeapi.co/api/v2", cache=mock_cache, cache_ttl_seconds=3600
@@ -140,6 +450,23 @@ class TestCachingIntegration:
         # set_calls is still 1 from initial setup
         assert mock_cache.set_calls == 1
 
+    @pytest.mark.asyncio
+    async def test_fetch_berries_async_cache_miss_then_hit(self, mock_pokeapi: Any) -> None:
+        """fetch_all_berries awaits an async backend for both get and set."""
+        mock_cache = MockAsyncCache()
+
+        first = await fetch_all_berries(
+            "https://pokeapi.co/api/v2", cache=mock_cache, cache_ttl_seconds=3600
+        )
+        second = await fetch_all_berries(
+            "https://pokeapi.co/api/v2", cache=mock_cache, cache_ttl_seconds=3600
+        )
+
+        assert second == first
+        # the dataset key twice plus one per-berry detail entry each on the miss
+        assert mock_cache.get_calls == 2 + 5
+        assert mock_cache.set_calls == 1 + 5
+
     @pytest.mark.asyncio
     async def test_fetch_berries_cache_disabled(
         self, mock_pokeapi: Any, sample_berries: list[tuple[str, int]]
@@ -161,3 +488,106 @@ class TestCachingIntegration:
         )
 
         assert len(berries) == 5
+
+
+class TestStaleWhileRevalidate:
+    BASE_URL = "https://pokeapi.co/api/v2"
+
+    def _stale_entry(self, age: float) -> BerrySnapshot:
+        snapshot = BerrySnapshot.create([_make_berry("stale-berry", 1)])
+        snapshot.fetched_at -= age
+        return snapshot
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_is_served_without_refresh(
+        self, pokeapi: FakePokeApi, mock_pokeapi: Any
+    ) -> None:
+        """Data younger than the soft TTL is returned without touching upstream."""
+        mock_cache = MockCache()
+        mock_cache.set("berries:all", self._stale_entry(age=10), 3600)
+
+        berries = await fetch_all_berries(
+            self.BASE_URL, cache=mock_cache, cache_ttl_seconds=3600, soft_ttl_seconds=60
+        )
+
+        assert [b.name for b in berries] == ["stale-berry"]
+        assert pokeapi.requests == []
+
+    @pytest.mark.asyncio
+    async def test_soft_expired_entry_is_served_and_refreshed_once(
+        self, pokeapi: FakePokeApi, mock_pokeapi: Any
+    ) -> None:
+        """Past the soft TTL callers get stale data while one refresh runs."""
+        mock_cache = MockCache()
+        mock_cache.set("berries:all", self._stale_entry(age=120), 3600)
+
+        results = await asyncio.gather(*(
+            fetch_all_berries(
+                self.BASE_URL, cache=mock_cache, cache_ttl_seconds=3600, soft_ttl_seconds=60
+            )
+            for _ in range(3)
+        ))
+        assert all([b.name for b in berries] == ["stale-berry"] for berries in results)
+
+        await asyncio.gather(*_background_refreshes)
+
+        refreshed = mock_cache.store["berries:all"]
+        assert len(refreshed.berries) == 5
+        assert refreshed.age() < 60
+        assert len(pokeapi.requests) == 6  # exactly one crawl
+
+    @pytest.mark.asyncio
+    async def test_hard_expired_entry_blocks_on_crawl(
+        self, pokeapi: FakePokeApi, mock_pokeapi: Any
+    ) -> None:
+        """Past the hard TTL the caller waits for fresh data."""
+        mock_cache = MockCache()
+        mock_cache.set("berries:all", self._stale_entry(age=7200), 3600)
+
+        berries = await fetch_all_berries(
+            self.BASE_URL, cache=mock_cache, cache_ttl_seconds=3600, soft_ttl_seconds=60
+        )
+
+        assert len(berries) == 5
+        assert not _background_refreshes
+
+
+class TestIncrementalRefresh:
+    BASE_URL = "https://pokeapi.co/api/v2"
+
+    @pytest.fixture()
+    def mock_pokeapi_etags(self, pokeapi: FakePokeApi) -> Any:
+        """Serve sample berries with ETags, answering 304 to matching If-None-Match."""
+        versions = {name: 1 for name, _ in SAMPLE_BERRIES}
+        list_page = _make_berry_list_response(SAMPLE_BERRIES)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            berry_id = _berry_id(str(request.url))
+            if berry_id is None:
+                return httpx.Response(200, json=list_page)
+            name, growth_time = SAMPLE_BERRIES[berry_id - 1]
+            etag = f'"{name}-v{versions[name]}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers={"ETag": etag})
+            detail = _make_berry_detail(name, growth_time + versions[name] - 1)
+            return httpx.Response(200, json=detail, headers={"ETag": etag})
+
+        with _install_handler(pokeapi, handler):
+            yield versions
+
+    @pytest.mark.asyncio
+    async def test_refresh_reuses_unchanged_details(self, mock_pokeapi_etags: Any) -> None:
+        """A re-crawl only downloads berries whose ETag changed."""
+        mock_cache = MockCache()
+        await fetch_all_berries(self.BASE_URL, cache=mock_cache, cache_ttl_seconds=3600)
+        first = mock_cache.store["berries:all"]
+        assert (first.crawl_stats.reused, first.crawl_stats.downloaded) == (0, 5)
+
+        mock_pokeapi_etags["aspear"] += 1
+        mock_cache.delete("berries:all")
+        berries = await fetch_all_berries(self.BASE_URL, cache=mock_cache, cache_ttl_seconds=3600)
+
+        second = mock_cache.store["berries:all"]
+        assert (second.crawl_stats.reused, second.crawl_stats.downloaded) == (4, 1)
+        assert [b.name for b in berries] == [b.name for b in first.berries]
+        assert berries[-1].growth_time == first.berries[-1].growth_time + 1
@@ -0,0 +1,133 @@
+import gzip
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.artifacts import artifact_key, encoded_kind
+from src.compression import ResponseCompressor, available_encoders, negotiate
+from src.dependencies import get_cache
+from tests.test_cache import MockCache
+
+
+class TestNegotiate:
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (None, None),
+            ("", None),
+            ("gzip", "gzip"),
+            ("gzip, br", "br"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("gzip;q=0, identity", None),
+            ("*", "br"),
+            ("deflate", None),
+        ],
+    )
+    def test_picks_highest_weight_then_server_preference(
+        self, header: str | None, expected: str | None
+    ) -> None:
+        assert negotiate(header, ["gzip", "br", "zstd"]) == expected
+
+    def test_only_available_encodings_are_chosen(self) -> None:
+        assert negotiate("br, gzip;q=0.5", ["gzip"]) == "gzip"
+
+
+class TestResponseCompressor:
+    def test_gzip_is_always_available(self) -> None:
+        assert "gzip" in available_encoders()
+
+    def test_small_bodies_and_png_are_not_compressed(self) -> None:
+        compressor = ResponseCompressor(encodings=["gzip"], min_size=100)
+        assert compressor.choose("gzip", "application/json", 99) is None
+        assert compressor.choose("gzip", "image/png", 10_000) is None
+        assert compressor.choose("gzip", "application/json", 100) == "gzip"
+        assert compressor.below_min_size == 1
+
+    @pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+    @pytest.mark.asyncio
+    async def test_encoders_round_trip(self, encoding: str) -> None:
+        if encoding not in available_encoders():
+            pytest.skip(f"{encoding} support is not installed")
+        body = b'{"berries_names": ["cheri", "chesto"]}' * 100
+        encoded = await ResponseCompressor(encodings=[encoding]).encode(encoding, body)
+        assert len(encoded) < len(body)
+
+    def test_ratio(self) -> None:
+        compressor = ResponseCompressor(encodings=["gzip"])
+        compressor.record("gzip", 1000, 250)
+        compressor.record("gzip", 1000, 150)
+        assert compressor.stats["gzip"].responses == 2
+        assert compressor.stats["gzip"].ratio == pytest.approx(0.2)
+
+
+class TestCompressedArtifacts:
+    @pytest.fixture()
+    def cache(self, app: Any) -> MockCache:
+        cache = MockCache()
+        app.dependency_overrides[get_cache] = lambda: cache
+        app.state.response_compressor = ResponseCompressor(encodings=["gzip"], min_size=0)
+        return cache
+
+    def test_gzip_variant_is_negotiated(
+        self, client: TestClient, mock_pokeapi: Any, cache: MockCache
+    ) -> None:
+        response = client.get("/allBerryStats", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert response.headers["ETag"].endswith('+gzip"')
+        assert response.json()["min_growth_time"] == 3
+
+    def test_identity_when_not_accepted(
+        self, client: TestClient, mock_pokeapi: Any, cache: MockCache
+    ) -> None:
+        response = client.get("/allBerryStats", headers={"Accept-Encoding": "identity"})
+
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert not response.headers["ETag"].endswith('+gzip"')
+
+    def test_variant_is_compressed_once_and_stored_next_to_raw_body(
+        self, app: Any, client: TestClient, mock_pokeapi: Any, cache: MockCache
+    ) -> None:
+        encoders = app.state.response_compressor.encoders
+        with patch.dict(encoders, {"gzip": Mock(wraps=encoders["gzip"])}):
+            client.get("/allBerryStats", headers={"Accept-Encoding": "gzip"})
+            client.get("/allBerryStats", headers={"Accept-Encoding": "gzip"})
+            encode = encoders["gzip"]
+
+        assert encode.call_count == 1
+        version = cache.store["berries:all"].version
+        raw = cache.store[artifact_key("stats.json", version)]
+        encoded = cache.store[artifact_key(encoded_kind("stats.json", "gzip"), version)]
+        assert gzip.decompress(encoded) == raw
+
+    def test_encoded_etag_revalidates(
+        self, client: TestClient, mock_pokeapi: Any, cache: MockCache
+    ) -> None:
+        etag = client.get("/allBerryStats", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+
+        response = client.get(
+            "/allBerryStats", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+    def test_png_histogram_is_sent_as_is(
+        self, client: TestClient, mock_pokeapi: Any, cache: MockCache
+    ) -> None:
+        response = client.get("/histogram", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+        assert "Vary" not in response.headers
+
+    def test_svg_histogram_is_compressed(
+        self, client: TestClient, mock_pokeapi: Any, cache: MockCache
+    ) -> None:
+        response = client.get(
+            "/histogram", params={"format": "svg"}, headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.text.startswith("<svg") or response.text.startswith("<?xml")
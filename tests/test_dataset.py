@@ -0,0 +1,178 @@
+import random
+import statistics
+from collections import Counter
+from typing import Any
+
+import pytest
+
+from src.dataset import (
+    AttributeSummary,
+    BerryDataset,
+    BerrySnapshot,
+    decode_columns,
+    encode_columns,
+)
+from tests.conftest import _make_berry
+
+
+def _dataset(growth_times: list[int]) -> BerryDataset:
+    return BerryDataset.from_berries(
+        [_make_berry(f"berry-{i}", gt) for i, gt in enumerate(growth_times)]
+    )
+
+
+class TestAttributeSummary:
+    def test_summary_of_sample_growth_times(self) -> None:
+        summary = _dataset([3, 3, 3, 4, 5]).summary("growth_time")
+        assert (summary.count, summary.min, summary.max) == (5, 3, 5)
+        assert summary.mean == pytest.approx(3.6)
+        assert summary.median == pytest.approx(3.0)
+        assert summary.variance == pytest.approx(0.64)
+        assert summary.frequency == {3: 3, 4: 1, 5: 1}
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 64, 1001])
+    def test_summary_matches_statistics_module(self, size: int) -> None:
+        rng = random.Random(size)
+        values = [rng.choice([2, 3, 4, 5, 8, 12, 18, 24]) for _ in range(size)]
+        summary = _dataset(values).summary("growth_time")
+
+        assert summary.mean == statistics.mean(values)
+        assert summary.median == pytest.approx(statistics.median(values))
+        assert summary.variance == statistics.pvariance(values)
+        assert list(summary.frequency) == sorted(set(values))
+
+    def test_mean_and_variance_round_like_statistics_module(self) -> None:
+        """/allBerryStats must not drift by an ULP from the statistics-based output."""
+        for seed in range(500):
+            rng = random.Random(seed)
+            values = [rng.randint(1, 40) for _ in range(rng.randint(1, 300))]
+            summary = AttributeSummary.from_counts(Counter(values))
+
+            assert summary.mean == statistics.mean(values)
+            assert summary.variance == statistics.pvariance(values)
+
+    def test_quantiles_interpolate_between_ranks(self) -> None:
+        summary = AttributeSummary.from_counts({1: 1, 2: 1, 3: 1, 4: 1})
+        assert summary.quantile(0.0) == 1
+        assert summary.quantile(1.0) == 4
+        assert summary.quantile(0.5) == pytest.approx(2.5)
+        assert summary.quantile(0.9) == pytest.approx(3.7)
+
+    def test_quantile_out_of_range_raises(self) -> None:
+        with pytest.raises(ValueError):
+            AttributeSummary.from_counts({1: 1}).quantile(1.5)
+
+    def test_empty_attribute_raises(self) -> None:
+        with pytest.raises(ValueError):
+            _dataset([]).summary("growth_time")
+
+
+class TestBerryDataset:
+    def test_columns_are_typed_arrays(self) -> None:
+        dataset = _dataset([3, 4])
+        assert dataset.names == ["berry-0", "berry-1"]
+        assert dataset.numeric["growth_time"].typecode == "i"
+        assert len(dataset) == 2
+
+    def test_summary_is_computed_once(self) -> None:
+        dataset = _dataset([3, 4])
+        assert dataset.summary("growth_time") is dataset.summary("growth_time")
+
+    def test_to_berries_round_trip(self) -> None:
+        berries = [_make_berry("cheri", 3), _make_berry("rawst", 4)]
+        assert BerryDataset.from_berries(berries).to_berries() == berries
+
+    def test_snapshot_berries_are_derived_from_dataset(self) -> None:
+        berries = [_make_berry("cheri", 3)]
+        snapshot = BerrySnapshot(
+            dataset=BerryDataset.from_berries(berries), fetched_at=0.0, version="v1"
+        )
+        assert snapshot.berries == berries
+
+    def test_created_snapshot_keeps_only_columns(self) -> None:
+        """The crawled Berry models are not held alongside the columns."""
+        berries = [_make_berry("cheri", 3)]
+        snapshot = BerrySnapshot.create(berries)
+
+        assert "berries" not in snapshot.__dict__
+        assert snapshot.berries == berries
+
+
+class TestColumnLayout:
+    def test_round_trip(self) -> None:
+        dataset = _dataset([3, 4, 3])
+        columns = [(name, kind, memoryview(block)) for name, kind, block in encode_columns(dataset)]
+        assert decode_columns(columns, len(dataset)) == dataset
+
+    def test_missing_or_short_columns_are_rejected(self) -> None:
+        columns = [(name, kind, memoryview(block)) for name, kind, block in encode_columns(_dataset([3]))]
+        with pytest.raises(ValueError, match="lacks Berry fields"):
+            decode_columns([c for c in columns if c[0] != "size"], 1)
+        with pytest.raises(ValueError, match="wrong length"):
+            decode_columns(columns, 2)
+
+
+class TestGroupedQueries:
+    def _dataset(self) -> BerryDataset:
+        return BerryDataset.from_berries([
+            _make_berry("cheri", 3, firmness="soft", natural_gift_type="fire", flavors=["spicy"]),
+            _make_berry("chesto", 3, firmness="super-hard", natural_gift_type="water", flavors=["dry"]),
+            _make_berry("pecha", 4, firmness="very-soft", natural_gift_type="electric", flavors=["sweet"]),
+            _make_berry("rawst", 5, firmness="hard", natural_gift_type="grass", flavors=["bitter", "sour"]),
+            _make_berry("aspear", 3, firmness="super-hard", natural_gift_type="ice", flavors=["sour"]),
+        ])
+
+    def test_inverted_index_lists_rows_per_label(self) -> None:
+        dataset = self._dataset()
+        assert dataset.labels("firmness") == ["hard", "soft", "super-hard", "very-soft"]
+        assert list(dataset.select({"flavors": "sour"})) == [3, 4]
+
+    def test_select_intersects_filters(self) -> None:
+        dataset = self._dataset()
+        assert dataset.select({}) is None
+        assert list(dataset.select({"firmness": "super-hard", "flavors": "sour"})) == [4]
+        assert list(dataset.select({"firmness": "unknown"})) == []
+
+    def test_group_by_firmness(self) -> None:
+        groups = self._dataset().grouped_summaries("growth_time", "firmness")
+        assert {label: s.count for label, s in groups.items()} == {
+            "hard": 1, "soft": 1, "super-hard": 2, "very-soft": 1,
+        }
+        assert groups["super-hard"].mean == 3.0
+
+    def test_multi_valued_group_counts_berry_in_each_label(self) -> None:
+        groups = self._dataset().grouped_summaries("growth_time", "flavors")
+        assert groups["sour"].frequency == {3: 1, 5: 1}
+        assert sum(s.count for s in groups.values()) == 6
+
+    def test_group_by_with_filter_drops_empty_groups(self) -> None:
+        groups = self._dataset().grouped_summaries(
+            "growth_time", "natural_gift_type", {"flavors": "sour"}
+        )
+        assert set(groups) == {"grass", "ice"}
+
+    def test_filtered_grouping_reads_only_selected_rows(self) -> None:
+        class CountingRows(list):  # type: ignore[type-arg]
+            reads = 0
+
+            def __getitem__(self, index: Any) -> Any:
+                CountingRows.reads += 1
+                return super().__getitem__(index)
+
+        dataset = self._dataset()
+        dataset.categorical["firmness"] = CountingRows(dataset.categorical["firmness"])
+
+        groups = dataset.grouped_summaries("growth_time", "firmness", {"flavors": "sour"})
+
+        assert {label: s.count for label, s in groups.items()} == {"hard": 1, "super-hard": 1}
+        assert CountingRows.reads == 2
+
+    def test_without_group_by_summarizes_selection(self) -> None:
+        dataset = self._dataset()
+        assert dataset.grouped_summaries("growth_time")["all"] is dataset.summary("growth_time")
+        assert dataset.grouped_summaries("growth_time", filters={"firmness": "x"}) == {}
+
+    def test_unfiltered_grouping_is_cached(self) -> None:
+        dataset = self._dataset()
+        first = dataset.grouped_summaries("growth_time", "firmness")
+        assert dataset.grouped_summaries("growth_time", "firmness") is first
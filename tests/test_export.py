@@ -0,0 +1,138 @@
+import json
+from typing import Any
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.cache import MemoryCache
+from src.dataset import BerrySnapshot
+from src.dependencies import get_cache
+from src.export import InvalidExportRequest, decode_cursor, encode_cursor, parse_fields
+from src.upstream_api import SNAPSHOT_CACHE_KEY
+from tests.conftest import SAMPLE_BERRIES, _make_berry
+
+
+def _records(response: httpx.Response) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture()
+def memory_cache(app: Any) -> MemoryCache:
+    cache = MemoryCache(max_entries=64)
+    app.dependency_overrides[get_cache] = lambda: cache
+    return cache
+
+
+@pytest.fixture()
+def cached_dataset(memory_cache: MemoryCache) -> BerrySnapshot:
+    """A cached snapshot that differs from what the mocked upstream would serve."""
+    snapshot = BerrySnapshot.create([_make_berry(f"cached-{i}", i) for i in range(1, 8)])
+    memory_cache.set(SNAPSHOT_CACHE_KEY, snapshot, 3600)
+    return snapshot
+
+
+class TestExportHelpers:
+    def test_parse_fields_keeps_model_order(self) -> None:
+        assert parse_fields("growth_time, name") == ["name", "growth_time"]
+        assert parse_fields(None)[0] == "name"
+
+    def test_parse_fields_rejects_unknown(self) -> None:
+        with pytest.raises(InvalidExportRequest):
+            parse_fields("name,colour")
+
+    def test_cursor_round_trip(self) -> None:
+        assert decode_cursor(encode_cursor(42)) == 42
+        assert decode_cursor(None) == 0
+
+    @pytest.mark.parametrize("cursor", ["!!", "bm90LWEtY3Vyc29y", encode_cursor(-1)])
+    def test_malformed_cursor_is_rejected(self, cursor: str) -> None:
+        with pytest.raises(InvalidExportRequest):
+            decode_cursor(cursor)
+
+
+class TestBerriesFromCache:
+    def test_streams_every_cached_berry_as_ndjson(
+        self, client: TestClient, mock_pokeapi: Any, cached_dataset: BerrySnapshot
+    ) -> None:
+        response = client.get("/berries")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = _records(response)
+        assert [r["name"] for r in records] == cached_dataset.dataset.names
+        assert records[0]["flavors"] == ["spicy"]
+        assert mock_pokeapi.requests == []
+
+    def test_projection(
+        self, client: TestClient, mock_pokeapi: Any, cached_dataset: BerrySnapshot
+    ) -> None:
+        records = _records(client.get("/berries", params={"fields": "growth_time,name"}))
+        assert records[0] == {"name": "cached-1", "growth_time": 1}
+
+    def test_cursor_pagination_walks_all_rows(
+        self, client: TestClient, mock_pokeapi: Any, cached_dataset: BerrySnapshot
+    ) -> None:
+        names: list[str] = []
+        params: dict[str, Any] = {"limit": 3, "fields": "name"}
+        while True:
+            response = client.get("/berries", params=params)
+            names += [r["name"] for r in _records(response)]
+            if "X-Next-Cursor" not in response.headers:
+                break
+            params["cursor"] = response.headers["X-Next-Cursor"]
+
+        assert names == cached_dataset.dataset.names
+
+    def test_invalid_parameters_return_422(
+        self, client: TestClient, mock_pokeapi: Any, cached_dataset: BerrySnapshot
+    ) -> None:
+        assert client.get("/berries", params={"fields": "colour"}).status_code == 422
+        assert client.get("/berries", params={"cursor": "!!"}).status_code == 422
+        assert client.get("/berries", params={"limit": 0}).status_code == 422
+
+
+class TestBerriesFromUpstream:
+    def test_streams_crawl_in_upstream_order(
+        self, client: TestClient, mock_pokeapi_paginated: Any
+    ) -> None:
+        records = _records(client.get("/berries", params={"fields": "name"}))
+        assert [r["name"] for r in records] == [name for name, _ in SAMPLE_BERRIES]
+
+    def test_complete_stream_populates_cache(
+        self, client: TestClient, mock_pokeapi: Any, memory_cache: MemoryCache
+    ) -> None:
+        client.get("/berries")
+        requests_after_crawl = len(mock_pokeapi.requests)
+
+        snapshot = memory_cache.get(SNAPSHOT_CACHE_KEY)
+        assert snapshot.dataset.names == [name for name, _ in SAMPLE_BERRIES]
+        client.get("/berries")
+        assert len(mock_pokeapi.requests) == requests_after_crawl
+
+    def test_page_of_upstream_stream(self, client: TestClient, mock_pokeapi: Any) -> None:
+        response = client.get("/berries", params={"fields": "name", "limit": 2})
+        assert [r["name"] for r in _records(response)] == ["cheri", "chesto"]
+
+        response = client.get(
+            "/berries",
+            params={"fields": "name", "limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+        )
+        assert [r["name"] for r in _records(response)] == ["pecha", "rawst"]
+
+    def test_short_last_page_links_to_an_empty_page(
+        self, app: Any, client: TestClient, mock_pokeapi: Any
+    ) -> None:
+        app.dependency_overrides[get_cache] = lambda: None  # every page streams from a crawl
+        params = {"fields": "name", "limit": 2, "cursor": encode_cursor(4)}
+
+        response = client.get("/berries", params=params)
+        assert [r["name"] for r in _records(response)] == ["aspear"]
+        assert decode_cursor(response.headers["X-Next-Cursor"]) == 6
+
+        response = client.get("/berries", params={**params, "cursor": response.headers["X-Next-Cursor"]})
+        assert response.text == ""
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_upstream_error_returns_502(self, client: TestClient, mock_pokeapi_error: Any) -> None:
+        assert client.get("/berries").status_code == 502
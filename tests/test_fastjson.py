@@ -0,0 +1,29 @@
+import json
+
+from src.fastjson import FastJSONResponse, dumps
+from src.models import AllBerryStatsResponse
+
+DOCUMENT = {"names": ["cheri", "chesto"], "mean": 3.6, "frequency": {3: 3, 4: 1}, "group": None}
+
+
+class TestDumps:
+    def test_int_keys_become_strings(self) -> None:
+        assert json.loads(dumps(DOCUMENT))["frequency"] == {"3": 3, "4": 1}
+
+    def test_matches_pydantic_encoding(self) -> None:
+        """The fast path produces the same bytes the response_model path did."""
+        model = AllBerryStatsResponse(
+            berries_names=["cheri", "chesto"],
+            min_growth_time=2,
+            median_growth_time=3.0,
+            max_growth_time=4,
+            variance_growth_time=0.6666666666666666,
+            mean_growth_time=3.0,
+            frequency_growth_time={2: 1, 4: 1},
+        )
+        assert dumps(model.model_dump()) == model.model_dump_json().encode()
+
+    def test_response_renders_json(self) -> None:
+        response = FastJSONResponse(DOCUMENT)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body)["names"] == ["cheri", "chesto"]
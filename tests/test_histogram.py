@@ -1,7 +1,20 @@
+import subprocess
+import sys
+import time
+from collections import Counter
 from typing import Any
+from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
 
+from src.chart import ChartRenderer, ChartRenderUnavailable, render_chart
+
+
+def _slow_render(freq: Counter[int], fmt: str, backend: str) -> bytes:
+    time.sleep(0.2)
+    return b"\x89PNG"
+
 
 class TestHistogram:
     def test_histogram_returns_200(
@@ -22,3 +35,106 @@ class TestHistogram:
         response = client.get("/histogram")
         # PNG files start with the magic bytes \x89PNG
         assert response.content[:4] == b"\x89PNG"
+
+
+    def test_histogram_svg_format(
+        self, client: TestClient, mock_pokeapi: Any
+    ) -> None:
+        response = client.get("/histogram", params={"format": "svg"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("image/svg+xml")
+        assert response.content.startswith(b"<svg")
+
+    def test_histogram_rejects_unknown_format(
+        self, client: TestClient, mock_pokeapi: Any
+    ) -> None:
+        response = client.get("/histogram", params={"format": "gif"})
+        assert response.status_code == 422
+
+
+class TestRenderChart:
+    def test_native_png_has_png_structure(self) -> None:
+        body = render_chart(Counter({3: 3, 4: 1, 5: 1}), "png")
+        assert body[:8] == b"\x89PNG\r\n\x1a\n"
+        assert body[12:16] == b"IHDR"
+        assert body.endswith(b"IEND\xaeB`\x82")
+
+    def test_native_svg_has_one_bar_per_growth_time(self) -> None:
+        body = render_chart(Counter({3: 3, 4: 1, 5: 1}), "svg").decode()
+        assert body.count('fill="#1f77b4"') == 3
+        assert "Berry Growth Time Frequency" in body
+
+    def test_matplotlib_backend(self) -> None:
+        pytest.importorskip("matplotlib")
+        assert render_chart(Counter({3: 3}), "png", backend="matplotlib")[:4] == b"\x89PNG"
+        assert b"<svg" in render_chart(Counter({3: 3}), "svg", backend="matplotlib")
+
+    def test_unknown_format_raises(self) -> None:
+        with pytest.raises(ValueError):
+            render_chart(Counter({3: 3}), "gif")
+
+    def test_matplotlib_is_imported_lazily(self) -> None:
+        code = (
+            "import sys; from collections import Counter; import src.chart as c; "
+            "c.render_chart(Counter({3: 3}), 'png'); print('matplotlib' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "False"
+
+
+class TestChartRenderer:
+    @pytest.mark.asyncio
+    async def test_renderer_produces_png_and_records_metrics(self) -> None:
+        renderer = ChartRenderer(workers=1, queue_size=2, timeout_seconds=10.0)
+        try:
+            png_bytes = await renderer.render_growth_time_histogram(Counter({3: 3, 4: 1}))
+        finally:
+            renderer.close()
+
+        assert png_bytes[:4] == b"\x89PNG"
+        assert renderer.render_seconds.count("png") == 1
+        assert next(renderer.render_seconds.series())[2] > 0
+        assert renderer.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_renderer_process_pool(self) -> None:
+        renderer = ChartRenderer(workers=1, executor="process", timeout_seconds=30.0)
+        try:
+            png_bytes = await renderer.render_growth_time_histogram(Counter({3: 3}))
+        finally:
+            renderer.close()
+
+        assert png_bytes[:4] == b"\x89PNG"
+
+    @pytest.mark.asyncio
+    async def test_renderer_times_out(self) -> None:
+        renderer = ChartRenderer(workers=1, timeout_seconds=0.01)
+        with patch("src.chart.render_chart", side_effect=_slow_render):
+            with pytest.raises(ChartRenderUnavailable):
+                await renderer.render_growth_time_histogram(Counter({3: 3}))
+            assert renderer.timeouts == 1
+            assert renderer.queue_depth == 1  # still rendering in the worker
+        renderer.close()
+
+    @pytest.mark.asyncio
+    async def test_renderer_rejects_when_queue_full(self) -> None:
+        renderer = ChartRenderer(workers=1, queue_size=1, timeout_seconds=0.01)
+        with patch("src.chart.render_chart", side_effect=_slow_render):
+            with pytest.raises(ChartRenderUnavailable):
+                await renderer.render_growth_time_histogram(Counter({3: 3}))
+            with pytest.raises(ChartRenderUnavailable, match="full"):
+                await renderer.render_growth_time_histogram(Counter({3: 3}))
+            assert renderer.rejected == 1
+        renderer.close()
+
+    def test_histogram_render_timeout_returns_503(
+        self, client: TestClient, mock_pokeapi: Any
+    ) -> None:
+        client.app.state.chart_renderer.timeout_seconds = 0.01
+        with patch("src.chart.render_chart", side_effect=_slow_render):
+            response = client.get("/histogram")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
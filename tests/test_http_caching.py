@@ -0,0 +1,92 @@
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.dataset import BerrySnapshot
+from src.dependencies import get_cache_soft_ttl
+from src.http_caching import artifact_etag, matching_etag, max_age
+from tests.conftest import _make_berry
+
+
+class TestEtagMatching:
+    @pytest.mark.parametrize(
+        ("header", "entry"),
+        [
+            ('"v1-stats.json"', '"v1-stats.json"'),
+            ('W/"v1-stats.json"', 'W/"v1-stats.json"'),
+            ('"other", "v1-stats.json"', '"v1-stats.json"'),
+            ('"v1-stats.json+gzip"', '"v1-stats.json+gzip"'),
+            ("*", '"v1-stats.json"'),
+        ],
+    )
+    def test_matching_headers(self, header: str, entry: str) -> None:
+        assert matching_etag(header, artifact_etag("stats.json", "v1")) == entry
+
+    @pytest.mark.parametrize("header", [None, "", '"v2-stats.json"', '"v1-histogram.png"'])
+    def test_non_matching_headers(self, header: str | None) -> None:
+        assert matching_etag(header, artifact_etag("stats.json", "v1")) is None
+
+
+class TestMaxAge:
+    def _snapshot(self, age: float) -> BerrySnapshot:
+        snapshot = BerrySnapshot.create([_make_berry("cheri", 3)])
+        snapshot.fetched_at -= age
+        return snapshot
+
+    def test_counts_down_to_soft_ttl(self) -> None:
+        assert max_age(self._snapshot(100), cache_ttl=3600, soft_ttl=3000) in (2899, 2900)
+
+    def test_uses_hard_ttl_without_soft_ttl(self) -> None:
+        assert max_age(self._snapshot(100), cache_ttl=3600, soft_ttl=None) in (3499, 3500)
+
+    def test_never_negative(self) -> None:
+        assert max_age(self._snapshot(5000), cache_ttl=3600, soft_ttl=3000) == 0
+
+
+class TestConditionalRoutes:
+    @pytest.fixture(autouse=True)
+    def _no_soft_ttl(self, app: Any) -> None:
+        app.dependency_overrides[get_cache_soft_ttl] = lambda: None
+
+    def test_stats_carry_validators(self, client: TestClient, mock_pokeapi: Any) -> None:
+        response = client.get("/allBerryStats")
+
+        assert response.headers["ETag"].endswith('-stats.json"')
+        max_age_seconds = int(response.headers["Cache-Control"].split("max-age=")[1])
+        assert 3590 <= max_age_seconds <= 3600
+
+    def test_stats_304_skips_building(self, client: TestClient, mock_pokeapi: Any) -> None:
+        etag = client.get("/allBerryStats").headers["ETag"]
+
+        with patch("src.router._all_berry_stats_document") as build:
+            response = client.get("/allBerryStats", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert "max-age=" in response.headers["Cache-Control"]
+        build.assert_not_called()
+
+    def test_histogram_304_skips_rendering(self, client: TestClient, mock_pokeapi: Any) -> None:
+        etag = client.get("/histogram").headers["ETag"]
+
+        with patch("src.chart.render_chart") as render:
+            response = client.get("/histogram", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        render.assert_not_called()
+
+    def test_formats_have_distinct_etags(self, client: TestClient, mock_pokeapi: Any) -> None:
+        png = client.get("/histogram").headers["ETag"]
+        svg = client.get("/histogram", params={"format": "svg"}).headers["ETag"]
+
+        assert png != svg
+        response = client.get("/histogram", params={"format": "svg"}, headers={"If-None-Match": png})
+        assert response.status_code == 200
+
+    def test_stale_etag_gets_full_response(self, client: TestClient, mock_pokeapi: Any) -> None:
+        response = client.get("/allBerryStats", headers={"If-None-Match": '"old-stats.json"'})
+        assert response.status_code == 200
+        assert response.json()["min_growth_time"] == 3
@@ -0,0 +1,100 @@
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.metrics import CONTENT_TYPE, Histogram, MetricsWriter
+from src.resilience import endpoint_label
+
+
+def _samples(text: str) -> dict[str, float]:
+    """Parse exposition text into {sample with labels: value}."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative_per_label_set(self) -> None:
+        histogram = Histogram(buckets=(1, 5))
+        for value in (0.5, 1, 3, 9):
+            histogram.observe(value, "a")
+        histogram.observe(2, "b")
+
+        series = {labels: (cumulative, total) for labels, cumulative, total in histogram.series()}
+        assert series[("a",)] == ([2, 3, 4], 13.5)
+        assert series[("b",)] == ([0, 1, 1], 2)
+        assert histogram.count("a") == 4
+        assert histogram.count("missing") == 0
+
+
+class TestMetricsWriter:
+    def test_histogram_exposition(self) -> None:
+        histogram = Histogram(buckets=(0.5, 1))
+        histogram.observe(0.25, "GET")
+        histogram.observe(2, "GET")
+        out = MetricsWriter(prefix="app_")
+        out.histogram("latency_seconds", "Request latency.", histogram, ("method",))
+
+        assert out.render().decode().splitlines() == [
+            "# HELP app_latency_seconds Request latency.",
+            "# TYPE app_latency_seconds histogram",
+            'app_latency_seconds_bucket{method="GET",le="0.5"} 1',
+            'app_latency_seconds_bucket{method="GET",le="1"} 1',
+            'app_latency_seconds_bucket{method="GET",le="+Inf"} 2',
+            'app_latency_seconds_sum{method="GET"} 2.25',
+            'app_latency_seconds_count{method="GET"} 2',
+        ]
+
+    def test_counter_and_gauge_values(self) -> None:
+        out = MetricsWriter()
+        out.counter("hits_total", "Hits.", {("redis",): 3, ('we"ird\n',): 1}, ("backend",))
+        out.gauge("age_seconds", "Age.", float("nan"))
+
+        lines = out.render().decode().splitlines()
+        assert "# TYPE hits_total counter" in lines
+        assert 'hits_total{backend="redis"} 3' in lines
+        assert 'hits_total{backend="we\\"ird\\n"} 1' in lines
+        assert "age_seconds NaN" in lines
+
+
+def test_endpoint_label_collapses_ids() -> None:
+    assert endpoint_label("/api/v2/berry/17/") == "/api/v2/berry/{id}/"
+    assert endpoint_label("/api/v2/berry/") == "/api/v2/berry/"
+
+
+class TestMetricsEndpoint:
+    def test_exposes_request_upstream_and_render_metrics(
+        self, client: TestClient, mock_pokeapi: Any
+    ) -> None:
+        client.get("/stats/size")
+        client.get("/stats/growth_time")
+        client.get("/histogram", params={"format": "svg"})
+
+        response = client.get("/metrics")
+        samples = _samples(response.text)
+
+        assert response.headers["content-type"] == CONTENT_TYPE
+        route = 'pokeberries_http_request_duration_seconds_count{method="GET",route="/stats/{attribute}",status="200"}'
+        assert samples[route] == 2
+        detail = 'pokeberries_upstream_request_duration_seconds_count{endpoint="/api/v2/berry/{id}/",status="200"}'
+        assert samples[detail] >= 5
+        assert samples['pokeberries_upstream_crawl_duration_seconds_count{outcome="ok"}'] >= 1
+        assert samples['pokeberries_chart_render_duration_seconds_count{format="svg"}'] == 1
+        assert samples['pokeberries_upstream_circuit_state{state="closed"}'] == 1
+        assert "pokeberries_response_compression_skipped_small_total" in samples
+
+    def test_unknown_paths_share_one_series(self, client: TestClient) -> None:
+        client.get("/no-such-route/1")
+        client.get("/no-such-route/2")
+
+        samples = _samples(client.get("/metrics").text)
+        unmatched = 'pokeberries_http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}'
+        assert samples[unmatched] == 2
+
+    @pytest.mark.parametrize("metric", ["cache_hits_total", "cache_misses_total", "cache_errors_total"])
+    def test_cache_counters_are_listed(self, client: TestClient, metric: str) -> None:
+        assert f"# TYPE pokeberries_{metric} counter" in client.get("/metrics").text
@@ -11,6 +11,13 @@ class TestBerryModel:
         assert berry.name == "cheri"
         assert berry.growth_time == 3
 
+    def test_berry_model_flattens_categorical_fields(self, mock_berry_detail: Any) -> None:
+        """Named resources become their names; only flavors with potency are kept."""
+        berry = Berry(**mock_berry_detail("cheri", 3))
+        assert berry.firmness == "soft"
+        assert berry.natural_gift_type == "fire"
+        assert berry.flavors == ["spicy"]
+
     def test_berry_list_response_parses_paginated_data(
         self, mock_berry_list_response: dict[str, Any]
     ) -> None:
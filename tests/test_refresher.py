@@ -0,0 +1,204 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.cache import MemoryCache
+from src.config import Settings
+from src.dataset import BerrySnapshot
+from src.dependencies import get_base_url
+from src.main import create_app
+from src.refresher import SnapshotRefresher
+from src.upstream_api import SNAPSHOT_CACHE_KEY, UpstreamApiError, fetch_berry_snapshot
+from tests.conftest import TEST_BASE_URL, FakePokeApi, _make_berry
+
+
+def _snapshot(age: float = 0.0) -> BerrySnapshot:
+    snapshot = BerrySnapshot.create([_make_berry("cheri", 3)])
+    snapshot.fetched_at -= age
+    return snapshot
+
+
+class FakeUpstream:
+    """Counts refreshes; fails while `failing` is set."""
+
+    def __init__(self, current: BerrySnapshot | None = None):
+        self.calls = 0
+        self.failing = False
+        self.cached = current
+
+    async def refresh(self) -> BerrySnapshot:
+        self.calls += 1
+        if self.failing:
+            raise UpstreamApiError("down")
+        self.cached = _snapshot()
+        return self.cached
+
+    async def current(self) -> BerrySnapshot | None:
+        return self.cached
+
+
+class TestSchedule:
+    def test_due_immediately_without_snapshot(self) -> None:
+        refresher = SnapshotRefresher(FakeUpstream().refresh, FakeUpstream().current, 100)
+        assert refresher.due_in(None) == 0.0
+
+    def test_due_before_expiry_minus_jitter(self) -> None:
+        refresher = SnapshotRefresher(FakeUpstream().refresh, FakeUpstream().current, 100, jitter_seconds=10)
+        assert refresher.due_in(_snapshot(age=30), jitter=5) == pytest.approx(65, abs=0.5)
+        assert refresher.due_in(_snapshot(age=500)) == 0.0
+
+    def test_jitter_cannot_exceed_refresh_interval(self) -> None:
+        refresher = SnapshotRefresher(FakeUpstream().refresh, FakeUpstream().current, 5, jitter_seconds=60)
+        assert refresher.jitter_seconds == 5
+
+
+class TestWarmUp:
+    @pytest.mark.asyncio
+    async def test_crawls_when_nothing_is_cached(self) -> None:
+        upstream = FakeUpstream()
+        refresher = SnapshotRefresher(upstream.refresh, upstream.current, 100)
+
+        assert await refresher.warm_up() is True
+        assert upstream.calls == 1
+        assert refresher.refreshes == 1
+        assert refresher.last_refresh_at is not None
+
+    @pytest.mark.asyncio
+    async def test_skips_crawl_when_cache_is_warm(self) -> None:
+        upstream = FakeUpstream(current=_snapshot())
+        refresher = SnapshotRefresher(upstream.refresh, upstream.current, 100)
+
+        assert await refresher.warm_up() is True
+        assert upstream.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_is_reported_not_raised(self) -> None:
+        upstream = FakeUpstream()
+        upstream.failing = True
+        refresher = SnapshotRefresher(upstream.refresh, upstream.current, 100)
+
+        assert await refresher.warm_up() is False
+        assert refresher.failures == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_timeout(self) -> None:
+        async def slow() -> BerrySnapshot:
+            await asyncio.sleep(10)
+            return _snapshot()
+
+        refresher = SnapshotRefresher(slow, FakeUpstream().current, 100)
+        assert await refresher.warm_up(timeout_seconds=0.01) is False
+
+
+class TestBackgroundRefresh:
+    @pytest.mark.asyncio
+    async def test_refreshes_ahead_of_expiry_and_stops_cleanly(self) -> None:
+        upstream = FakeUpstream(current=_snapshot())
+        refresher = SnapshotRefresher(upstream.refresh, upstream.current, 0.02)
+
+        refresher.start()
+        await asyncio.sleep(0.15)
+        await refresher.stop()
+        calls = upstream.calls
+        await asyncio.sleep(0.05)
+
+        assert calls >= 2
+        assert upstream.calls == calls
+        assert not refresher.running
+
+    @pytest.mark.asyncio
+    async def test_waits_for_a_snapshot_refreshed_elsewhere(self) -> None:
+        upstream = FakeUpstream(current=_snapshot(age=50))
+        refresher = SnapshotRefresher(upstream.refresh, upstream.current, 60)
+
+        refresher.start()
+        await asyncio.sleep(0.02)
+        upstream.cached = _snapshot()  # another worker refreshed the shared cache
+        await asyncio.sleep(0.05)
+        await refresher.stop()
+
+        assert upstream.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_is_retried(self) -> None:
+        upstream = FakeUpstream()
+        upstream.failing = True
+        refresher = SnapshotRefresher(upstream.refresh, upstream.current, 60, retry_seconds=0.01)
+
+        refresher.start()
+        await asyncio.sleep(0.05)
+        upstream.failing = False
+        await asyncio.sleep(0.05)
+        await refresher.stop()
+
+        assert refresher.failures >= 2
+        assert refresher.refreshes == 1
+
+
+class TestForceRefresh:
+    @pytest.mark.asyncio
+    async def test_crawls_despite_a_fresh_snapshot(self, mock_pokeapi: FakePokeApi) -> None:
+        cache = MemoryCache(8)
+        fresh = _snapshot()
+        cache.set(SNAPSHOT_CACHE_KEY, fresh, 3600)
+
+        snapshot = await fetch_berry_snapshot(TEST_BASE_URL, cache, 3600, force_refresh=True)
+
+        assert snapshot is not fresh
+        assert len(snapshot.dataset) == 5
+        assert cache.get(SNAPSHOT_CACHE_KEY) is snapshot
+
+    @pytest.mark.asyncio
+    async def test_failure_is_raised_instead_of_serving_stale(
+        self, mock_pokeapi_error: FakePokeApi
+    ) -> None:
+        cache = MemoryCache(8)
+        cache.set(SNAPSHOT_CACHE_KEY, _snapshot(age=100), 3600)
+
+        with pytest.raises(UpstreamApiError):
+            await fetch_berry_snapshot(
+                TEST_BASE_URL, cache, 60, stale_if_error_seconds=3600, force_refresh=True
+            )
+
+
+class TestHealthEndpoints:
+    def test_health(self, client: TestClient) -> None:
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+    def test_not_ready_without_a_dataset(self, client: TestClient) -> None:
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+        assert response.json()["dataset_age_seconds"] is None
+        assert response.headers["cache-control"] == "no-store"
+
+    def test_startup_warms_cache_and_reports_ready(self, mock_pokeapi: FakePokeApi) -> None:
+        settings = Settings(
+            pokeapi_base_url=TEST_BASE_URL,
+            redis_url="",
+            cache_warmup_enabled=True,
+            cache_refresh_enabled=True,
+        )
+        with patch("src.main.get_settings", return_value=settings):
+            app = create_app(http_transport=mock_pokeapi.transport())
+        app.dependency_overrides[get_base_url] = lambda: TEST_BASE_URL
+
+        with TestClient(app) as client:
+            crawled = len(mock_pokeapi.requests)
+            readiness = client.get("/ready").json()
+            stats = client.get("/allBerryStats")
+
+        assert crawled == 6  # one list page and five details, before the first request
+        assert readiness["ready"] is True
+        assert readiness["berries"] == 5
+        assert readiness["dataset_age_seconds"] < 60
+        assert readiness["refresher_running"] is True
+        assert stats.status_code == 200
+        assert len(mock_pokeapi.requests) == crawled
+        assert not app.state.refresher.running
+
@@ -0,0 +1,316 @@
+import asyncio
+import time
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import Settings
+from src.dataset import BerrySnapshot
+from src.dependencies import get_cache
+from src.resilience import CircuitBreaker, CircuitOpenError, LatencyWindow, ResilientTransport
+from src.upstream_api import (
+    SNAPSHOT_CACHE_KEY,
+    UpstreamApiError,
+    create_http_client,
+    create_upstream_transport,
+    fallback_totals,
+    fetch_berry_snapshot,
+)
+from tests.conftest import FakePokeApi, _install_handler, _make_berry
+from tests.test_cache import MockCache
+
+BASE_URL = "https://pokeapi.co/api/v2"
+URL = "https://pokeapi.co/api/v2/berry/1/"
+
+
+def _transport(handler: Any, **kwargs: Any) -> ResilientTransport:
+    kwargs.setdefault("backoff_seconds", 0.0)
+    return ResilientTransport(httpx.MockTransport(handler), **kwargs)
+
+
+async def _get(transport: ResilientTransport) -> httpx.Response:
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await client.get(URL)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opened == 1
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.rejected == 1
+
+    def test_success_resets_the_failure_count(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_lets_one_trial_through(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+        breaker.record_failure()
+
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opened == 2
+
+
+class TestLatencyWindow:
+    def test_no_percentile_until_enough_samples(self) -> None:
+        window = LatencyWindow(min_samples=3)
+        window.observe(1.0)
+        assert window.percentile(95) is None
+
+    def test_nearest_rank_percentile(self) -> None:
+        window = LatencyWindow(min_samples=1)
+        for ms in range(1, 101):
+            window.observe(ms / 1000)
+        assert window.percentile(95) == pytest.approx(0.095)
+        assert window.percentile(50) == pytest.approx(0.050)
+
+
+class TestRetries:
+    @pytest.mark.asyncio
+    async def test_transient_error_is_retried(self) -> None:
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise httpx.ConnectError("reset", request=request)
+            return httpx.Response(200, json={})
+
+        transport = _transport(handler)
+        assert (await _get(transport)).status_code == 200
+        assert transport.stats.retries == 1
+
+    @pytest.mark.asyncio
+    async def test_retryable_status_is_retried(self) -> None:
+        statuses = iter([503, 502, 200])
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(next(statuses))
+
+        transport = _transport(handler)
+        assert (await _get(transport)).status_code == 200
+        assert transport.stats.retries == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_bounded_retries(self) -> None:
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            raise httpx.ConnectError("down", request=request)
+
+        transport = _transport(handler, retries=2)
+        with pytest.raises(httpx.ConnectError):
+            await _get(transport)
+        assert calls == 3
+        assert transport.stats.failures == 1
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self) -> None:
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(404)
+
+        transport = _transport(handler)
+        assert (await _get(transport)).status_code == 404
+        assert calls == 1
+        assert transport.breaker.state == CircuitBreaker.CLOSED
+
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        transport = _transport(None, backoff_seconds=0.1, max_backoff_seconds=0.3)
+        with patch("src.resilience.random.uniform", side_effect=lambda low, high: high):
+            assert [transport._backoff(n) for n in (1, 2, 3, 4)] == [0.1, 0.2, 0.3, 0.3]
+        assert all(0 <= transport._backoff(3) <= 0.3 for _ in range(100))
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_fast_without_calling_upstream(self) -> None:
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            raise httpx.ConnectError("down", request=request)
+
+        transport = _transport(handler, retries=0, breaker=CircuitBreaker(failure_threshold=2))
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await _get(transport)
+
+        with pytest.raises(CircuitOpenError):
+            await _get(transport)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_half_open_trial_frees_the_circuit(self) -> None:
+        """A cancelled trial call is neither a success nor a failure; the next call is the new trial."""
+        started = asyncio.Event()
+        hang = True
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if hang:
+                started.set()
+                await asyncio.sleep(60)
+            return httpx.Response(200)
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+        breaker.record_failure()
+        transport = _transport(handler, breaker=breaker)
+
+        trial = asyncio.ensure_future(_get(transport))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        hang = False
+        assert (await _get(transport)).status_code == 200
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.opened == 1
+
+
+class TestHedging:
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self) -> None:
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"call": calls})
+
+        transport = _transport(handler, hedge_percentile=95)
+        for _ in range(transport.latency.min_samples):
+            transport.latency.observe(0.01)
+
+        start = time.perf_counter()
+        response = await _get(transport)
+
+        assert time.perf_counter() - start < 0.5
+        assert response.json() == {"call": 2}
+        assert (transport.stats.hedges, transport.stats.hedge_wins) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_without_latency_history(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200)
+
+        transport = _transport(handler, hedge_percentile=95)
+        await _get(transport)
+        assert transport.stats.hedges == 0
+
+
+class TestStaleIfError:
+    def _aged_snapshot(self, age: float) -> BerrySnapshot:
+        snapshot = BerrySnapshot.create([_make_berry("cheri", 3)])
+        snapshot.fetched_at -= age
+        return snapshot
+
+    @pytest.mark.asyncio
+    async def test_expired_snapshot_is_served_when_crawl_fails(
+        self, mock_pokeapi_error: Any
+    ) -> None:
+        cache = MockCache()
+        stale = self._aged_snapshot(120)
+        cache.set(SNAPSHOT_CACHE_KEY, stale, 0)
+        served_before = fallback_totals.stale_served
+
+        snapshot = await fetch_berry_snapshot(
+            BASE_URL, cache, cache_ttl_seconds=60, stale_if_error_seconds=3600
+        )
+
+        assert snapshot is stale
+        assert fallback_totals.stale_served == served_before + 1
+
+    @pytest.mark.asyncio
+    async def test_snapshot_past_stale_window_is_not_served(self, mock_pokeapi_error: Any) -> None:
+        cache = MockCache()
+        cache.set(SNAPSHOT_CACHE_KEY, self._aged_snapshot(7200), 0)
+
+        with pytest.raises(UpstreamApiError):
+            await fetch_berry_snapshot(
+                BASE_URL, cache, cache_ttl_seconds=60, stale_if_error_seconds=3600
+            )
+
+    def test_route_serves_stale_stats_while_upstream_is_down(
+        self, app: Any, client: TestClient, mock_pokeapi_error: Any
+    ) -> None:
+        cache = MockCache()
+        cache.set(SNAPSHOT_CACHE_KEY, self._aged_snapshot(2 * 3600), 0)
+        app.dependency_overrides[get_cache] = lambda: cache
+
+        response = client.get("/allBerryStats")
+
+        assert response.status_code == 200
+        assert response.json()["berries_names"] == ["cheri"]
+
+
+class TestSharedClient:
+    def test_shared_client_is_resilient(self) -> None:
+        settings = Settings(
+            pokeapi_base_url=BASE_URL, upstream_retries=4, circuit_breaker_failure_threshold=9
+        )
+        transport = create_upstream_transport(settings)
+        client = create_http_client(settings, transport=transport)
+
+        assert client._transport is transport
+        assert transport.retries == 4
+        assert transport.breaker.failure_threshold == 9
+
+    def test_plain_transport_is_wrapped(self) -> None:
+        client = create_http_client(Settings(pokeapi_base_url=BASE_URL), transport=httpx.MockTransport(None))
+        assert isinstance(client._transport, ResilientTransport)
+
+    @pytest.mark.asyncio
+    async def test_crawl_survives_a_flaky_detail(self, pokeapi: FakePokeApi, mock_pokeapi: Any) -> None:
+        """One failing detail request is retried instead of failing the whole crawl."""
+        healthy = pokeapi.handler
+        failed: set[str] = set()
+
+        async def flaky(request: httpx.Request) -> httpx.Response:
+            url = str(request.url)
+            if url.endswith("/berry/3/") and url not in failed:
+                failed.add(url)
+                raise httpx.ReadTimeout("slow", request=request)
+            return await healthy(request)
+
+        settings = Settings(pokeapi_base_url=BASE_URL, upstream_retry_backoff_seconds=0)
+        with _install_handler(pokeapi, flaky):
+            async with create_http_client(settings, transport=pokeapi.transport()) as client:
+                snapshot = await fetch_berry_snapshot(BASE_URL, None, 0, client=client)
+
+        assert len(snapshot.dataset) == 5
@@ -3,6 +3,10 @@ from typing import Any
 import pytest
 from fastapi.testclient import TestClient
 
+from src.cache import MemoryCache
+from src.dependencies import get_cache
+from src.models import AllBerryStatsResponse, AttributeStatsResponse, GroupedStatsResponse
+
 
 class TestAllBerryStats:
     def test_all_berry_stats_returns_200(
@@ -94,3 +98,98 @@ class TestAllBerryStats:
         """When PokeAPI is unreachable, returns an error status."""
         response = client.get("/allBerryStats")
         assert response.status_code >= 500
+
+
+class TestAttributeStats:
+    def test_growth_time_summary(self, client: TestClient, mock_pokeapi: Any) -> None:
+        """growth_time of [3, 3, 3, 4, 5]"""
+        data = client.get("/stats/growth_time").json()
+        assert data["attribute"] == "growth_time"
+        assert data["count"] == 5
+        assert data["min"] == 3
+        assert data["max"] == 5
+        assert data["mean"] == pytest.approx(3.6)
+        assert data["median"] == 3.0
+        assert data["frequency"] == {"3": 3, "4": 1, "5": 1}
+
+    def test_default_quantiles_are_quartiles(self, client: TestClient, mock_pokeapi: Any) -> None:
+        data = client.get("/stats/growth_time").json()
+        assert data["quantiles"] == {"0.25": 3.0, "0.5": 3.0, "0.75": 4.0}
+
+    def test_custom_quantiles_interpolate(self, client: TestClient, mock_pokeapi: Any) -> None:
+        data = client.get("/stats/growth_time", params={"q": "0.9,0.99,1"}).json()
+        assert data["quantiles"] == {
+            "0.9": pytest.approx(4.6),
+            "0.99": pytest.approx(4.96),
+            "1.0": 5.0,
+        }
+
+    @pytest.mark.parametrize(
+        "attribute, expected",
+        [("max_harvest", 5), ("natural_gift_power", 60), ("size", 20), ("smoothness", 25), ("soil_dryness", 15)],
+    )
+    def test_other_numeric_attributes(
+        self, client: TestClient, mock_pokeapi: Any, attribute: str, expected: int
+    ) -> None:
+        data = client.get(f"/stats/{attribute}").json()
+        assert data["min"] == data["max"] == expected
+        assert data["count"] == 5
+
+    def test_all_attributes_share_one_crawl(
+        self, app: Any, client: TestClient, mock_pokeapi: Any
+    ) -> None:
+        cache = MemoryCache(max_entries=64)
+        app.dependency_overrides[get_cache] = lambda: cache
+        client.get("/stats/growth_time")
+        requests_after_first = len(mock_pokeapi.requests)
+        client.get("/stats/size")
+        client.get("/stats/smoothness")
+        assert len(mock_pokeapi.requests) == requests_after_first
+
+    def test_unknown_attribute_returns_422(self, client: TestClient, mock_pokeapi: Any) -> None:
+        assert client.get("/stats/flavor").status_code == 422
+
+    @pytest.mark.parametrize("q", ["1.5", "-0.1", "abc"])
+    def test_invalid_quantile_returns_422(self, client: TestClient, mock_pokeapi: Any, q: str) -> None:
+        assert client.get("/stats/growth_time", params={"q": q}).status_code == 422
+
+
+class TestGroupedQuery:
+    def test_group_by_firmness(self, client: TestClient, mock_pokeapi: Any) -> None:
+        data = client.get("/query", params={"group_by": "firmness"}).json()
+        assert data["attribute"] == "growth_time"
+        assert data["groups"]["soft"]["count"] == 5
+        assert data["groups"]["soft"]["mean"] == pytest.approx(3.6)
+
+    def test_filter_without_group_by(self, client: TestClient, mock_pokeapi: Any) -> None:
+        data = client.get("/query", params={"attribute": "size", "flavors": "spicy"}).json()
+        assert data["filters"] == {"flavors": "spicy"}
+        assert data["groups"]["all"]["min"] == 20
+
+    def test_filter_matching_nothing_returns_no_groups(
+        self, client: TestClient, mock_pokeapi: Any
+    ) -> None:
+        data = client.get("/query", params={"group_by": "flavors", "firmness": "hard"}).json()
+        assert data["groups"] == {}
+
+    def test_unknown_group_by_returns_422(self, client: TestClient, mock_pokeapi: Any) -> None:
+        assert client.get("/query", params={"group_by": "color"}).status_code == 422
+
+
+class TestResponsesMatchSchemas:
+    """Fast-path bodies are built without response_model; they must still match it."""
+
+    def test_all_berry_stats_body_matches_model(self, client: TestClient, mock_pokeapi: Any) -> None:
+        AllBerryStatsResponse.model_validate_json(client.get("/allBerryStats").content)
+
+    def test_attribute_stats_body_matches_model(self, client: TestClient, mock_pokeapi: Any) -> None:
+        AttributeStatsResponse.model_validate_json(client.get("/stats/size").content)
+
+    def test_grouped_stats_body_matches_model(self, client: TestClient, mock_pokeapi: Any) -> None:
+        response = client.get("/query", params={"group_by": "flavors"})
+        GroupedStatsResponse.model_validate_json(response.content)
+
+    def test_openapi_still_documents_response_models(self, client: TestClient) -> None:
+        paths = client.get("/openapi.json").json()["paths"]
+        schema = paths["/allBerryStats"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema["$ref"].endswith("/AllBerryStatsResponse")
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+
+from src.singleflight import SingleFlight
+from src.upstream_api import berries_flight, fetch_all_berries, fetch_berry_data, UpstreamApiError
+from tests.conftest import FakePokeApi, _install_handler
+
+BASE_URL = "https://pokeapi.co/api/v2"
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self) -> None:
+        """Callers arriving while a call is in flight get its result."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert results == ["done"] * 5
+        assert calls == 1
+        assert flight.coalesced == 4
+        assert not flight.in_flight("key")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_the_error(self) -> None:
+        """Every coalesced caller receives the leader's exception."""
+        flight = SingleFlight()
+
+        async def work() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.do("key", work) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.coalesced == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_coalesced(self) -> None:
+        """Once a call completes, the next one runs again."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flight.do("key", work) == 1
+        assert await flight.do("key", work) == 2
+        assert flight.coalesced == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self) -> None:
+        """Cancelling the first caller leaves the shared call running."""
+        flight = SingleFlight()
+
+        async def work() -> str:
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "done"
+
+
+class TestCoalescedCacheMisses:
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_trigger_one_crawl(
+        self, pokeapi: FakePokeApi, mock_pokeapi: Any
+    ) -> None:
+        """Concurrent fetch_all_berries calls on a cold cache crawl upstream once."""
+        before = berries_flight.coalesced
+
+        results = await asyncio.gather(
+            *(fetch_all_berries(BASE_URL, cache=None, cache_ttl_seconds=0) for _ in range(4))
+        )
+
+        assert all(len(berries) == 5 for berries in results)
+        assert len(pokeapi.requests) == 6  # one list page + five details
+        assert berries_flight.coalesced - before == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_upstream_error(self, pokeapi: FakePokeApi) -> None:
+        """Every coalesced caller gets UpstreamApiError from the single failed crawl."""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        with _install_handler(pokeapi, handler):
+            results = await asyncio.gather(
+                *(fetch_berry_data(BASE_URL, cache=None, cache_ttl_seconds=0) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        assert all(isinstance(r, UpstreamApiError) for r in results)
+        assert len(pokeapi.requests) == 1
@@ -0,0 +1,146 @@
+import pickle
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.cache import CompactSerializer, SerializationError
+from src.config import Settings
+from src.dataset import BerrySnapshot, CrawlStats
+from src.dependencies import get_base_url, get_cache
+from src.main import create_app
+from src.snapshot import HEADER, dump_snapshot, load_snapshot, write_snapshot
+from src.upstream_api import fetch_berry_snapshot
+from tests.conftest import SAMPLE_BERRIES, TEST_BASE_URL, FakePokeApi, NoOpCache, _make_berry
+
+
+def _snapshot() -> BerrySnapshot:
+    berries = [
+        _make_berry(name, gt, flavors=["spicy", "dry"] if i % 2 else [], firmness="hard" if i else "soft")
+        for i, (name, gt) in enumerate(SAMPLE_BERRIES)
+    ]
+    return BerrySnapshot.create(berries, crawl_stats=CrawlStats(reused=2, downloaded=3))
+
+
+@pytest.fixture()
+def snapshot_file(tmp_path: Path) -> tuple[Path, BerrySnapshot]:
+    path = tmp_path / "berries.snap"
+    snapshot = _snapshot()
+    write_snapshot(str(path), snapshot)
+    return path, snapshot
+
+
+class TestSnapshotFile:
+    def test_round_trip(self, snapshot_file: tuple[Path, BerrySnapshot]) -> None:
+        path, original = snapshot_file
+        loaded = load_snapshot(str(path))
+
+        assert loaded.dataset == original.dataset
+        assert loaded.version == original.version
+        assert loaded.fetched_at == original.fetched_at
+        assert loaded.crawl_stats == original.crawl_stats
+        assert loaded.dataset.summary("growth_time") == original.dataset.summary("growth_time")
+        assert loaded.berries == original.berries
+
+    @pytest.mark.skipif(sys.byteorder != "little", reason="columns are copied on big-endian hosts")
+    def test_integer_columns_are_mapped_not_copied(
+        self, snapshot_file: tuple[Path, BerrySnapshot]
+    ) -> None:
+        path, _ = snapshot_file
+        column = load_snapshot(str(path)).dataset.numeric["growth_time"]
+
+        assert isinstance(column, memoryview)
+        assert column.readonly
+        assert column.tolist() == [gt for _, gt in SAMPLE_BERRIES]
+
+    def test_empty_dataset(self, tmp_path: Path) -> None:
+        path = tmp_path / "empty.snap"
+        write_snapshot(str(path), BerrySnapshot.create([]))
+        assert len(load_snapshot(str(path)).dataset) == 0
+
+    def test_mapped_snapshot_can_be_cached(self, snapshot_file: tuple[Path, BerrySnapshot]) -> None:
+        path, original = snapshot_file
+        loaded = load_snapshot(str(path))
+
+        assert pickle.loads(pickle.dumps(loaded)).dataset == original.dataset
+        compact = CompactSerializer()
+        assert compact.loads(compact.dumps(loaded)).dataset == original.dataset
+
+    def test_rewrite_leaves_mapped_snapshot_intact(
+        self, snapshot_file: tuple[Path, BerrySnapshot]
+    ) -> None:
+        path, original = snapshot_file
+        loaded = load_snapshot(str(path))
+
+        write_snapshot(str(path), BerrySnapshot.create([_make_berry("oran", 99)]))
+
+        assert loaded.dataset.numeric["growth_time"].tolist() == [gt for _, gt in SAMPLE_BERRIES]
+        assert load_snapshot(str(path)).dataset.names == ["oran"]
+        assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+    def test_rejects_foreign_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "other.snap"
+        path.write_bytes(b"\x00" * HEADER.size)
+        with pytest.raises(SerializationError):
+            load_snapshot(str(path))
+
+    def test_rejects_truncated_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "truncated.snap"
+        path.write_bytes(dump_snapshot(_snapshot())[:-64])
+        with pytest.raises(SerializationError):
+            load_snapshot(str(path))
+
+    def test_rejects_empty_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "zero.snap"
+        path.touch()
+        with pytest.raises(SerializationError):
+            load_snapshot(str(path))
+
+
+class TestWarmStart:
+    @pytest.mark.asyncio
+    async def test_newer_warm_snapshot_is_served_without_crawling(
+        self, pokeapi: FakePokeApi
+    ) -> None:
+        warm = _snapshot()
+        snapshot = await fetch_berry_snapshot(TEST_BASE_URL, None, 3600, warm_snapshot=warm)
+
+        assert snapshot is warm
+        assert pokeapi.requests == []
+
+    @pytest.mark.asyncio
+    async def test_expired_warm_snapshot_triggers_a_crawl(self, mock_pokeapi: FakePokeApi) -> None:
+        warm = _snapshot()
+        warm.fetched_at -= 7200
+
+        snapshot = await fetch_berry_snapshot(TEST_BASE_URL, None, 3600, warm_snapshot=warm)
+
+        assert snapshot is not warm
+        assert mock_pokeapi.requests
+
+    def test_app_loads_snapshot_at_startup(
+        self, pokeapi: FakePokeApi, snapshot_file: tuple[Path, BerrySnapshot]
+    ) -> None:
+        path, original = snapshot_file
+        settings = Settings(pokeapi_base_url=TEST_BASE_URL, snapshot_path=str(path))
+        with patch("src.main.get_settings", return_value=settings):
+            app = create_app(http_transport=pokeapi.transport())
+        app.dependency_overrides[get_base_url] = lambda: TEST_BASE_URL
+        app.dependency_overrides[get_cache] = lambda: NoOpCache()
+
+        with TestClient(app) as client:
+            stats = client.get("/allBerryStats")
+            rows = client.get("/berries", params={"fields": "name"})
+
+        assert stats.status_code == 200
+        assert stats.json()["berries_names"] == original.dataset.names
+        assert rows.text.splitlines()[0] == '{"name":"cheri"}'
+        assert pokeapi.requests == []
+
+    def test_missing_snapshot_file_starts_cold(self, tmp_path: Path) -> None:
+        settings = Settings(pokeapi_base_url=TEST_BASE_URL, snapshot_path=str(tmp_path / "none"))
+        with patch("src.main.get_settings", return_value=settings):
+            app = create_app()
+        assert app.state.warm_snapshot is None
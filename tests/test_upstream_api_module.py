@@ -1,14 +1,93 @@
+import asyncio
+import time
 from typing import Any
 from collections import Counter
+from collections.abc import Generator
 
 import httpx
 import pytest
+from fastapi.testclient import TestClient
 from unittest.mock import patch
 
-from src.upstream_api import fetch_all_berries, fetch_berry_data, UpstreamApiError
+from src.config import Settings
+from src.cache import MemoryCache
+from src.upstream_api import (
+    SNAPSHOT_CACHE_KEY,
+    berries_flight,
+    cached_snapshot,
+    create_http_client,
+    fetch_all_berries,
+    fetch_berry_data,
+    fetch_berry_snapshot,
+    stream_berries,
+    UpstreamApiError,
+)
 from src.models import Berry
+from tests.conftest import (
+    FakePokeApi,
+    _berry_id,
+    _install_handler,
+    _make_berry_detail,
+    _make_berry_list_response,
+)
 
 BASE_URL = "https://pokeapi.co/api/v2"
+UPSTREAM_LATENCY = 0.05
+SLOW_BERRIES: list[tuple[str, int]] = [(f"berry-{i}", i % 7 + 1) for i in range(20)]
+
+
+PAGED_BERRIES: list[tuple[str, int]] = [(f"paged-{i}", i % 5 + 1) for i in range(50)]
+
+
+def _offset_limit_handler(
+    berries: list[tuple[str, int]], max_limit: int | None = None, latency: float = 0.0
+) -> Any:
+    """Serve `berries` honouring offset/limit like PokeAPI, optionally capping limit."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        berry_id = _berry_id(str(request.url))
+        if berry_id is not None:
+            return httpx.Response(200, json=_make_berry_detail(*berries[berry_id - 1]))
+        offset = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params.get("limit", 20))
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+        page = _make_berry_list_response(
+            berries[offset:offset + limit], offset=offset, count=len(berries)
+        )
+        return httpx.Response(200, json=page)
+
+    return handler
+
+
+def _list_requests(pokeapi: FakePokeApi) -> list[httpx.Request]:
+    return [r for r in pokeapi.requests if _berry_id(str(r.url)) is None]
+
+
+@pytest.fixture()
+def mock_pokeapi_slow(pokeapi: FakePokeApi) -> Generator[FakePokeApi, None, None]:
+    """Serve two pages of berries with added per-request latency."""
+    page1 = _make_berry_list_response(
+        SLOW_BERRIES[:10],
+        offset=0,
+        next_url="https://pokeapi.co/api/v2/berry/?offset=10&limit=10",
+        count=len(SLOW_BERRIES),
+    )
+    page2 = _make_berry_list_response(SLOW_BERRIES[10:], offset=10, count=len(SLOW_BERRIES))
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(UPSTREAM_LATENCY)
+        url = str(request.url)
+        berry_id = _berry_id(url)
+        if berry_id is not None:
+            return httpx.Response(200, json=_make_berry_detail(*SLOW_BERRIES[berry_id - 1]))
+        if "offset=10" in url:
+            return httpx.Response(200, json=page2)
+        return httpx.Response(200, json=page1)
+
+    with _install_handler(pokeapi, handler):
+        yield pokeapi
 
 
 class TestUpstreamApiError:
@@ -39,11 +118,229 @@ class TestFetchAllBerries:
                 await fetch_all_berries("https://invalid.url", cache=None, cache_ttl_seconds=0)
 
     @pytest.mark.asyncio
-    async def test_fetch_all_berries_respects_max_pages(self) -> None:
-        """fetch_all_berries respects max_pages limit."""
-        # This test would require a more complex mock setup to simulate many pages
-        # For now, we trust the existing pagination logic works correctly
-        pass
+    async def test_fetch_all_berries_respects_max_pages(self, pokeapi: FakePokeApi) -> None:
+        """Pages past the max_pages safety cap are never requested."""
+        with _install_handler(pokeapi, _offset_limit_handler(PAGED_BERRIES)):
+            berries = await fetch_all_berries(
+                BASE_URL, cache=None, cache_ttl_seconds=0, page_size=10, max_pages=2
+            )
+
+        assert [b.name for b in berries] == [name for name, _ in PAGED_BERRIES[:20]]
+        assert len(_list_requests(pokeapi)) == 2
+
+
+class TestConcurrentFetch:
+    @pytest.mark.asyncio
+    async def test_concurrent_fetch_preserves_upstream_order(self, mock_pokeapi_slow: Any) -> None:
+        """Concurrent detail fetching returns berries in list-page order."""
+        berries = await fetch_all_berries(BASE_URL, cache=None, cache_ttl_seconds=0, concurrency=8)
+        assert [b.name for b in berries] == [name for name, _ in SLOW_BERRIES]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetch_is_faster_than_serial(self, mock_pokeapi_slow: Any) -> None:
+        """With upstream latency, bounded fan-out beats one-at-a-time fetching."""
+        start = time.perf_counter()
+        await fetch_all_berries(BASE_URL, cache=None, cache_ttl_seconds=0, concurrency=1)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await fetch_all_berries(BASE_URL, cache=None, cache_ttl_seconds=0, concurrency=10)
+        concurrent = time.perf_counter() - start
+
+        # concurrency=1 still pays one round trip per detail; concurrency=10 ~4
+        assert serial >= len(SLOW_BERRIES) * UPSTREAM_LATENCY
+        assert concurrent < serial / 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetch_detail_error_raises_single_upstream_error(
+        self, pokeapi: FakePokeApi
+    ) -> None:
+        """A failing detail request surfaces as one UpstreamApiError."""
+        list_page = _make_berry_list_response(SLOW_BERRIES[:5])
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            berry_id = _berry_id(str(request.url))
+            if berry_id == 3:
+                raise httpx.ConnectError("Connection refused", request=request)
+            if berry_id is not None:
+                await asyncio.sleep(UPSTREAM_LATENCY)
+                return httpx.Response(200, json=_make_berry_detail(*SLOW_BERRIES[berry_id - 1]))
+            return httpx.Response(200, json=list_page)
+
+        with _install_handler(pokeapi, handler):
+            with pytest.raises(UpstreamApiError) as exc_info:
+                await fetch_berry_data(BASE_URL, cache=None, cache_ttl_seconds=0)
+
+        assert isinstance(exc_info.value.__cause__, httpx.ConnectError)
+
+
+class TestListPages:
+    @pytest.mark.asyncio
+    async def test_page_size_covering_count_needs_one_list_request(
+        self, pokeapi: FakePokeApi
+    ) -> None:
+        with _install_handler(pokeapi, _offset_limit_handler(PAGED_BERRIES)):
+            berries = await fetch_all_berries(BASE_URL, cache=None, cache_ttl_seconds=0, page_size=100)
+
+        assert len(berries) == len(PAGED_BERRIES)
+        [request] = _list_requests(pokeapi)
+        assert request.url.params["limit"] == "100"
+        assert request.url.params["offset"] == "0"
+
+    @pytest.mark.asyncio
+    async def test_remaining_pages_are_requested_by_offset(self, pokeapi: FakePokeApi) -> None:
+        with _install_handler(pokeapi, _offset_limit_handler(PAGED_BERRIES)):
+            berries = await fetch_all_berries(BASE_URL, cache=None, cache_ttl_seconds=0, page_size=10)
+
+        assert [b.name for b in berries] == [name for name, _ in PAGED_BERRIES]
+        offsets = sorted(int(r.url.params["offset"]) for r in _list_requests(pokeapi))
+        assert offsets == [0, 10, 20, 30, 40]
+
+    @pytest.mark.asyncio
+    async def test_pages_follow_the_size_upstream_serves(self, pokeapi: FakePokeApi) -> None:
+        """When upstream caps `limit`, the crawler pages by what it actually got."""
+        with _install_handler(pokeapi, _offset_limit_handler(PAGED_BERRIES, max_limit=20)):
+            berries = await fetch_all_berries(BASE_URL, cache=None, cache_ttl_seconds=0, page_size=100)
+
+        assert len(berries) == len(PAGED_BERRIES)
+        assert len(_list_requests(pokeapi)) == 3
+
+    @pytest.mark.asyncio
+    async def test_list_pages_are_fetched_in_parallel(self, pokeapi: FakePokeApi) -> None:
+        """All pages after the first cost one round trip together, not one each."""
+        handler = _offset_limit_handler(PAGED_BERRIES, latency=UPSTREAM_LATENCY)
+        with _install_handler(pokeapi, handler):
+            start = time.perf_counter()
+            await fetch_all_berries(
+                BASE_URL, cache=None, cache_ttl_seconds=0, page_size=5, concurrency=50
+            )
+            elapsed = time.perf_counter() - start
+
+        # 10 pages followed serially would take >= 10 round trips
+        assert elapsed < 5 * UPSTREAM_LATENCY
+
+    @pytest.mark.asyncio
+    async def test_list_pages_respect_the_concurrency_limit(self, pokeapi: FakePokeApi) -> None:
+        serve = _offset_limit_handler(PAGED_BERRIES, latency=0.01)
+        in_flight = peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await serve(request)
+            finally:
+                in_flight -= 1
+
+        with _install_handler(pokeapi, handler):
+            berries = await fetch_all_berries(
+                BASE_URL, cache=None, cache_ttl_seconds=0, page_size=1, concurrency=3
+            )
+
+        assert len(berries) == len(PAGED_BERRIES)
+        assert peak == 3
+
+
+class TestStreamBerries:
+    @pytest.mark.asyncio
+    async def test_first_berry_arrives_before_crawl_finishes(self, mock_pokeapi_slow: Any) -> None:
+        """The first detail is yielded after ~2 round trips, not the whole crawl."""
+        stream = stream_berries(BASE_URL, cache=None, cache_ttl_seconds=0, concurrency=4)
+        start = time.perf_counter()
+        first = await anext(stream)
+        elapsed = time.perf_counter() - start
+        await stream.aclose()
+
+        assert first.name == SLOW_BERRIES[0][0]
+        assert elapsed < 4 * UPSTREAM_LATENCY
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_outstanding_requests(self, mock_pokeapi_slow: Any) -> None:
+        stream = stream_berries(BASE_URL, cache=None, cache_ttl_seconds=0, concurrency=2)
+        await anext(stream)
+        await stream.aclose()
+        requests_at_close = len(mock_pokeapi_slow.requests)
+
+        await asyncio.sleep(3 * UPSTREAM_LATENCY)
+        assert len(mock_pokeapi_slow.requests) == requests_at_close
+        assert requests_at_close < len(SLOW_BERRIES)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cached_streams_share_one_crawl(self, mock_pokeapi_slow: Any) -> None:
+        cache = MemoryCache(max_entries=64)
+
+        async def read_all() -> list[str]:
+            return [berry.name async for berry in stream_berries(BASE_URL, cache, 3600, concurrency=10)]
+
+        results = await asyncio.gather(*(read_all() for _ in range(5)))
+
+        assert results == [[name for name, _ in SLOW_BERRIES]] * 5
+        assert len(mock_pokeapi_slow.requests) == len(SLOW_BERRIES) + 2  # two list pages
+
+    @pytest.mark.asyncio
+    async def test_stream_joins_snapshot_fetch_in_flight(self, mock_pokeapi_slow: Any) -> None:
+        cache = MemoryCache(max_entries=64)
+        fetch = asyncio.create_task(fetch_berry_snapshot(BASE_URL, cache, 3600, concurrency=10))
+        await asyncio.sleep(0)
+
+        names = [berry.name async for berry in stream_berries(BASE_URL, cache, 3600, concurrency=10)]
+
+        assert names == (await fetch).dataset.names
+        assert len(mock_pokeapi_slow.requests) == len(SLOW_BERRIES) + 2
+
+    @pytest.mark.asyncio
+    async def test_closed_cached_stream_still_caches_the_crawl(self, mock_pokeapi_slow: Any) -> None:
+        """A /berries page that stops early does not waste the crawl it started."""
+        cache = MemoryCache(max_entries=64)
+        stream = stream_berries(BASE_URL, cache, 3600, concurrency=10)
+        await anext(stream)
+        await stream.aclose()
+        while berries_flight.in_flight(SNAPSHOT_CACHE_KEY):
+            await asyncio.sleep(UPSTREAM_LATENCY)
+        requests = len(mock_pokeapi_slow.requests)
+
+        snapshot = await fetch_berry_snapshot(BASE_URL, cache, 3600)
+
+        assert snapshot.dataset.names == [name for name, _ in SLOW_BERRIES]
+        assert len(mock_pokeapi_slow.requests) == requests == len(SLOW_BERRIES) + 2
+
+    @pytest.mark.asyncio
+    async def test_stream_error_raises_upstream_error(self, mock_pokeapi_error: Any) -> None:
+        with pytest.raises(UpstreamApiError):
+            async for _ in stream_berries(BASE_URL, cache=None, cache_ttl_seconds=0):
+                pass
+
+
+class TestSharedHttpClient:
+    def test_create_http_client_applies_settings(self) -> None:
+        """create_http_client builds a pooled client from Settings."""
+        settings = Settings(pokeapi_base_url=BASE_URL, http_timeout_seconds=5.0)
+        client = create_http_client(settings)
+        assert client.timeout.read == 5.0
+
+    @pytest.mark.asyncio
+    async def test_fetch_uses_shared_client_with_mock_transport(
+        self, pokeapi: FakePokeApi, mock_pokeapi: Any
+    ) -> None:
+        """A shared client with an injected transport serves the whole crawl."""
+        settings = Settings(pokeapi_base_url=BASE_URL)
+        async with create_http_client(settings, transport=pokeapi.transport()) as client:
+            with patch("src.upstream_api.httpx.AsyncClient") as ad_hoc_client:
+                berries = await fetch_all_berries(
+                    BASE_URL, cache=None, cache_ttl_seconds=0, client=client
+                )
+                ad_hoc_client.assert_not_called()
+
+        assert len(berries) == 5
+        assert len(pokeapi.requests) == 6
+
+    def test_app_closes_shared_client_on_shutdown(self, app: Any) -> None:
+        """The lifespan-owned client is closed when the application stops."""
+        with TestClient(app):
+            http_client = app.state.http_client
+            assert not http_client.is_closed
+        assert http_client.is_closed
 
 
 class TestFetchBerryData:
@@ -63,7 +360,7 @@ class TestFetchBerryData:
     @pytest.mark.asyncio
     async def test_fetch_berry_data_upstream_error(self) -> None:
         """fetch_berry_data raises UpstreamApiError when upstream fails."""
-        with patch("src.upstream_api.fetch_all_berries", side_effect=httpx.HTTPError("API failed")):
+        with patch("src.upstream_api._get_snapshot", side_effect=httpx.HTTPError("API failed")):
             with pytest.raises(UpstreamApiError) as exc_info:
                 await fetch_berry_data(BASE_URL, cache=None, cache_ttl_seconds=0)
 
@@ -80,3 +377,28 @@ class TestFetchBerryData:
         assert isinstance(frequency, Counter)
         assert all(isinstance(name, str) for name in names)
         assert all(isinstance(time, int) for time in growth_times)
+
+
+class TestLegacyCacheEntry:
+    """A `list[Berry]` cached before snapshots existed (and before the extra Berry fields)."""
+
+    def _legacy_cache(self) -> MemoryCache:
+        cache = MemoryCache(max_entries=64)
+        legacy = [Berry.model_construct(name="cheri", growth_time=3)]
+        cache.set(SNAPSHOT_CACHE_KEY, legacy, 3600)
+        return cache
+
+    @pytest.mark.asyncio
+    async def test_legacy_entry_is_a_miss(self) -> None:
+        assert await cached_snapshot(self._legacy_cache(), 3600) is None
+
+    @pytest.mark.asyncio
+    async def test_legacy_entry_is_replaced_by_a_crawl(
+        self, mock_pokeapi: Any, sample_berries: list[tuple[str, int]]
+    ) -> None:
+        cache = self._legacy_cache()
+
+        snapshot = await fetch_berry_snapshot(BASE_URL, cache, 3600)
+
+        assert len(snapshot.dataset) == len(sample_berries)
+        assert cache.get(SNAPSHOT_CACHE_KEY) is snapshot